@@ -0,0 +1,50 @@
+"""
+Benchmark of ZLogger.log_many against the same records logged with a loop of info calls.
+
+Both log the records of a batch job to a rotated log file, from one call site,
+in the text and JSON formats.
+
+Usage: python benchmarks/bench_batch.py [batch size] [number]
+"""
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zlogger import ZLogger
+from zlogger import testing
+
+
+def create_config(tmp_dir, log_format):
+    return testing.create_config(tmp_dir, LOG={'Format': log_format}, LOG_FILE={'FileName': 'bench', 'MaxFileSize': str(16 * 1024 * 1024), 'MaxStorageSize': str(1024 * 1024 * 1024)})
+
+
+def main(batch_size=1000, number=20):
+    items = [f"report-{i}.csv" for i in range(batch_size)]
+    for log_format in ('text', 'json'):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            logger = ZLogger('bench', create_config(tmp_dir, log_format))
+
+            def looped():
+                for item in items:
+                    logger.with_request_id('1234').info("processed %s", item)
+
+            def batched():
+                logger.log_many(logging.INFO, [("processed %s", item) for item in items], {'request_id': '1234'})
+
+            looped_time = min(timeit.repeat(looped, number=number, repeat=5))
+            batched_time = min(timeit.repeat(batched, number=number, repeat=5))
+            logger.close()
+        finally:
+            shutil.rmtree(tmp_dir)
+        records = batch_size * number
+        print(f"{log_format:<5} looped {looped_time / records * 1e9:8.1f} ns/record   log_many {batched_time / records * 1e9:8.1f} ns/record   speedup {looped_time / batched_time:4.2f}x")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
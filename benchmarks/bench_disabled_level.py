@@ -0,0 +1,38 @@
+"""
+Micro-benchmark of a logging call whose level is not enabled.
+
+Compares a ZLogger.debug call on a logger configured at INFO level with a
+plain method call taking the same arguments.
+
+Usage: python benchmarks/bench_disabled_level.py [number]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zlogger import ZLogger
+from zlogger.testing import create_config
+
+
+class Plain:
+    def debug(self, message, *args, **kwargs):
+        pass
+
+
+def main(number=1000000):
+    logger = ZLogger('bench', create_config())
+    plain = Plain()
+
+    results = {
+        'plain call': min(timeit.repeat(lambda: plain.debug('message'), number=number, repeat=5)),
+        'disabled debug': min(timeit.repeat(lambda: logger.debug('message'), number=number, repeat=5)),
+        'disabled debug with request id': min(timeit.repeat(lambda: logger.with_request_id('1234').debug('message'), number=number, repeat=5)),
+    }
+    for name, seconds in results.items():
+        print(f"{name:<32} {seconds / number * 1e9:8.1f} ns/call")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,55 @@
+"""
+Benchmark of CustomFormatter against the previous %-style formatter.
+
+The previous formatter ran a generic %-format over the layout and the
+timestamp was built with datetime and strftime for every record.
+
+Usage: python benchmarks/bench_formatter.py [number]
+"""
+import datetime
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zlogger.custom_formatter import CustomFormatter, LOG_FORMAT
+
+
+def previous_format_time():
+    timestamp = datetime.datetime.fromtimestamp(datetime.datetime.now().timestamp())
+    microseconds = timestamp.microsecond // 1000
+    return f"{timestamp:%Y/%m/%d %H:%M:%S}.{microseconds:06d}"
+
+
+def create_record(data):
+    record = logging.LogRecord('bench', logging.INFO, __file__, 10, 'processing file %s', ('report.csv',), None)
+    record.__dict__.update({
+        'file_path': __file__,
+        'line_no': 10,
+        'function_name': 'main',
+        'module_name': 'bench',
+        'request_id': '23432-324-2343223423-573532',
+        'data': data,
+    })
+    return record
+
+
+def main(number=200000):
+    previous = logging.Formatter(fmt=LOG_FORMAT)
+    current = CustomFormatter()
+
+    def format_previous(record):
+        record.asctime1 = previous_format_time()
+        return previous.format(record)
+
+    for name, data in (('empty data', ''), ('with data', 'uuid: 12345, timing: 3 ms,')):
+        record = create_record(data)
+        previous_time = min(timeit.repeat(lambda: format_previous(record), number=number, repeat=5))
+        current_time = min(timeit.repeat(lambda: current.format(record), number=number, repeat=5))
+        print(f"{name:<12} previous {previous_time / number * 1e9:8.1f} ns/record   current {current_time / number * 1e9:8.1f} ns/record   speedup {previous_time / current_time:4.2f}x")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,171 @@
+"""
+Benchmark suite of the logging hot path.
+
+Measures the records per second and the p50/p99 latency of each call for
+the public logging methods, with 1, 4 and 16 threads, logging to stdout,
+to a file and to both, and to a file that is rotated and evicted while it
+is written. stdout is redirected to os.devnull while measuring.
+
+The results are printed as a table and can be written as JSON, to be
+compared with the results of another commit:
+
+Usage: python benchmarks/bench_suite.py [--records N] [--threads 1,4,16] [--output results.json] [--baseline old.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zlogger import ZLogger
+from zlogger import testing
+
+# The logging calls, taking the logger and the iteration number
+METHODS = {
+    'info': lambda logger, i: logger.info('processed item %s', i),
+    'debug_disabled': lambda logger, i: logger.debug('processed item %s', i),
+    'with_data_error': lambda logger, i: logger.with_additional_data({'timing': '3 ms', 'item': i}).error('processed item %s', i),
+}
+
+SINKS = ('stdout', 'file', 'both')
+
+# Small enough to rotate every few thousand records and to evict the oldest files
+ROTATION_FILE_SIZE = 256 * 1024
+ROTATION_STORAGE_SIZE = 1024 * 1024
+
+
+def create_config(tmp_dir, sink, rotation=False):
+    return testing.create_config(tmp_dir, LOG={'LogStdout': str(sink in ('stdout', 'both'))}, LOG_FILE={
+        'Enabled': str(sink in ('file', 'both')),
+        'FileName': 'bench',
+        'MaxFileSize': str(ROTATION_FILE_SIZE if rotation else 1 << 40),
+        'MaxStorageSize': str(ROTATION_STORAGE_SIZE if rotation else 1 << 40),
+    })
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(method, sink, threads, records, rotation=False):
+    """
+    Log records from several threads and measure the throughput and the latency of each call.
+
+    Parameters:
+    method (str): The name of the logging call in METHODS.
+    sink (str): stdout, file or both.
+    threads (int): The number of logging threads.
+    records (int): The number of records logged by each thread.
+    rotation (bool): Whether the log file is rotated and evicted while it is written.
+
+    Returns:
+    dict: The result of the run.
+    """
+
+    tmp_dir = tempfile.mkdtemp()
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        logger = ZLogger('bench', create_config(tmp_dir, sink, rotation))
+        call = METHODS[method]
+        barrier = threading.Barrier(threads + 1)
+        latencies = [None] * threads
+
+        def worker(number):
+            timings = []
+            clock = time.perf_counter_ns
+            barrier.wait()
+            for i in range(records):
+                start = clock()
+                call(logger, i)
+                timings.append(clock() - start)
+            latencies[number] = timings
+
+        workers = [threading.Thread(target=worker, args=(number,)) for number in range(threads)]
+        for thread in workers:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        logger.close()
+        rotated_files = sum(len(files) for _, _, files in os.walk(tmp_dir))
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+        shutil.rmtree(tmp_dir)
+
+    timings = sorted(timing for timings in latencies for timing in timings)
+    return {
+        'method': method,
+        'sink': 'file_rotation' if rotation else sink,
+        'threads': threads,
+        'records': len(timings),
+        'records_per_second': round(len(timings) / elapsed),
+        'p50_ns': percentile(timings, 0.5),
+        'p99_ns': percentile(timings, 0.99),
+        'files': rotated_files if rotation else None,
+    }
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def key(result):
+    return result['method'], result['sink'], result['threads']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the zlogger logging hot path.')
+    parser.add_argument('--records', type=int, default=10000, help='records logged by each thread')
+    parser.add_argument('--threads', default='1,4,16', help='comma separated thread counts')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='compare with the JSON results of another run')
+    args = parser.parse_args(argv)
+    thread_counts = [int(count) for count in args.threads.split(',')]
+
+    runs = [(method, sink, False) for method in METHODS for sink in SINKS] + [('info', 'file', True)]
+    results = []
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = {key(result): result for result in json.load(file)['results']}
+
+    print(f"{'method':<16} {'sink':<14} {'threads':>7} {'records/s':>11} {'p50 ns':>9} {'p99 ns':>9}  vs baseline")
+    for method, sink, rotation in runs:
+        for threads in thread_counts:
+            result = run(method, sink, threads, args.records, rotation)
+            results.append(result)
+            previous = baseline.get(key(result))
+            change = f"{result['records_per_second'] / previous['records_per_second'] - 1:+.1%} records/s" if previous else ''
+            print(f"{result['method']:<16} {result['sink']:<14} {threads:>7} {result['records_per_second']:>11} "
+                  f"{result['p50_ns']:>9} {result['p99_ns']:>9}  {change}", flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'meta': metadata(), 'records_per_thread': args.records, 'results': results}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
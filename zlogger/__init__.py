@@ -1,3 +1,8 @@
 from .logger import ZLogger
 from .custom_formatter import CustomFormatter
-from .custom_file_rotater import CustomFileRotator
\ No newline at end of file
+from .custom_file_rotater import CustomFileRotator
+from .structured_formatter import JsonFormatter, BinaryFormatter
+from .log_reader import read_json_lines, read_binary, read_text, read_directory, tail
+from .log_index import search
+from .lazy import Lazy
+from .registry import get_logger
\ No newline at end of file
@@ -0,0 +1,4 @@
+import sys
+from .log_index import main
+
+sys.exit(main())
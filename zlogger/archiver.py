@@ -0,0 +1,405 @@
+import os
+import json
+import errno
+import gzip
+import lzma
+import queue
+import shutil
+import logging
+import time
+import threading
+import contextlib
+from .constants import ArchiveCompression
+from .log_index import index_path, remove_index
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# File name suffix of the archived files for each compression
+ARCHIVE_SUFFIX = {
+    ArchiveCompression.NONE.value: '',
+    ArchiveCompression.GZIP.value: '.gz',
+    ArchiveCompression.LZMA.value: '.xz',
+}
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Name of the manifest of the archived log files, stored in the archive path
+MANIFEST_NAME = '.zlogger-manifest.json'
+
+# Errors of os.link and os.rename meaning the data has to be copied instead
+LINK_UNSUPPORTED_ERRORS = (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP)
+
+
+class LogArchiver(threading.Thread):
+    def __init__(self, archive_path, compression=ArchiveCompression.NONE.value, compression_level=None, on_archived=None, lock_path=None):
+        """
+        Initialize the background worker archiving rotated log files.
+
+        Parameters:
+        archive_path (str): The path where archived log files are stored.
+        compression (str): The compression of the archived files, one of none, gzip or lzma.
+        compression_level (int): The compression level, the library default if None.
+        on_archived (function): Called with the log file path, the archived file path (None if the log
+            file disappeared or could not be archived) and whether the log file was to be removed, once
+            a file is processed.
+        lock_path (str): The lock file of the log path in multi-process mode, held while the log
+            directory is synchronized and while the manifest is written. None in single-process mode.
+        """
+
+        super().__init__(name='zlogger-archiver', daemon=True)
+        self.archive_path = archive_path
+        self.compression = compression
+        self.compression_level = compression_level
+        self.on_archived = on_archived
+        self.lock_path = lock_path
+        # Opened by the worker, a lock file of its own is not shared with the lock of the handler thread.
+        self._lock_file = None
+        self.suffix = ARCHIVE_SUFFIX[compression]
+        # Uncompressed files are hard linked or renamed into the archive path until the
+        # file system refuses it, for example when the archive path is on another device.
+        self.link_supported = compression == ArchiveCompression.NONE.value
+        self.manifest_path = os.path.join(archive_path, MANIFEST_NAME)
+        # Size and modification time of the archived log files by name, loaded by the worker.
+        self.manifest = None
+        # The entries added and the names removed since the manifest was written, merged into the
+        # manifest on disk, which other processes may have written since it was loaded.
+        self._manifest_updates = {}
+        self._manifest_removals = set()
+        self._queue = queue.Queue()
+        # The metrics of the handler, the archiver counts the archived files and the time spent archiving them.
+        self.metrics = None
+
+    def archive_name(self, file_name):
+        """
+        Get the name of the archived version of a log file.
+
+        Parameters:
+        file_name (str): The log file name.
+
+        Returns:
+        str: The archived file name.
+        """
+
+        return file_name + self.suffix
+
+    def is_archived(self, file_name):
+        """
+        Check whether a log file is already in the archive path.
+
+        Parameters:
+        file_name (str): The log file name.
+
+        Returns:
+        bool: True if the archived file exists, False otherwise.
+        """
+
+        return os.path.isfile(os.path.join(self.archive_path, self.archive_name(file_name)))
+
+    def submit(self, file_path, remove=False):
+        """
+        Queue a log file for archiving.
+
+        Parameters:
+        file_path (str): The path of the log file.
+        remove (bool): Whether to remove the log file once it is archived.
+        """
+
+        self._queue.put((self._process, file_path, remove))
+
+    def submit_sync(self, directory, exclude=None):
+        """
+        Queue the archiving of the log files of a directory that are new or changed since they were last archived.
+
+        The latest file of the directory and the excluded file are not archived.
+
+        Parameters:
+        directory (str): The log directory.
+        exclude (str): The path of a file not to archive, typically the file being written.
+        """
+
+        self._queue.put((self._sync, directory, exclude))
+
+    def wait(self):
+        """
+        Wait until every queued log file is processed.
+        """
+
+        self._queue.join()
+
+    def stop(self):
+        """
+        Process the queued log files and stop the worker.
+        """
+
+        if self.is_alive():
+            self._queue.put(None)
+            self.join()
+
+    def run(self):
+        self.manifest = self._load_manifest()
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                func, *args = job
+                func(*args)
+            except Exception:
+                logging.exception("Failed to archive %s", job[1])
+            finally:
+                # Persist the manifest once the queue is drained instead of after every file.
+                if (self._manifest_updates or self._manifest_removals) and self._queue.empty():
+                    try:
+                        with self._process_lock():
+                            self._save_manifest()
+                    except Exception:
+                        logging.exception("Failed to write the manifest %s", self.manifest_path)
+                self._queue.task_done()
+                if job is None and self._lock_file is not None:
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    @contextlib.contextmanager
+    def _process_lock(self):
+        """
+        Hold the lock file of the log path in multi-process mode, do nothing otherwise.
+        """
+
+        if self.lock_path is None or fcntl is None:
+            yield
+            return
+        if self._lock_file is None:
+            self._lock_file = open(self.lock_path, 'a')
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load_manifest(self):
+        """
+        Load the manifest of the archived log files.
+
+        Returns:
+        dict: The size and modification time of the archived log files by name.
+        """
+
+        try:
+            with open(self.manifest_path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _reload_manifest(self):
+        """
+        Load the manifest written by the other processes and apply the changes not written yet.
+
+        Called holding the lock file of the log path.
+        """
+
+        manifest = self._load_manifest()
+        manifest.update(self._manifest_updates)
+        for name in self._manifest_removals:
+            manifest.pop(name, None)
+        self.manifest = manifest
+
+    def _save_manifest(self):
+        """
+        Merge the changes into the manifest on disk and write it, atomically.
+
+        Called holding the lock file of the log path.
+        """
+
+        if self.lock_path is not None:
+            self._reload_manifest()
+        temp_path = f'{self.manifest_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(self.manifest, file)
+        os.replace(temp_path, self.manifest_path)
+        self._manifest_updates = {}
+        self._manifest_removals = set()
+
+    def _sync(self, directory, exclude):
+        """
+        Archive the log files of a directory that are new or changed since they were last archived.
+
+        In multi-process mode the lock file is held until the manifest is written, so
+        the processes starting together archive each file once.
+
+        Parameters:
+        directory (str): The log directory.
+        exclude (str): The path of a file not to archive.
+        """
+
+        with self._process_lock():
+            if self.lock_path is not None:
+                self._reload_manifest()
+            self._sync_directory(directory, exclude)
+            if self._manifest_updates or self._manifest_removals:
+                self._save_manifest()
+
+    def _sync_directory(self, directory, exclude):
+        """
+        Archive the log files of a directory missing from the manifest and forget the removed ones.
+
+        Parameters:
+        directory (str): The log directory.
+        exclude (str): The path of a file not to archive.
+        """
+
+        # Hidden files are the lock and pointer files of the multi-process mode.
+        entries = sorted((entry for entry in os.scandir(directory) if entry.is_file() and not entry.name.startswith('.')), key=lambda entry: entry.name)
+        names = {entry.name for entry in entries}
+        for entry in entries[:-1]:
+            if exclude and entry.path == exclude:
+                continue
+            stat = entry.stat()
+            if self.manifest.get(entry.name) == [stat.st_size, stat.st_mtime_ns]:
+                continue
+            self._process(entry.path, False)
+
+        # Forget the files that are not in the log directory anymore.
+        for name in [name for name in self.manifest if name not in names]:
+            del self.manifest[name]
+            self._manifest_updates.pop(name, None)
+            self._manifest_removals.add(name)
+
+    def _process(self, file_path, remove):
+        """
+        Archive a log file, unless remove is set and it is already archived, then remove it if requested.
+
+        Parameters:
+        file_path (str): The path of the log file.
+        remove (bool): Whether to remove the log file once it is archived.
+        """
+
+        target = os.path.join(self.archive_path, self.archive_name(os.path.basename(file_path)))
+        archived_path = None
+        try:
+            if not (remove and os.path.isfile(target)):
+                start = time.perf_counter_ns()
+                self.archive(file_path, move=remove)
+                if self.metrics is not None:
+                    self.metrics['archived'] += 1
+                    self.metrics['archive_ns'] += time.perf_counter_ns() - start
+            if remove:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                remove_index(file_path)
+            archived_path = target
+        except FileNotFoundError:
+            pass
+        finally:
+            # Also called when archiving failed, so that the handler stops waiting for the file.
+            if self.on_archived:
+                self.on_archived(file_path, archived_path, remove)
+
+    def archive(self, file_path, move=False):
+        """
+        Write a log file to the archive path.
+
+        Uncompressed files are renamed (move) or hard linked into the archive path
+        when both paths are on the same file system, so archiving costs O(1) I/O
+        and the data is not stored twice. Otherwise the data is streamed to a
+        temporary file that is renamed once complete, so the archive path never
+        holds a partially written file.
+
+        Parameters:
+        file_path (str): The path of the log file.
+        move (bool): Whether the log file may be moved instead of copied.
+
+        Returns:
+        str: The path of the archived file.
+        """
+
+        file_name = os.path.basename(file_path)
+        target = os.path.join(self.archive_path, self.archive_name(file_name))
+        # Several processes may archive the same file, each writes its own temporary file.
+        temp_path = os.path.join(self.archive_path, f'.{self.archive_name(file_name)}.{os.getpid()}.tmp')
+        stat = os.stat(file_path)
+        if self.link_supported and self._link(file_path, temp_path, target, move):
+            self._add_to_manifest(file_name, stat)
+            self._archive_index(file_path)
+            return target
+
+        try:
+            with open(file_path, 'rb') as source, open(temp_path, 'wb') as temp:
+                if self.compression == ArchiveCompression.GZIP.value:
+                    level = 6 if self.compression_level is None else self.compression_level
+                    with gzip.GzipFile(file_name, 'wb', level, temp, stat.st_mtime) as destination:
+                        shutil.copyfileobj(source, destination, COPY_BUFFER_SIZE)
+                elif self.compression == ArchiveCompression.LZMA.value:
+                    with lzma.LZMAFile(temp, 'wb', preset=self.compression_level) as destination:
+                        shutil.copyfileobj(source, destination, COPY_BUFFER_SIZE)
+                else:
+                    shutil.copyfileobj(source, temp, COPY_BUFFER_SIZE)
+            os.utime(temp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            os.replace(temp_path, target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._add_to_manifest(file_name, stat)
+        self._archive_index(file_path)
+        return target
+
+    def _archive_index(self, file_path):
+        """
+        Copy the sidecar index of a log file next to its archived file, if it has one.
+
+        Parameters:
+        file_path (str): The path of the log file.
+        """
+
+        source = index_path(file_path)
+        if not os.path.exists(source):
+            return
+        target = index_path(os.path.join(self.archive_path, os.path.basename(file_path)))
+        temp_path = f'{target}.{os.getpid()}.tmp'
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, target)
+
+    def _add_to_manifest(self, file_name, stat):
+        """
+        Record an archived log file in the manifest.
+
+        Parameters:
+        file_name (str): The log file name.
+        stat (os.stat_result): The status of the log file when it was archived.
+        """
+
+        if self.manifest is not None:
+            self.manifest[file_name] = self._manifest_updates[file_name] = [stat.st_size, stat.st_mtime_ns]
+            self._manifest_removals.discard(file_name)
+
+    def _link(self, file_path, temp_path, target, move):
+        """
+        Rename or hard link a log file into the archive path.
+
+        Parameters:
+        file_path (str): The path of the log file.
+        temp_path (str): The temporary path the hard link is created at.
+        target (str): The path of the archived file.
+        move (bool): Whether the log file is renamed instead of linked.
+
+        Returns:
+        bool: True if the file was archived, False if the data has to be copied.
+        """
+
+        try:
+            if move:
+                os.replace(file_path, target)
+                return True
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+            os.link(file_path, temp_path)
+        except OSError as e:
+            if e.errno not in LINK_UNSUPPORTED_ERRORS:
+                raise
+            self.link_supported = False
+            return False
+        os.replace(temp_path, target)
+        return True
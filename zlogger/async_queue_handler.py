@@ -0,0 +1,284 @@
+import asyncio
+import logging
+import queue
+import threading
+import collections
+from logging.handlers import QueueHandler, QueueListener
+from .constants import OverflowPolicy
+from .batch import handle_batch, HandlerBatch
+
+
+def _running_loop():
+    """
+    Get the event loop running in the current thread, None outside of an event loop.
+    """
+
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class _WriterListener(QueueListener):
+    def enqueue_sentinel(self):
+        """
+        Put the stop sentinel on the queue, waiting for a free slot when the queue is full.
+        """
+
+        self.queue.put(self._sentinel)
+
+    def handle(self, record):
+        """
+        Dispatch a queued record, or a queued batch of records, to the handlers.
+
+        Parameters:
+        record (LogRecord): The log record, or the list of records of a batch.
+        """
+
+        if isinstance(record, list):
+            _handle_batch_item(self.handlers, record)
+            return
+        super().handle(record)
+
+
+def _handle_batch_item(handlers, batch):
+    """
+    Dispatch a queued batch to the handlers, or to its own handlers regardless of their level.
+
+    Parameters:
+    handlers (list): The handlers of the asynchronous handler.
+    batch (list): The records of the batch.
+    """
+
+    if batch.__class__ is HandlerBatch:
+        batch.handle()
+        return
+    for handler in handlers:
+        handle_batch(handler, batch)
+
+
+class AsyncQueueHandler(QueueHandler):
+    def __init__(self, handlers, queue_size=10000, overflow_policy=OverflowPolicy.BLOCK.value, overflow_level=logging.WARNING):
+        """
+        Initialize the AsyncQueueHandler handler.
+
+        Records are put on a bounded queue and written by a dedicated writer
+        thread that owns the given handlers, so the calling thread never
+        formats, rotates or writes. A thread running an asyncio event loop
+        never waits for a free slot either: the records it logs while the
+        queue is full are kept in order in a backlog, which a task of the
+        default executor of the loop moves to the queue.
+
+        Parameters:
+        handlers (list): The handlers the writer thread dispatches the records to.
+        queue_size (int): The maximum number of records waiting in the queue.
+        overflow_policy (str): What to do when the queue is full, one of block, drop_oldest or drop_below_level.
+        overflow_level (int): With drop_below_level, records below this level are dropped when the queue is full.
+        """
+
+        super().__init__(queue.Queue(queue_size))
+        self.handlers = handlers
+        self.overflow_policy = overflow_policy
+        self.overflow_level = overflow_level
+        self.dropped = 0
+        self.dropped_by_level = {}
+        # Records waiting for a free slot on behalf of an event loop, oldest first
+        self._backlog = collections.deque()
+        self._backlog_condition = threading.Condition()
+        self._draining = False
+        self.listener = _WriterListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def prepare(self, record):
+        """
+        Prepare a record for queuing.
+
+        The record is queued unformatted, formatting happens on the writer thread.
+        Only the message is merged with its arguments, which the caller may change
+        once the call returns, and the exception text is rendered while the
+        traceback is still current.
+
+        Parameters:
+        record (LogRecord): The log record that is being processed.
+
+        Returns:
+        LogRecord: The record to put on the queue.
+        """
+
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+    def handle_many(self, records):
+        """
+        Queue a batch of records as a single queue item, written at once by the writer thread.
+
+        Parameters:
+        records (list): The log records, in creation order.
+        """
+
+        try:
+            self.enqueue([self.prepare(record) for record in records])
+        except Exception:
+            self.handleError(records[0])
+
+    def enqueue(self, record):
+        """
+        Put a record on the queue, applying the overflow policy when the queue is full.
+
+        Parameters:
+        record (LogRecord): The log record that is being processed, or the list of records of a batch.
+        """
+
+        if self.listener is None:
+            # The writer thread is stopped, records logged after close are written synchronously.
+            self._handle_synchronously(record)
+            return
+
+        if self._backlog and self._defer(record):
+            # Queued after the records of the event loop already waiting for a free slot.
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow_policy == OverflowPolicy.DROP_OLDEST.value:
+                self._replace_oldest(record)
+            elif self.overflow_policy == OverflowPolicy.DROP_BELOW_LEVEL.value and (record[0] if isinstance(record, list) else record).levelno < self.overflow_level:
+                self._count_dropped(record)
+            elif not self._defer(record):
+                self.queue.put(record)
+
+    def _defer(self, record):
+        """
+        Keep a record in the backlog if the current thread runs an event loop, instead of waiting for a free slot.
+
+        Parameters:
+        record (LogRecord): The log record that is being processed.
+
+        Returns:
+        bool: True if the record is kept in the backlog, False outside of an event loop.
+        """
+
+        loop = _running_loop()
+        if loop is None:
+            return False
+        with self._backlog_condition:
+            self._backlog.append(record)
+            if self._draining:
+                return True
+            self._draining = True
+        try:
+            loop.run_in_executor(None, self._drain_backlog)
+        except RuntimeError:
+            # The executor of a closing loop is shut down, wait for the free slots here.
+            self._drain_backlog()
+        return True
+
+    def _drain_backlog(self):
+        """
+        Move the backlog to the queue, waiting for free slots, from a thread of the executor.
+        """
+
+        while True:
+            with self._backlog_condition:
+                if not self._backlog:
+                    self._draining = False
+                    self._backlog_condition.notify_all()
+                    return
+                record = self._backlog[0]
+            # The record stays in the backlog until it is queued, so the next records of the loop queue after it.
+            self.queue.put(record)
+            with self._backlog_condition:
+                self._backlog.popleft()
+
+    def _wait_backlog(self):
+        """
+        Wait until the backlog is moved to the queue.
+        """
+
+        with self._backlog_condition:
+            while self._draining:
+                self._backlog_condition.wait()
+
+    def _handle_synchronously(self, record):
+        """
+        Dispatch a record to the handlers on the calling thread.
+
+        Parameters:
+        record (LogRecord): The log record that is being processed, or the list of records of a batch.
+        """
+
+        if isinstance(record, list):
+            _handle_batch_item(self.handlers, record)
+            return
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _replace_oldest(self, record):
+        """
+        Drop the oldest queued records until the given record fits in the queue.
+
+        Parameters:
+        record (LogRecord): The log record that is being processed.
+        """
+
+        while True:
+            try:
+                oldest = self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            else:
+                # The dropped record will never be processed by the writer thread.
+                self.queue.task_done()
+                self._count_dropped(oldest)
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                continue
+
+    def _count_dropped(self, record):
+        """
+        Count a record dropped because of a full queue.
+
+        Parameters:
+        record (LogRecord): The dropped log record, or the list of records of a dropped batch.
+        """
+
+        if isinstance(record, list):
+            for batch_record in record:
+                self._count_dropped(batch_record)
+            return
+
+        self.dropped += 1
+        self.dropped_by_level[record.levelname] = self.dropped_by_level.get(record.levelname, 0) + 1
+
+    def flush(self):
+        """
+        Wait until the writer thread has processed every queued record, then flush the handlers.
+        """
+
+        if self.listener is not None and self.listener._thread is not None:
+            self._wait_backlog()
+            self.queue.join()
+        for handler in self.handlers:
+            handler.flush()
+
+    def close(self):
+        """
+        Drain the queue, stop the writer thread and close the handlers.
+        """
+
+        with self.lock:
+            if self.listener is not None:
+                self._wait_backlog()
+                self.listener.stop()
+                self.listener = None
+                for handler in self.handlers:
+                    handler.flush()
+                    handler.close()
+        super().close()
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from zlogger import ZLogger
+from zlogger.async_queue_handler import AsyncQueueHandler
+from zlogger.constants import OverflowPolicy
+from zlogger.custom_file_rotater import CustomFileRotator
+from zlogger.testing import create_config
+
+
+class BlockingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.released = threading.Event()
+        self.messages = []
+
+    def emit(self, record):
+        self.released.wait()
+        self.messages.append(record.getMessage())
+
+
+class AsyncQueueHandlerTest(unittest.TestCase):
+    def create_logger(self, handler, **kwargs):
+        async_handler = AsyncQueueHandler([handler], **kwargs)
+        logger = logging.Logger("async-test", logging.DEBUG)
+        logger.addHandler(async_handler)
+        return logger, async_handler
+
+    def test_close_drains_the_queue(self):
+        handler = BlockingHandler()
+        handler.released.set()
+        logger, async_handler = self.create_logger(handler, queue_size=10)
+        for index in range(100):
+            logger.info("message %d", index)
+        async_handler.close()
+
+        self.assertEqual(handler.messages, ["message %d" % index for index in range(100)])
+
+    def test_arguments_changed_after_the_call_are_not_logged(self):
+        handler = BlockingHandler()
+        logger, async_handler = self.create_logger(handler, queue_size=10)
+        items = ["first"]
+        logger.info("items %s", items)
+        items.append("second")
+        handler.released.set()
+        async_handler.close()
+
+        self.assertEqual(handler.messages, ["items ['first']"])
+
+    def test_drop_oldest_keeps_the_newest_records(self):
+        handler = BlockingHandler()
+        logger, async_handler = self.create_logger(handler, queue_size=2, overflow_policy=OverflowPolicy.DROP_OLDEST.value)
+        for index in range(10):
+            logger.info("message %d", index)
+        handler.released.set()
+        async_handler.close()
+
+        self.assertEqual(async_handler.dropped + len(handler.messages), 10)
+        self.assertEqual(handler.messages[-2:], ["message 8", "message 9"])
+        self.assertEqual(async_handler.dropped_by_level, {"INFO": async_handler.dropped})
+
+    def test_drop_below_level_keeps_important_records(self):
+        handler = BlockingHandler()
+        logger, async_handler = self.create_logger(handler, queue_size=1, overflow_policy=OverflowPolicy.DROP_BELOW_LEVEL.value, overflow_level=logging.WARNING)
+        logger.debug("first")
+        logger.debug("second")
+        logger.debug("third")
+        threading.Timer(0.1, handler.released.set).start()
+        logger.error("error")
+        async_handler.close()
+
+        self.assertIn("error", handler.messages)
+        self.assertGreaterEqual(async_handler.dropped_by_level.get("DEBUG", 0), 1)
+        self.assertNotIn("ERROR", async_handler.dropped_by_level)
+
+    def test_event_loop_does_not_wait_for_a_full_queue(self):
+        handler = BlockingHandler()
+        logger, async_handler = self.create_logger(handler, queue_size=2)
+
+        async def main():
+            start = time.monotonic()
+            for index in range(50):
+                logger.info("message %d", index)
+            elapsed = time.monotonic() - start
+            self.assertGreater(len(async_handler._backlog), 0)
+            handler.released.set()
+            await asyncio.get_running_loop().run_in_executor(None, async_handler.flush)
+            return elapsed
+
+        self.assertLess(asyncio.run(main()), 0.5)
+        self.assertEqual(handler.messages, ["message %d" % index for index in range(50)])
+        self.assertEqual(len(async_handler._backlog), 0)
+        async_handler.close()
+
+
+class EventLoopLagTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.log_path = os.path.join(self.tmp_dir, 'logs')
+
+    def create_logger(self):
+        config = create_config(self.tmp_dir, LOG={'Async': 'True', 'QueueSize': '64'}, LOG_FILE={'MaxFileSize': '65536'})
+        logger = ZLogger("loop-test", config)
+        self.addCleanup(logger.close)
+        return logger
+
+    def test_event_loop_lag_stays_flat_during_rotation_and_heavy_logging(self):
+        logger = self.create_logger()
+        rotate = CustomFileRotator._rotate
+
+        def slow_rotate(handler):
+            # A rotation stalled like a copy of a large file.
+            time.sleep(0.3)
+            rotate(handler)
+
+        async def measure_lag(stop, lags):
+            while not stop.is_set():
+                start = time.monotonic()
+                await asyncio.sleep(0.01)
+                lags.append(time.monotonic() - start - 0.01)
+
+        async def handle_request(request_id):
+            with logger.context(request_id=request_id):
+                for index in range(500):
+                    logger.info("item %d", index)
+                    if index % 50 == 0:
+                        await asyncio.sleep(0)
+
+        async def main():
+            stop = asyncio.Event()
+            lags = []
+            ticker = asyncio.create_task(measure_lag(stop, lags))
+            await asyncio.gather(*(handle_request(str(request_id)) for request_id in range(4)))
+            await logger.aflush()
+            stop.set()
+            await ticker
+            return lags
+
+        with mock.patch.object(CustomFileRotator, '_rotate', slow_rotate):
+            lags = asyncio.run(main())
+        handler = logger.handlers[0].handlers[0]
+
+        self.assertGreater(len(os.listdir(self.log_path)), 3)
+        self.assertLess(max(lags), 0.15)
+        lines = []
+        for name in os.listdir(self.log_path):
+            with open(os.path.join(self.log_path, name)) as file:
+                lines.extend(file.read().splitlines())
+        self.assertEqual(len(lines), 2000)
+        self.assertEqual(handler._offset, os.path.getsize(handler.baseFilename))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+def handle_batch(handler, records):
+    """
+    Pass a batch of records to a handler, filtered by the level and the filters of the handler.
+
+    Handlers with a handle_many method process the batch at once, the others
+    handle the records one by one.
+
+    Parameters:
+    handler (logging.Handler): The handler.
+    records (list): The log records, in creation order.
+    """
+
+    level = handler.level
+    if handler.filters:
+        records = [record for record in records if record.levelno >= level and handler.filter(record)]
+    else:
+        records = [record for record in records if record.levelno >= level]
+    if not records:
+        return
+    handle_many = getattr(handler, 'handle_many', None)
+    if handle_many is None:
+        for record in records:
+            handler.handle(record)
+    else:
+        handle_many(records)
+
+
+class HandlerBatch(list):
+    """
+    Records passed to given handlers regardless of their level, like the records
+    of a flight recorder dump, queued as one item of an asynchronous handler.
+    """
+
+    def __init__(self, records, handlers):
+        """
+        Parameters:
+        records (list): The log records, in creation order.
+        handlers (list): The handlers the records are passed to.
+        """
+
+        super().__init__(records)
+        self.handlers = handlers
+
+    def handle(self):
+        """
+        Pass the records to the handlers.
+        """
+
+        for handler in self.handlers:
+            for record in self:
+                handler.handle(record)
@@ -0,0 +1,102 @@
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from zlogger import ZLogger
+from zlogger.custom_file_rotater import CustomFileRotator
+from zlogger.metrics import MeteredStreamHandler
+from zlogger.testing import create_config
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.log_path = os.path.join(self.tmp_dir, 'logs')
+
+    def create_logger(self, max_file_size='1048576', **log):
+        config = create_config(self.tmp_dir, LOG={'Format': 'json', **log}, LOG_FILE={'MaxFileSize': max_file_size})
+        logger = ZLogger("batch-test", config)
+        self.addCleanup(logger.close)
+        return logger
+
+    def read_records(self):
+        records = []
+        for name in os.listdir(self.log_path):
+            with open(os.path.join(self.log_path, name)) as file:
+                records.extend(json.loads(line) for line in file)
+        return records
+
+    def test_log_many_writes_the_batch_with_one_write(self):
+        logger = self.create_logger()
+        handler = logger.handlers[0]
+        logger.log_many(logging.DEBUG, ["not logged"])
+        with mock.patch.object(CustomFileRotator, '_write_many', autospec=True, side_effect=CustomFileRotator._write_many) as write_many:
+            logger.with_request_id('1234').log_many(logging.INFO, ["start", ("item %s of %d", 1, 2), ("item %s of %d", 2, 2)], {'job': 'import'})
+        handler.flush()
+        records = self.read_records()
+
+        self.assertEqual(write_many.call_count, 1)
+        self.assertEqual([record['message'] for record in records], ["start", "item 1 of 2", "item 2 of 2"])
+        for record in records:
+            self.assertEqual(record['level'], 'INFO')
+            self.assertEqual(record['request_id'], '1234')
+            self.assertEqual(record['data'], {'job': 'import'})
+            self.assertEqual(record['function_name'], 'test_log_many_writes_the_batch_with_one_write')
+        self.assertEqual(handler._offset, os.path.getsize(handler.baseFilename))
+
+    def test_log_many_formats_mapping_arguments(self):
+        logger = self.create_logger()
+        logger.log_many(logging.INFO, [("item %(id)s", {'id': 1}), ("item %(id)s", {'id': 2})])
+        logger.handlers[0].flush()
+
+        self.assertEqual([record['message'] for record in self.read_records()], ["item 1", "item 2"])
+
+    def test_a_record_failing_to_render_does_not_discard_the_batch(self):
+        logger = self.create_logger()
+        stream = io.StringIO()
+        console_handler = MeteredStreamHandler(stream)
+        logger.addHandler(console_handler)
+        with mock.patch.object(CustomFileRotator, 'handleError') as file_error, mock.patch.object(MeteredStreamHandler, 'handleError') as console_error:
+            logger.log_many(logging.INFO, ["first", ("item %d", "not a number"), "last"])
+        logger.handlers[0].flush()
+
+        self.assertEqual([record['message'] for record in self.read_records()], ["first", "last"])
+        self.assertEqual(stream.getvalue().splitlines(), ["first", "last"])
+        for handle_error in (file_error, console_error):
+            handle_error.assert_called_once()
+            self.assertEqual(handle_error.call_args.args[0].args, ("not a number",))
+
+    def test_a_batch_crossing_the_size_limit_is_split_across_files(self):
+        logger = self.create_logger(max_file_size='2048')
+        logger.log_many(logging.INFO, [("item %04d", i) for i in range(100)])
+        logger.handlers[0].flush()
+
+        files = os.listdir(self.log_path)
+        self.assertGreater(len(files), 1)
+        for name in files:
+            self.assertLess(os.path.getsize(os.path.join(self.log_path, name)), 2048)
+        self.assertEqual(sorted(record['message'] for record in self.read_records()), ["item %04d" % i for i in range(100)])
+
+    def test_batch_logs_the_collected_messages_through_the_async_writer(self):
+        logger = self.create_logger(Async='True')
+        with self.assertRaises(ValueError):
+            with logger.batch(logging.WARNING) as batch:
+                batch.append("first")
+                batch.append(("second %s", "item"))
+                raise ValueError()
+        logger.handlers[0].flush()
+
+        records = self.read_records()
+        self.assertEqual([record['message'] for record in records], ["first", "second item"])
+        self.assertEqual({record['level'] for record in records}, {'WARNING'})
+        self.assertEqual({record['function_name'] for record in records}, {'test_batch_logs_the_collected_messages_through_the_async_writer'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import json
+import sys
+import unittest
+from unittest import mock
+
+from zlogger import ZLogger, JsonFormatter
+from zlogger import logger as logger_module
+from zlogger.log_reader import TextLayout
+from zlogger.testing import create_logger
+
+
+class CallerTest(unittest.TestCase):
+    def test_caller_is_cached_per_call_site_without_findcaller(self):
+        logger, [stream] = create_logger("caller-test", LOG={'Level': 'debug'})
+        records = []
+        logger.addFilter(lambda record: records.append(record) or True)
+        with mock.patch.object(ZLogger, "findCaller") as find_caller:
+            for _ in range(3):
+                logger.info("message")
+                line_no = sys._getframe().f_lineno - 1
+
+        find_caller.assert_not_called()
+        self.assertEqual(logger_module._callers[(self.test_caller_is_cached_per_call_site_without_findcaller.__code__, line_no)],
+                         ("test_caller_is_cached_per_call_site_without_findcaller", __file__, line_no))
+        record = records[0]
+        self.assertEqual((record.pathname, record.lineno, record.funcName), (__file__, line_no, "test_caller_is_cached_per_call_site_without_findcaller"))
+        self.assertIn(f"called from {__file__}, line #{line_no}, function test_caller", stream.getvalue())
+
+    def test_caller_capture_can_be_disabled(self):
+        logger, [stream] = create_logger("caller-test", JsonFormatter(), LOG={'Level': 'debug', 'CaptureCaller': 'False'})
+        logger.bind(request_id="1234").info("message")
+        record = json.loads(stream.getvalue())
+
+        self.assertIsNone(record["file_path"])
+        self.assertIsNone(record["function_name"])
+        self.assertIsNone(record["line_no"])
+        self.assertEqual(record["request_id"], "1234")
+
+    def test_text_lines_without_caller_leave_the_caller_fields_empty(self):
+        logger, [stream] = create_logger("caller-test", LOG={'Level': 'debug', 'CaptureCaller': 'False'})
+        logger.bind(request_id="1234").info("message")
+        line = stream.getvalue().rstrip("\n")
+        record = TextLayout.get().parse(line.encode())
+
+        self.assertIn(" called from , line #, function , module_name None, requestID: 1234; ", line)
+        self.assertEqual((record["file_path"], record["line_no"], record["function_name"]), (None, None, None))
+        self.assertEqual(record["request_id"], "1234")
+
+    def test_exception_and_logging_keyword_arguments_reach_the_record(self):
+        logger, [stream] = create_logger("caller-test", LOG={'Level': 'debug'})
+        records = []
+        logger.addFilter(lambda record: records.append(record) or True)
+        try:
+            raise ValueError("bad value")
+        except ValueError:
+            logger.exception("failed")
+            logger.bind(request_id="1234").exception("bound failed")
+            logger.error("no traceback")
+        logger.warning("with stack", stack_info=True, extra={"job": "import"})
+
+        self.assertEqual(stream.getvalue().count("ValueError: bad value"), 2)
+        self.assertIn("Traceback (most recent call last):", stream.getvalue())
+        self.assertEqual([record.exc_info is not None for record in records], [True, True, False, False])
+        self.assertEqual(records[1].request_id, "1234")
+        self.assertTrue(records[3].stack_info.startswith("Stack (most recent call last):"))
+        self.assertEqual(records[3].job, "import")
+        self.assertEqual(records[3].funcName, "test_exception_and_logging_keyword_arguments_reach_the_record")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,37 @@ class LogConfig(Enum):
     LINE_NO = 'line_no'
     ASCTIME1 = 'asctime1'
     DATA = 'data'
+    CONTEXT = 'context'
+    FORMAT = 'Format'
+    ASYNC = 'Async'
+    QUEUE_SIZE = 'QueueSize'
+    OVERFLOW_POLICY = 'OverflowPolicy'
+    OVERFLOW_LEVEL = 'OverflowLevel'
+    BUFFER_SIZE = 'BufferSize'
+    BUFFER_RECORDS = 'BufferRecords'
+    FLUSH_INTERVAL = 'FlushInterval'
+    FSYNC_POLICY = 'FsyncPolicy'
+    FSYNC_INTERVAL = 'FsyncInterval'
+    ARCHIVE_COMPRESSION = 'ArchiveCompression'
+    ARCHIVE_COMPRESSION_LEVEL = 'ArchiveCompressionLevel'
+    MULTI_PROCESS = 'MultiProcess'
+    SHARD_PER_PROCESS = 'ShardPerProcess'
+    INDEX = 'Index'
+    RATE_LIMIT = 'RATE_LIMIT'
+    SUMMARY_INTERVAL = 'SummaryInterval'
+    CAPTURE_CALLER = 'CaptureCaller'
+    ROTATE_WHEN = 'RotateWhen'
+    ROTATE_INTERVAL = 'RotateInterval'
+    ROTATE_AT_TIME = 'RotateAtTime'
+    ROTATE_UTC = 'RotateUtc'
+    RETENTION_INTERVAL = 'RetentionInterval'
+    FLIGHT_RECORDER = 'FLIGHT_RECORDER'
+    CAPACITY = 'Capacity'
+    MAX_KEYS = 'MaxKeys'
+    METRICS = 'METRICS'
+    DUMP_INTERVAL = 'DumpInterval'
+    TIMING = 'TIMING'
+    THRESHOLD = 'Threshold'
     
 class ExtendedEnum(Enum):
     @classmethod
@@ -45,6 +76,45 @@ class LogLevel(ExtendedEnum):
     REJECT = 'REJECT'
     FATAL = 'FATAL'
 
+# output formats of the log records
+class LogFormat(ExtendedEnum):
+    TEXT = 'text'
+    JSON = 'json'
+    BINARY = 'binary'
+
+# overflow policies of the asynchronous logging queue
+class OverflowPolicy(ExtendedEnum):
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop_oldest'
+    DROP_BELOW_LEVEL = 'drop_below_level'
+
+# fsync policies of the log file
+class FsyncPolicy(ExtendedEnum):
+    NEVER = 'never'
+    INTERVAL = 'interval'
+    ON_ERROR = 'on_error'
+
+# compressions of the archived log files
+class ArchiveCompression(ExtendedEnum):
+    NONE = 'none'
+    GZIP = 'gzip'
+    LZMA = 'lzma'
+
+# units of the time-based rotation of the log files
+class RotateWhen(ExtendedEnum):
+    SECOND = 'S'
+    MINUTE = 'M'
+    HOUR = 'H'
+    DAY = 'D'
+    MIDNIGHT = 'MIDNIGHT'
+    MONDAY = 'W0'
+    TUESDAY = 'W1'
+    WEDNESDAY = 'W2'
+    THURSDAY = 'W3'
+    FRIDAY = 'W4'
+    SATURDAY = 'W5'
+    SUNDAY = 'W6'
+
 # Define custom log levels
 class CustomLogLevel(Enum):
     SUCCESS_LEVEL = 15
@@ -62,4 +132,27 @@ ERROR_DESC = {
     "313": "Max age days cannot be empty",
     "314": "Max storage size cannot be empty",
     "315": "Archive path cannot be empty",
+    "316": "Queue size must be a positive integer",
+    "317": "Invalid overflow policy",
+    "318": "Invalid fsync policy",
+    "319": "Buffer size, buffer records and intervals cannot be negative",
+    "320": "Invalid archive compression",
+    "321": "Archive compression level must be between 0 and 9",
+    "322": "Invalid log format",
+    "323": "MultiProcess and ShardPerProcess must be boolean values",
+    "324": "Index must be a boolean value",
+    "325": "Invalid rate limit policy, expected <rate>/s, <rate>/s:<burst> or 1/<N>",
+    "326": "Invalid rate limit key, expected a log level or <file>@<line>",
+    "327": "Rate limit summary interval must be positive",
+    "328": "CaptureCaller must be a boolean value",
+    "329": "Invalid rotation unit",
+    "330": "Rotation interval must be a positive integer",
+    "331": "Invalid rotation time, expected HH:MM or HH:MM:SS",
+    "332": "RotateUtc must be a boolean value",
+    "333": "Retention interval cannot be negative",
+    "334": "Flight recorder capacity and max keys must be positive integers",
+    "335": "Metrics dump interval cannot be negative",
+    "336": "Timing summary interval must be positive",
+    "337": "Timing threshold cannot be negative",
+    "338": "Flush interval must be positive when buffering is enabled",
 }
\ No newline at end of file
@@ -0,0 +1,105 @@
+import json
+import contextvars
+from .constants import LogConfig
+from .lazy import Lazy
+
+
+class LogContext:
+    __slots__ = ('request_id', 'module_name', 'data', '_values', '_data_text', '_data_json')
+
+    def __init__(self, request_id=None, module_name=None, data=None):
+        """
+        Initialize an immutable logging context.
+
+        The additional data is rendered on first use and then reused, so a
+        context that is never logged is never rendered, and logging with a
+        bound context does not join the data again on every call. Lazy data
+        values are computed when the data is first rendered.
+
+        Parameters:
+        request_id (str): The request ID of the context.
+        module_name (str): The module name of the context.
+        data (dict): Additional data of the context.
+        """
+
+        self.request_id = request_id
+        self.module_name = module_name
+        self.data = data or {}
+        self._values = None
+        self._data_text = None
+        self._data_json = None
+
+    @property
+    def values(self):
+        """
+        The additional data with the lazy values computed.
+        """
+
+        if self._values is None:
+            self._values = {k: v.value if v.__class__ is Lazy else v for k, v in self.data.items()}
+        return self._values
+
+    @property
+    def data_text(self):
+        """
+        The additional data as "key: value," items, rendered on first use and then reused.
+        """
+
+        if self._data_text is None:
+            self._data_text = ' '.join(f"{k}: {v}," for k, v in self.values.items()) if self.data else ''
+        return self._data_text
+
+    @property
+    def data_json(self):
+        """
+        The additional data as a JSON object, rendered on first use and then reused.
+        """
+
+        if self._data_json is None:
+            self._data_json = json.dumps(self.values, default=str, separators=(',', ':')) if self.data else '{}'
+        return self._data_json
+
+    @classmethod
+    def from_dict(cls, context):
+        """
+        Create a context from a dictionary as built by the with_* methods.
+
+        The request_id and module_name keys are taken as the request ID and
+        module name, every other key is additional data.
+
+        Parameters:
+        context (dict): The context dictionary.
+
+        Returns:
+        LogContext: The created context.
+        """
+
+        data = {k: v for k, v in context.items() if k not in (LogConfig.REQUEST_ID.value, LogConfig.MODULE_NAME.value)}
+        return cls(context.get(LogConfig.REQUEST_ID.value), context.get(LogConfig.MODULE_NAME.value), data)
+
+    def merge(self, other):
+        """
+        Create a context with the values of another context applied on top of this one.
+
+        Parameters:
+        other (LogContext): The context whose values take precedence.
+
+        Returns:
+        LogContext: The merged context.
+        """
+
+        if self is EMPTY_CONTEXT:
+            return other
+        if other is EMPTY_CONTEXT:
+            return self
+        return LogContext(
+            other.request_id if other.request_id is not None else self.request_id,
+            other.module_name if other.module_name is not None else self.module_name,
+            {**self.data, **other.data} if other.data else self.data
+        )
+
+
+EMPTY_CONTEXT = LogContext()
+
+# The context of the current thread or asyncio task, set with ZLogger.context().
+current_context = contextvars.ContextVar('zlogger_context', default=EMPTY_CONTEXT)
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+import unittest
+
+from zlogger.testing import create_logger
+
+
+class LogContextTest(unittest.TestCase):
+    def test_with_methods_do_not_leak_between_threads(self):
+        logger, [stream] = create_logger("context-test", LOG={'Level': 'debug'})
+        barrier = threading.Barrier(2)
+
+        def worker(request_id):
+            for _ in range(200):
+                logger.with_request_id(request_id)
+                barrier.wait()
+                logger.info("message")
+
+        threads = [threading.Thread(target=worker, args=(request_id,)) for request_id in ("one", "two")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(sum("requestID: one;" in line for line in lines), 200)
+        self.assertEqual(sum("requestID: two;" in line for line in lines), 200)
+
+    def test_bound_logger_renders_its_context(self):
+        logger, [stream] = create_logger("context-test", LOG={'Level': 'debug'})
+        bound = logger.bind(request_id="1234", module_name="resize", uuid=12345)
+        bound.with_additional_data({"time": "4s"}).info("done")
+        logger.info("unbound")
+
+        first, second = stream.getvalue().splitlines()
+        self.assertIn("module_name resize, requestID: 1234; uuid: 12345, time: 4s, done", first)
+        self.assertIn("module_name None, requestID: None;  unbound", second)
+        self.assertIn("function test_bound_logger_renders_its_context", first)
+
+    def test_context_is_local_to_asyncio_tasks(self):
+        logger, [stream] = create_logger("context-test", LOG={'Level': 'debug'})
+
+        async def handle(request_id):
+            with logger.context(request_id=request_id):
+                for _ in range(10):
+                    await asyncio.sleep(0)
+                    logger.info("message")
+
+        async def main():
+            await asyncio.gather(*(handle(str(index)) for index in range(5)))
+
+        asyncio.run(main())
+        lines = stream.getvalue().splitlines()
+        for index in range(5):
+            self.assertEqual(sum(f"requestID: {index};" in line for line in lines), 10)
+
+        logger.info("outside")
+        self.assertIn("requestID: None;", stream.getvalue().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,32 @@
 import os
 import time
-import shutil
+import sys
+import locale
+import logging
+import weakref
+import contextlib
 from logging.handlers import TimedRotatingFileHandler
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from .constants import FsyncPolicy, ArchiveCompression
+from .archiver import LogArchiver
+from .log_index import LogIndex, remove_index
+from .scheduler import scheduler
+
+try:
+    import fcntl
+except ImportError:
+    # Without fcntl (Windows) the multi-process mode cannot lock the log path.
+    fcntl = None
+
+# Handlers in multi-process mode, reinitialized in the child after a fork
+_multiprocess_handlers = weakref.WeakSet()
+
+# The growth (in bytes) of the log path before the storage limit is enforced again,
+# when the log path is over it with nothing left to evict
+STORAGE_CHECK_STEP = 1024 * 1024
 
 class CustomFileRotator(TimedRotatingFileHandler):
-    def __init__(self,name, file_extension,  filename, log_path, max_file_size, max_age_days, max_storage_size, archive_path=None, when='h', interval=1, backupCount=0, encoding=None, delay=False, utc=False, atTime=None):
+    def __init__(self,name, file_extension,  filename, log_path, max_file_size, max_age_days, max_storage_size, archive_path=None, when=None, interval=1, backupCount=0, encoding=None, delay=False, utc=False, atTime=None, retention_interval=60.0, buffer_size=0, buffer_records=0, flush_interval=1.0, fsync_policy=FsyncPolicy.NEVER.value, fsync_interval=1.0, archive_compression=ArchiveCompression.NONE.value, archive_compression_level=None, multiprocess=False, shard_per_process=False, index=False):
         """
         Initialize the CustomFileRotator handler.
 
@@ -18,16 +39,33 @@ class CustomFileRotator(TimedRotatingFileHandler):
         max_age_days (int): The maximum age (in days) before a log file is archived.
         max_storage_size (int): The maximum storage size (in bytes) for all log files before archiving.
         archive_path (str): The path where archived log files are stored.
-        when (str): The type of interval (e.g., 'h' for hours).
-        interval (int): The interval at which to rotate the log file.
+        when (str): The unit of the time-based rotation (S, M, H, D, MIDNIGHT or W0-W6), None to only rotate on size.
+        interval (int): The number of units between two time-based rotations.
         backupCount (int): The number of backup files to keep.
         encoding (str): The encoding to use for the log files.
         delay (bool): Whether to delay the creation of the log file.
         utc (bool): Whether to use UTC for time calculations.
         atTime (datetime.time): The time at which to perform the log rotation.
+        retention_interval (float): The time (in seconds) between two removals of the expired log files and
+            reconciliations of the storage counter with the disk, 0 to only enforce the storage limit while logging.
+        buffer_size (int): The number of buffered bytes that triggers a write, 0 to not buffer by size.
+        buffer_records (int): The number of buffered records that triggers a write, 0 to not buffer by count.
+        flush_interval (float): The maximum time (in seconds) a record stays in the buffer, 0 to only write
+            the buffer once a threshold is reached, a record may then stay buffered until the next records.
+        fsync_policy (str): When the log file is synced to disk, one of never, interval or on_error.
+        fsync_interval (float): The minimum time (in seconds) between two syncs with the interval policy.
+        archive_compression (str): The compression of the archived files, one of none, gzip or lzma.
+        archive_compression_level (int): The compression level of the archived files, the library default if None.
+        multiprocess (bool): Whether several processes log to the same log path.
+        shard_per_process (bool): In multi-process mode, whether each process writes its own log file.
+        index (bool): Whether to write a sidecar index of the request IDs and times of each log file.
         """
         
-        super().__init__(filename, when, interval, backupCount, encoding, delay, utc, atTime)
+        if multiprocess and shard_per_process:
+            filename = f'{filename}.{os.getpid()}'
+        # Read by computeRollover, which the base class calls.
+        self.time_rotation = when is not None
+        super().__init__(filename, when or 'MIDNIGHT', interval, backupCount, encoding, delay, utc, atTime)
         self.name = name
         self.file_extension = file_extension
         self.log_path = log_path
@@ -35,18 +73,216 @@ class CustomFileRotator(TimedRotatingFileHandler):
         self.max_age_days = max_age_days
         self.max_storage_size = max_storage_size
         self.archive_path = archive_path
+        self.retention_interval = retention_interval
         self.rolloverAt = self.computeRollover(int(time.time()))
-        
-        # If an archive path is specified, archive all log files in the current directory except the latest one.
+        self._archive_in_log_path = bool(archive_path) and self._is_in_log_path(archive_path)
+        # Log files queued for archiving and removal by the storage limit, with their size.
+        self._pending_evictions = {}
+
+        # Seed the running byte count of the log path once, it is then kept up to date on every
+        # write, rotation, deletion and archive and only reconciled with the disk occasionally.
+        self._storage_size = self.get_size(self.log_path)
+        # The running byte count from which the storage limit is enforced, raised while nothing
+        # is left to evict and reset by the next rollover.
+        self._storage_check_size = max_storage_size
+
+        # Records are rendered to bytes once and written to a binary stream, so the encoding
+        # the text stream would have used is resolved here.
+        if self.encoding in (None, 'locale'):
+            self._encoding = locale.getpreferredencoding(False)
+        else:
+            self._encoding = self.encoding
+
+        # Rendered records are buffered and written with a single write call once buffer_size bytes
+        # or buffer_records records are buffered, an ERROR record is logged or flush_interval elapses.
+        self.buffer_size = buffer_size
+        self.buffer_records = buffer_records
+        self.flush_interval = flush_interval
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self._buffering = buffer_size > 0 or buffer_records > 0
+        self._buffer_size_limit = buffer_size if buffer_size > 0 else sys.maxsize
+        self._buffer_records_limit = buffer_records if buffer_records > 0 else sys.maxsize
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._last_fsync = time.monotonic()
+        # Set when the interval policy skipped a sync, the scheduled flush then syncs the data.
+        self._fsync_pending = False
+
+        # In multi-process mode every record is a single O_APPEND write, and rotation, eviction
+        # and the age sweep are serialized between processes with a lock file in the log path.
+        # Unless each process writes its own shard, the name of the shared log file is kept in
+        # a pointer file so that processes follow a rotation made by another one.
+        self.multiprocess = multiprocess
+        self.shard_per_process = shard_per_process
+        log_directory = os.path.dirname(self.baseFilename)
+        self._lock_path = os.path.join(log_directory, '.' + name + file_extension + '.lock')
+        self._current_path = os.path.join(log_directory, '.' + name + file_extension + '.current')
+        self._lock_file = None
+        self._lock_pid = None
+        if multiprocess:
+            if fcntl is None:
+                logging.error("fcntl is not available, rotation is not coordinated between processes")
+            _multiprocess_handlers.add(self)
+            if not shard_per_process:
+                with self._process_lock():
+                    self._adopt_current_file()
+
+        # The sidecar index maps request IDs to record offsets, which are only known when no
+        # other process writes to the same file.
+        self._index = None
+        if index and not (multiprocess and not shard_per_process):
+            self._index = LogIndex(os.path.getsize(self.baseFilename) if os.path.exists(self.baseFilename) else 0)
+
+        # Set by close, read by the archiver and the scheduled jobs.
+        self._closing = False
+
+        # Rotated log files are archived by a background worker, so a rotation only costs a rename and an open.
+        self.archiver = None
         if self.archive_path:
-            current_directory = os.path.dirname(self.baseFilename)
-            files = sorted(os.listdir(current_directory))
-            for file in files[:-1]:
-                file_path = os.path.join(current_directory, file)
-                if os.path.isfile(file_path):
-                    shutil.copy2(file_path, os.path.join(self.archive_path, file))
+            self.archiver = LogArchiver(self.archive_path, archive_compression, archive_compression_level, self._on_archived, self._lock_path if multiprocess else None)
+            self.archiver.start()
+
+            # Archive the log files in the current directory, except the latest one, that are new
+            # or changed since the last start, according to the manifest of the archive path.
+            self.archiver.submit_sync(os.path.dirname(self.baseFilename), exclude=self.baseFilename)
+
+        # Counters of the records, bytes, rotations and evictions and of the time spent formatting and
+        # rotating, None while the metrics are disabled so that emit only pays for a None check.
+        self.metrics = None
+
+        # Time-based rotation, the removal of expired files and the reconciliation of the storage
+        # counter run on the scheduler thread, so they happen on time even when nothing is logged.
+        # Logging a record then only compares its time with rolloverAt.
+        self._pid = os.getpid()
+        self._jobs = []
+        if self.time_rotation:
+            self._jobs.append(scheduler.schedule(self.rolloverAt, self._scheduled_rollover))
+        if retention_interval > 0:
+            self._jobs.append(scheduler.schedule(time.time() + retention_interval, self._scheduled_retention))
+        # The buffer is written and the interval policy syncs on the scheduler thread too, so no record
+        # waits for the next write. A flush interval of 0 only writes the buffer once a threshold is reached.
+        flush_intervals = []
+        if self._buffering and flush_interval > 0:
+            flush_intervals.append(flush_interval)
+        if fsync_policy == FsyncPolicy.INTERVAL.value and fsync_interval > 0:
+            flush_intervals.append(fsync_interval)
+        if flush_intervals:
+            self._flush_interval = min(flush_intervals)
+            self._jobs.append(scheduler.schedule(time.time() + self._flush_interval, self._scheduled_flush))
     
     
+    @contextlib.contextmanager
+    def _process_lock(self):
+        """
+        Hold the lock file of the log path in multi-process mode, do nothing otherwise.
+        """
+
+        if not self.multiprocess or fcntl is None:
+            yield
+            return
+        # A lock file inherited through fork shares its lock with the parent, open our own.
+        if self._lock_pid != os.getpid():
+            self._lock_file = open(self._lock_path, 'a')
+            self._lock_pid = os.getpid()
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_current_file(self):
+        """
+        Read the path of the shared log file from the pointer file.
+
+        Returns:
+        str: The path of the shared log file, None if there is no pointer file.
+        """
+
+        try:
+            with open(self._current_path) as file:
+                name = file.read().strip()
+        except FileNotFoundError:
+            return None
+        return os.path.join(os.path.dirname(self._current_path), name) if name else None
+
+    def _write_current_file(self):
+        """
+        Point the pointer file to the current log file, atomically.
+        """
+
+        temp_path = f'{self._current_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as file:
+            file.write(os.path.basename(self.baseFilename))
+        os.replace(temp_path, self._current_path)
+
+    def _adopt_current_file(self):
+        """
+        Write to the shared log file if another process created it, otherwise share the current log file.
+        """
+
+        current = self._read_current_file()
+        if current and current != self.baseFilename and os.path.isfile(current):
+            previous = self.baseFilename
+            self._switch_file(current)
+            if os.path.isfile(previous) and os.path.getsize(previous) == 0:
+                os.remove(previous)
+        else:
+            self._write_current_file()
+
+    def _switch_file(self, file_path):
+        """
+        Write the buffered records and continue logging to another log file.
+
+        Parameters:
+        file_path (str): The path of the log file.
+        """
+
+        self._flush_buffer()
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        self.baseFilename = file_path
+        if not self.delay:
+            self.stream = self._open()
+
+    def _new_filename(self):
+        """
+        Build the path of a new log file from the current time, never reusing an existing file.
+
+        Returns:
+        str: The path of the new log file.
+        """
+
+        filename = os.path.join(os.path.dirname(self.baseFilename), self.name + self.file_extension) + time.strftime('-%Y-%m-%d-%H%M%S')
+        if self.shard_per_process:
+            filename = f'{filename}.{os.getpid()}'
+        # Several rotations can happen within the same second.
+        new_filename = filename
+        suffix = 0
+        while os.path.exists(new_filename):
+            suffix += 1
+            new_filename = f'{filename}.{suffix}'
+        return new_filename
+
+    def _after_fork(self):
+        """
+        Restart the background threads in a forked child, which only inherits the calling thread.
+        """
+
+        # The buffered records belong to the parent, which writes them itself.
+        self._buffer = []
+        self._buffered_bytes = 0
+        if self.archiver is not None:
+            archiver = self.archiver
+            self.archiver = LogArchiver(archiver.archive_path, archiver.compression, archiver.compression_level, archiver.on_archived, archiver.lock_path)
+            self.archiver.metrics = archiver.metrics
+            self.archiver.start()
+        if self.shard_per_process:
+            if self._index is not None:
+                self._index = LogIndex()
+            self._switch_file(self._new_filename())
+
     def get_size(self, path):
         """
         Calculate the total size of files in a directory.
@@ -62,25 +298,298 @@ class CustomFileRotator(TimedRotatingFileHandler):
         for dirpath, dirnames, filenames in os.walk(path):
             for f in filenames:
                 fp = os.path.join(dirpath, f)
-                total_size += os.path.getsize(fp)
+                try:
+                    total_size += os.path.getsize(fp)
+                except FileNotFoundError:
+                    # Rotated or removed by another process since the directory was listed.
+                    continue
         return total_size
+
+    def _is_in_log_path(self, path):
+        """
+        Check whether a path is located inside the log path.
+
+        Parameters:
+        path (str): The file or directory path.
+
+        Returns:
+        bool: True if the path is inside the log path, False otherwise.
+        """
+
+        log_path = os.path.abspath(self.log_path)
+        return os.path.commonpath([log_path, os.path.abspath(path)]) == log_path
+
+    def reconcile_storage(self):
+        """
+        Reset the running storage counter to the actual size of the log path on disk.
+        """
+
+        self._storage_size = self.get_size(self.log_path) - sum(self._pending_evictions.values())
+
+    def _remove_log_file(self, file_path):
+        """
+        Remove a log file and account for the freed bytes.
+
+        Parameters:
+        file_path (str): The path of the file to remove.
+        """
+
+        remove_index(file_path)
+        try:
+            size = os.path.getsize(file_path)
+            os.remove(file_path)
+        except FileNotFoundError:
+            return
+        if self._is_in_log_path(file_path):
+            self._storage_size -= size
+
+    def _save_index(self, file_path):
+        """
+        Write the sidecar index of a log file, if it has indexed records.
+
+        Parameters:
+        file_path (str): The path of the log file.
+        """
+
+        if self._index is None or not self._index.checkpoints:
+            return
+        self._index.binary = hasattr(self.formatter, 'format_bytes')
+        try:
+            self._index.save(file_path, os.path.getsize(file_path))
+        except OSError:
+            logging.exception("Failed to write the index of %s", file_path)
+
+    def _on_archived(self, file_path, archived_path, removed):
+        """
+        Account for a log file processed by the archiver.
+
+        Called from the archiver thread. The handler lock is taken, unless the
+        handler is closing and the lock is held while close waits for the
+        archiver (logging.shutdown closes the handlers holding their lock).
+
+        Parameters:
+        file_path (str): The path of the log file.
+        archived_path (str): The path of the archived file, None if the log file disappeared or could not be archived.
+        removed (bool): Whether the log file was to be removed after archiving.
+        """
+
+        locked = False
+        while not locked:
+            locked = self.lock.acquire(timeout=0.1)
+            if self._closing:
+                break
+        try:
+            if removed:
+                self._pending_evictions.pop(file_path, None)
+            if archived_path and self._archive_in_log_path:
+                with contextlib.suppress(FileNotFoundError):
+                    self._storage_size += os.path.getsize(archived_path)
+        finally:
+            if locked:
+                self.lock.release()
+
+    def enforce_storage_limit(self):
+        """
+        Remove the oldest log files, one at a time, until the log path is below the maximum storage size.
+        Files that are not archived yet are handed to the archiver, which removes them once archived.
+        """
+
+        with self._process_lock():
+            # The running counter may have drifted (other writers, encoding), confirm it on disk
+            # before deleting anything.
+            self.reconcile_storage()
+            if self._storage_size < self.max_storage_size:
+                self._storage_check_size = self.max_storage_size
+                return
+
+            current_directory = os.path.dirname(self.baseFilename)
+            shared_file = self._read_current_file() if self.multiprocess else None
+            for file in sorted(os.listdir(current_directory)):
+                if self._storage_size < self.max_storage_size:
+                    break
+                file_path = os.path.join(current_directory, file)
+                if not file.startswith(self.name) or file_path in (self.baseFilename, shared_file) or file_path in self._pending_evictions or not os.path.isfile(file_path):
+                    continue
+                if self.archiver and not self.archiver.is_archived(file):
+                    try:
+                        size = os.path.getsize(file_path)
+                    except FileNotFoundError:
+                        continue
+                    self._pending_evictions[file_path] = size
+                    self._storage_size -= size
+                    self.archiver.submit(file_path, remove=True)
+                else:
+                    self._remove_log_file(file_path)
+                if self.metrics is not None:
+                    self.metrics['evictions'] += 1
+
+            if self._storage_size < self.max_storage_size:
+                self._storage_check_size = self.max_storage_size
+            else:
+                # Nothing is left to evict (the current file, an archive in the log path or other
+                # files fill it), the log path is not walked again on every record.
+                self._storage_check_size = self._storage_size + STORAGE_CHECK_STEP
         
     def computeRollover(self, currentTime):
         """
         Compute the time at which the next rollover should occur.
 
+        S, M, H and D rotations happen on the multiples of the interval, counted
+        from midnight in local time (UTC with utc). MIDNIGHT and W0-W6 rotations
+        happen at atTime (midnight by default), every interval days or weeks.
+
         Parameters:
         currentTime (int): The current time in seconds since epoch.
 
         Returns:
-        int: The timestamp for the next rollover.
+        int: The timestamp for the next rollover, sys.maxsize without time-based rotation.
         """
         
-        if self.atTime is None:
-            # If atTime is not provided, use the current time for midnight rotation
-            return (currentTime // 86400 + 1) * 86400
-        else:
-            return self.atTime.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        if not self.time_rotation:
+            return sys.maxsize
+        if self.when == 'MIDNIGHT' or self.when.startswith('W'):
+            # The next atTime (on the rollover day for weekly rotations), then whole days or
+            # weeks until the first one of a period of interval days or weeks.
+            result = super().computeRollover(currentTime)
+            step_days = 7 if self.when.startswith('W') else 1
+            periods = self.interval // (step_days * 86400)
+            while self._day_number(result) // step_days % periods:
+                result = self._add_days(result, step_days)
+            return result
+        offset = 0 if self.utc else time.localtime(currentTime).tm_gmtoff
+        return int((currentTime + offset) // self.interval + 1) * self.interval - offset
+
+    def _day_number(self, timestamp):
+        """
+        Get the day number (proleptic Gregorian ordinal) of a timestamp, in local time or in UTC with utc.
+        """
+
+        if self.utc:
+            return datetime.fromtimestamp(timestamp, timezone.utc).toordinal()
+        return datetime.fromtimestamp(timestamp).toordinal()
+
+    def _add_days(self, timestamp, days):
+        """
+        Add days to a timestamp, keeping the same local time across daylight saving time changes.
+        """
+
+        if self.utc:
+            return timestamp + days * 86400
+        return int((datetime.fromtimestamp(timestamp) + timedelta(days=days)).timestamp())
+
+    def _scheduled_rollover(self):
+        """
+        Rotate the log file at the time boundary, from the scheduler thread.
+
+        An empty log file is kept, only the next boundary is computed.
+
+        Returns:
+        int: The time of the next run, None to stop.
+        """
+
+        if self._pid != os.getpid() and not self.multiprocess:
+            # A forked child does not rotate the files of its parent.
+            return None
+        with self.lock:
+            if self._closing:
+                return None
+            now = int(time.time())
+            if now >= self.rolloverAt:
+                if self._buffer or self._file_size() > 0:
+                    self.doRollover()
+                else:
+                    self.rolloverAt = self.computeRollover(now)
+            return self.rolloverAt
+
+    def _file_size(self):
+        try:
+            return os.path.getsize(self.baseFilename)
+        except FileNotFoundError:
+            return 0
+
+    def _expired_files(self):
+        """
+        List the log files older than max_age_days, by modification date.
+
+        Returns:
+        list: The paths of the expired log files.
+        """
+
+        current_date = datetime.now().date()
+        expired = []
+        for file in os.listdir(self.log_path):
+            if file.startswith(self.name):
+                file_path = os.path.join(self.log_path, file)
+                try:
+                    file_date = datetime.fromtimestamp(os.path.getmtime(file_path)).date()
+                except FileNotFoundError:
+                    continue
+                if self.max_age_days <= (current_date - file_date).days:
+                    expired.append(file_path)
+        return expired
+
+    def _scheduled_retention(self):
+        """
+        Remove the expired log files and enforce the storage limit, from the scheduler thread.
+
+        The log path is listed without holding the handler lock, which is only
+        taken to remove files and to update the storage counter.
+
+        Returns:
+        float: The time of the next run, None to stop.
+        """
+
+        if self._pid != os.getpid() and not self.multiprocess:
+            return None
+        expired = self._expired_files() if self.max_age_days > 0 else []
+        with self.lock:
+            if self._closing:
+                return None
+            if expired:
+                with self._process_lock():
+                    shared_file = self._read_current_file() if self.multiprocess else None
+                    for file_path in expired:
+                        if file_path not in (self.baseFilename, shared_file):
+                            self._remove_log_file(file_path)
+                            if self.metrics is not None:
+                                self.metrics['expired'] += 1
+            self.reconcile_storage()
+            if self._storage_size >= self.max_storage_size:
+                self.enforce_storage_limit()
+        return time.time() + self.retention_interval
+
+    def _open(self):
+        """
+        Open the current log file as an unbuffered binary stream.
+
+        The file offset is read once here and then tracked by the handler,
+        so writing a record does not need any seek or tell call.
+
+        Returns:
+        io.FileIO: The opened log file.
+        """
+
+        stream = open(self.baseFilename, 'ab', buffering=0)
+        self._offset = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def render(self, record):
+        """
+        Render a record to the bytes that are written to the log file.
+
+        Parameters:
+        record (LogRecord): The log record that is being processed.
+
+        Returns:
+        bytes: The formatted and encoded record, terminator included.
+        """
+
+        format_bytes = getattr(self.formatter, 'format_bytes', None)
+        if format_bytes is not None:
+            # Binary formatters frame the record themselves, no terminator is added.
+            return format_bytes(record)
+        msg = self.format(record) + self.terminator
+        return msg.encode(self._encoding, self.errors or 'strict')
 
     def shouldRollover(self, record):
         """
@@ -93,87 +602,349 @@ class CustomFileRotator(TimedRotatingFileHandler):
         bool: True if rollover should occur, False otherwise.
         """
         
+        return self._should_rollover(len(self.render(record)), record.created)
+
+    def _should_rollover(self, size, created):
+        """
+        Determine if the log file should be rolled over before writing size bytes.
+
+        Parameters:
+        size (int): The size in bytes of the rendered record.
+        created (float): The creation time of the record.
+
+        Returns:
+        bool: True if rollover should occur, False otherwise.
+        """
+
+        # A record created after the time boundary goes to the next file, even if the scheduler is late.
+        if created >= self.rolloverAt:
+            return True
         if self.stream is None:
             self.stream = self._open()
+        if self.multiprocess and not self.shard_per_process:
+            # Other processes append to the shared file, and it may already be rotated by one of them.
+            self._offset = os.fstat(self.stream.fileno()).st_size + self._buffered_bytes
         if self.max_file_size > 0:
-            msg = "%s\n" % self.format(record)
-            self.stream.seek(0, 2)
-            if self.stream.tell() + len(msg) >= self.max_file_size:
+            if self._offset + size >= self.max_file_size:
                 return True
-      
+
         # Check if the log path has reached the maximum storage size.
         # If it has, remove the oldest log file one at a time until the size is below the limit.
-        if self.get_size(self.log_path) >= self.max_storage_size:
-            curent_directory = os.path.dirname(self.baseFilename)
-            files = sorted(os.listdir(self.log_path))
-            
-            file_archive_path = os.path.join(self.archive_path, files[1])            
-            file_path = os.path.join(curent_directory, files[1])
-            if os.path.isfile(file_archive_path):
-                os.remove(file_path)
-            else:
-                shutil.copy2(file_path, self.archive_path)
-                os.remove(file_path)
+        if self._storage_size >= self._storage_check_size:
+            self.enforce_storage_limit()
                 
         return False
+
+    def emit(self, record):
+        """
+        Emit a record, rolling the log file over if needed.
+
+        The record is rendered once and the same buffer is used for the
+        rollover check and for the write.
+
+        Parameters:
+        record (LogRecord): The log record that is being processed.
+        """
+
+        try:
+            metrics = self.metrics
+            if metrics is None:
+                data = self.render(record)
+                if self._should_rollover(len(data), record.created):
+                    self.doRollover()
+            else:
+                start = time.perf_counter_ns()
+                data = self.render(record)
+                rendered = time.perf_counter_ns()
+                rollover = self._should_rollover(len(data), record.created)
+                metrics['format_ns'] += rendered - start
+                metrics['rollover_check_ns'] += time.perf_counter_ns() - rendered
+                if rollover:
+                    self.doRollover()
+                metrics['records'] += 1
+                metrics['bytes'] += len(data)
+            if self.stream is None:
+                self.stream = self._open()
+            if self._index is not None:
+                self._index.add(self._offset, record)
+            self._offset += len(data)
+            self._storage_size += len(data)
+            is_error = record.levelno >= logging.ERROR
+            if self._buffering:
+                self._buffer.append(data)
+                self._buffered_bytes += len(data)
+                if is_error or self._buffered_bytes >= self._buffer_size_limit or len(self._buffer) >= self._buffer_records_limit:
+                    self._flush_buffer(is_error)
+            else:
+                self.stream.write(data)
+                self._sync(is_error)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
     
+    def handle_many(self, records):
+        """
+        Emit records already filtered by the level of the handler, holding the handler lock once.
+
+        Parameters:
+        records (list): The log records, in creation order.
+        """
+
+        with self.lock:
+            self.emit_many(records)
+
+    def emit_many(self, records):
+        """
+        Emit records with one rollover check and one write for each log file they go to.
+
+        The records are rendered in a loop and checked against the size and time
+        limits as a whole. A batch that would cross a limit is split record by
+        record across the log files. A record that fails to render is reported
+        on its own and the other records are still written.
+
+        Parameters:
+        records (list): The log records, in creation order.
+        """
+
+        try:
+            metrics = self.metrics
+            start = time.perf_counter_ns()
+            chunks = []
+            written = []
+            for record in records:
+                try:
+                    chunks.append(self.render(record))
+                except RecursionError:
+                    raise
+                except Exception:
+                    self.handleError(record)
+                    continue
+                written.append(record)
+            rendered = time.perf_counter_ns()
+            if not written:
+                return
+            records = written
+            size = sum(map(len, chunks))
+            rollover = self._should_rollover(size, records[-1].created)
+            if metrics is not None:
+                metrics['format_ns'] += rendered - start
+                metrics['rollover_check_ns'] += time.perf_counter_ns() - rendered
+                metrics['records'] += len(records)
+                metrics['bytes'] += size
+            if not rollover:
+                self._write_many(records, chunks)
+                return
+            first = 0
+            size = 0
+            for i, record in enumerate(records):
+                if self._should_rollover(size + len(chunks[i]), record.created):
+                    if i > first:
+                        self._write_many(records[first:i], chunks[first:i])
+                    self.doRollover()
+                    first = i
+                    size = 0
+                size += len(chunks[i])
+            self._write_many(records[first:], chunks[first:])
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(records[0])
+
+    def _write_many(self, records, chunks):
+        """
+        Write rendered records to the current log file with a single write call, or buffer them.
+
+        Parameters:
+        records (list): The log records.
+        chunks (list): The rendered records.
+        """
+
+        if self.stream is None:
+            self.stream = self._open()
+        if self._index is not None:
+            offset = self._offset
+            for record, data in zip(records, chunks):
+                self._index.add(offset, record)
+                offset += len(data)
+        size = sum(map(len, chunks))
+        self._offset += size
+        self._storage_size += size
+        is_error = max(record.levelno for record in records) >= logging.ERROR
+        if self._buffering:
+            self._buffer.extend(chunks)
+            self._buffered_bytes += size
+            if is_error or self._buffered_bytes >= self._buffer_size_limit or len(self._buffer) >= self._buffer_records_limit:
+                self._flush_buffer(is_error)
+        else:
+            self.stream.write(b''.join(chunks))
+            self._sync(is_error)
+
+    def _flush_buffer(self, is_error=False):
+        """
+        Write the buffered records to the log file with a single write call.
+
+        Parameters:
+        is_error (bool): Whether the flush is forced by an ERROR record.
+        """
+
+        if self._buffer and self.stream is not None:
+            data = b''.join(self._buffer)
+            self._buffer = []
+            self._buffered_bytes = 0
+            self.stream.write(data)
+            self._sync(is_error)
+
+    def _sync(self, is_error=False):
+        """
+        Sync the log file to disk according to the fsync policy.
+
+        Parameters:
+        is_error (bool): Whether the last written data contains an ERROR record.
+        """
+
+        if self.fsync_policy == FsyncPolicy.NEVER.value:
+            return
+        if self.fsync_policy == FsyncPolicy.ON_ERROR.value:
+            if is_error:
+                os.fsync(self.stream.fileno())
+            return
+        now = time.monotonic()
+        if now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self.stream.fileno())
+            self._last_fsync = now
+            self._fsync_pending = False
+        else:
+            self._fsync_pending = True
+
+    def _scheduled_flush(self):
+        """
+        Write the buffered records and sync the data left unsynced by the interval policy, from the scheduler thread.
+
+        Returns:
+        float: The time of the next run, None to stop.
+        """
+
+        with self.lock:
+            if self._closing:
+                return None
+            if self.stream is not None:
+                self._flush_buffer()
+                if self._fsync_pending:
+                    self._sync()
+        return time.time() + self._flush_interval
+
+    def flush(self):
+        """
+        Write the buffered records and flush the stream.
+        """
+
+        with self.lock:
+            self._flush_buffer()
+            super().flush()
+
+    def close(self):
+        """
+        Stop the scheduled jobs, write the buffered records, close the log file and
+        wait for the archiver to process the queued files.
+
+        Closing a closed handler, as logging.shutdown does, has no effect.
+        """
+
+        with self.lock:
+            if self._closing:
+                return
+            self._closing = True
+        for job in self._jobs:
+            scheduler.cancel(job)
+        super().close()
+        self._save_index(self.baseFilename)
+        if self.archiver is not None:
+            self.archiver.stop()
+
     def doRollover(self):
         """
         Perform the rollover of the log file.
+
+        In multi-process mode the rollover holds the lock file of the log path,
+        and a process whose shared log file was already rotated by another
+        process follows it instead of rotating again.
+        """
+
+        if self.metrics is None:
+            self._do_rollover()
+            return
+        start = time.perf_counter_ns()
+        self._do_rollover()
+        self.metrics['rollover_ns'] += time.perf_counter_ns() - start
+
+    def _do_rollover(self):
+        """
+        Rotate the log file, or follow the shared log file rotated by another process.
+        """
+
+        with self._process_lock():
+            if self.multiprocess and not self.shard_per_process:
+                current = self._read_current_file()
+                if current and current != self.baseFilename and os.path.isfile(current):
+                    self._switch_file(current)
+                    self.rolloverAt = self.computeRollover(int(time.time()))
+                    return
+            self._rotate()
+            if self.multiprocess:
+                if not self.shard_per_process:
+                    self._write_current_file()
+                # The running storage counter only sees the writes of this process.
+                self.reconcile_storage()
+
+    def _rotate(self):
+        """
+        Switch to a new log file and queue the previous one for archiving.
+
+        Expired log files are removed by the scheduled retention pass.
         """
         
+        # Write the buffered records to the current file before switching to the new one.
+        self._flush_buffer()
         if self.stream:
             self.stream.close()
             self.stream = None
         currentTime = int(time.time())
-        dstNow = time.localtime(currentTime)[-1]
-        t = self.rolloverAt - self.interval
-        if self.utc:
-            timeTuple = time.gmtime(t)
-        else:
-            timeTuple = time.localtime(t)
-            dstThen = timeTuple[-1]
-            if dstNow != dstThen:
-                if dstNow:
-                    addend = 3600
-                else:
-                    addend = -3600
-                timeTuple = time.localtime(t + addend)
         
-        # At the start of the rollover, copy the current log file to the archive path
+        # At the start of the rollover, queue the current log file for archiving
         # and create a new log file with the following pattern:
-        shutil.copy2(self.baseFilename, self.archive_path)
-        self.baseFilename = os.path.join(os.path.dirname(self.baseFilename), self.name + self.file_extension) + time.strftime('-%Y-%m-%d-%H%M%S')
+        rotated_filename = self.baseFilename
+        if self.metrics is not None:
+            self.metrics['rotations'] += 1
+        self._save_index(rotated_filename)
+        if self._index is not None:
+            self._index = LogIndex()
+        self.baseFilename = self._new_filename()
         dfn = self.rotation_filename(self.baseFilename)
         if os.path.exists(dfn):
             # Remove the destination file if it already exists
-            os.remove(dfn)
+            self._remove_log_file(dfn)
         self.rotate(self.baseFilename, dfn)
         
-        # if it hit the  the max_age_day Get the current date, Get the date of the last modification of the log file
-        # then Calculate the age of the log file in days and remove the log file if it is older than the max age
-        if self.max_age_days > 0:
-            current_date = datetime.now().date()
-            for file in os.listdir(self.log_path):
-                if file.startswith(self.name):
-                    file_path = os.path.join(self.log_path, file)
-                    file_date = datetime.fromtimestamp(os.path.getmtime(file_path)).date()
-                    age_days = (current_date-file_date).days
-                    if self.max_age_days <= age_days:
-                        os.remove(file_path)
-
-        # Determine the files that are in the log path but not in the archive path, copy that file from log/ path to archive_path
-        # if dose not exist
-        if self.archive_path:
-            archive_file = list(set(os.listdir(self.log_path)) - set(os.listdir(self.archive_path)))
-            for file in archive_file:
-                file_path = os.path.join(self.log_path, file)
-                shutil.copy2(file_path, self.archive_path)
+        if self.archiver:
+            self.archiver.submit(rotated_filename)
+        # The rotated file can be evicted now.
+        self._storage_check_size = self.max_storage_size
                 
         if self.backupCount > 0:
             for s in self.getFilesToDelete():
-                os.remove(s)
+                self._remove_log_file(s)
         if not self.delay:
             self.stream = self._open()
                 
         self.rolloverAt = self.computeRollover(currentTime)
+
+
+
+def _reinit_after_fork():
+    for handler in list(_multiprocess_handlers):
+        handler._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
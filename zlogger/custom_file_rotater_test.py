@@ -0,0 +1,257 @@
+import gzip
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, time as day_time, timezone
+from unittest import mock
+
+from zlogger.archiver import LogArchiver
+from zlogger.custom_file_rotater import CustomFileRotator
+
+
+class CustomFileRotatorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.log_path = os.path.join(self.tmp_dir, "logs")
+        self.archive_path = os.path.join(self.tmp_dir, "archive")
+        os.makedirs(self.log_path)
+        os.makedirs(self.archive_path)
+
+    def create_handler(self, file_name="odapi.log-2024-01-01-000000", **kwargs):
+        params = dict(max_file_size=0, max_age_days=0, max_storage_size=1 << 30)
+        params.update(kwargs)
+        handler = CustomFileRotator(
+            "odapi",
+            ".log",
+            filename=os.path.join(self.log_path, file_name),
+            log_path=self.log_path,
+            archive_path=self.archive_path,
+            **params
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.addCleanup(handler.close)
+        return handler
+
+    def make_record(self, message):
+        return logging.LogRecord("odapi", logging.INFO, __file__, 1, message, None, None)
+
+    def test_storage_size_is_tracked_without_walking_the_log_path(self):
+        handler = self.create_handler()
+        with mock.patch.object(handler, "get_size", wraps=handler.get_size) as get_size:
+            for _ in range(100):
+                handler.emit(self.make_record("x" * 9))
+        handler.flush()
+
+        self.assertEqual(get_size.call_count, 0)
+        self.assertEqual(handler._storage_size, 1000)
+        self.assertEqual(handler._storage_size, handler.get_size(self.log_path))
+
+    def test_records_are_formatted_once_and_offset_is_tracked(self):
+        handler = self.create_handler(max_file_size=1 << 20)
+        with mock.patch.object(handler, "format", wraps=handler.format) as format_record:
+            for _ in range(10):
+                handler.emit(self.make_record("\u00e9t\u00e9"))
+
+        self.assertEqual(format_record.call_count, 10)
+        self.assertEqual(handler._offset, os.path.getsize(handler.baseFilename))
+
+    def test_buffered_records_are_written_together(self):
+        handler = self.create_handler(buffer_records=3, flush_interval=0)
+        handler.emit(self.make_record("first"))
+        handler.emit(self.make_record("second"))
+        self.assertEqual(os.path.getsize(handler.baseFilename), 0)
+
+        handler.emit(self.make_record("third"))
+        with open(handler.baseFilename) as file:
+            self.assertEqual(file.read(), "first\nsecond\nthird\n")
+
+    def test_error_record_flushes_the_buffer(self):
+        handler = self.create_handler(buffer_size=1 << 20, flush_interval=0)
+        handler.emit(self.make_record("info"))
+        error = self.make_record("error")
+        error.levelno, error.levelname = logging.ERROR, "ERROR"
+        handler.emit(error)
+
+        with open(handler.baseFilename) as file:
+            self.assertEqual(file.read(), "info\nerror\n")
+
+    def test_buffer_is_written_on_schedule_and_close_does_not_wait_for_the_flush(self):
+        handler = self.create_handler(buffer_records=10, flush_interval=0.05)
+        handler.emit(self.make_record("buffered"))
+        deadline = time.time() + 5
+        while os.path.getsize(handler.baseFilename) == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        with open(handler.baseFilename) as file:
+            self.assertEqual(file.read(), "buffered\n")
+
+        # logging.shutdown closes the handlers holding their lock, while the flush may be due.
+        with handler.lock:
+            handler.emit(self.make_record("last"))
+            time.sleep(0.1)
+            handler.close()
+        with open(handler.baseFilename) as file:
+            self.assertEqual(file.read(), "buffered\nlast\n")
+
+    def test_interval_policy_syncs_the_last_write_on_schedule(self):
+        with mock.patch("os.fsync") as fsync:
+            handler = self.create_handler(fsync_policy="interval", fsync_interval=0.2)
+            handler.emit(self.make_record("first"))
+            handler.emit(self.make_record("second"))
+            self.assertTrue(handler._fsync_pending)
+            deadline = time.time() + 5
+            while handler._fsync_pending and time.time() < deadline:
+                time.sleep(0.01)
+
+        self.assertGreater(fsync.call_count, 0)
+        self.assertFalse(handler._fsync_pending)
+
+    def test_rollover_writes_the_buffer_to_the_previous_file(self):
+        handler = self.create_handler(max_file_size=12, buffer_size=1 << 20, flush_interval=0)
+        previous_file = handler.baseFilename
+        handler.emit(self.make_record("first"))
+        handler.emit(self.make_record("second"))
+
+        with open(previous_file) as file:
+            self.assertEqual(file.read(), "first\n")
+
+    def test_storage_limit_evicts_oldest_files_first(self):
+        for index in range(3):
+            with open(os.path.join(self.log_path, "odapi.log-2023-01-0%d-000000" % (index + 1)), "w") as file:
+                file.write("x" * 100)
+
+        handler = self.create_handler(max_storage_size=150)
+        handler.emit(self.make_record("y"))
+        handler.flush()
+        handler.archiver.wait()
+
+        remaining = sorted(os.listdir(self.log_path))
+        self.assertEqual(remaining, ["odapi.log-2023-01-03-000000", "odapi.log-2024-01-01-000000"])
+        self.assertIn("odapi.log-2023-01-01-000000", os.listdir(self.archive_path))
+        self.assertEqual(handler._storage_size, handler.get_size(self.log_path))
+
+    def test_failed_eviction_is_released_for_a_retry(self):
+        with open(os.path.join(self.log_path, "odapi.log-2023-01-01-000000"), "w") as file:
+            file.write("x" * 100)
+        handler = self.create_handler(max_storage_size=50)
+        handler.archiver.wait()
+        # Archived by the startup sync, the archived copy is lost.
+        os.remove(os.path.join(self.archive_path, "odapi.log-2023-01-01-000000"))
+
+        with mock.patch.object(handler.archiver, "archive", side_effect=PermissionError()), self.assertLogs(level=logging.ERROR):
+            with handler.lock:
+                handler.emit(self.make_record("y"))
+                self.assertEqual(len(handler._pending_evictions), 1)
+            handler.archiver.wait()
+
+        self.assertEqual(handler._pending_evictions, {})
+        self.assertIn("odapi.log-2023-01-01-000000", os.listdir(self.log_path))
+
+    def test_storage_limit_backs_off_when_nothing_can_be_evicted(self):
+        with open(os.path.join(self.log_path, "other.txt"), "w") as file:
+            file.write("x" * 200)
+
+        handler = self.create_handler(max_storage_size=150)
+        with mock.patch.object(handler, "get_size", wraps=handler.get_size) as get_size:
+            for _ in range(1000):
+                handler.emit(self.make_record("y" * 9))
+        self.assertEqual(get_size.call_count, 1)
+
+        with mock.patch.object(handler, "get_size", wraps=handler.get_size) as get_size:
+            handler.doRollover()
+            handler.emit(self.make_record("y" * 9))
+        handler.archiver.wait()
+        self.assertEqual(get_size.call_count, 1)
+        self.assertNotIn("odapi.log-2024-01-01-000000", os.listdir(self.log_path))
+
+    def test_startup_sync_only_archives_new_or_changed_files(self):
+        for index in range(3):
+            with open(os.path.join(self.log_path, "odapi.log-2023-01-0%d-000000" % (index + 1)), "w") as file:
+                file.write("x" * 100)
+        self.create_handler(archive_compression="gzip").close()
+        archived_file = os.path.join(self.archive_path, "odapi.log-2023-01-01-000000.gz")
+        archived_mtime = os.stat(archived_file).st_mtime_ns
+        with open(os.path.join(self.log_path, "odapi.log-2023-01-02-000000"), "a") as file:
+            file.write("changed")
+
+        with mock.patch.object(LogArchiver, "archive", autospec=True, side_effect=LogArchiver.archive) as archive:
+            self.create_handler(file_name="odapi.log-2024-01-02-000000", archive_compression="gzip").close()
+
+        archived = sorted(os.path.basename(call.args[1]) for call in archive.call_args_list)
+        self.assertEqual(archived, ["odapi.log-2023-01-02-000000", "odapi.log-2024-01-01-000000"])
+        self.assertEqual(os.stat(archived_file).st_mtime_ns, archived_mtime)
+
+    def test_rotated_files_are_hard_linked_into_the_archive(self):
+        handler = self.create_handler(max_file_size=12)
+        rotated_file = handler.baseFilename
+        handler.emit(self.make_record("first"))
+        handler.emit(self.make_record("second"))
+        handler.archiver.wait()
+
+        archived_file = os.path.join(self.archive_path, os.path.basename(rotated_file))
+        self.assertTrue(os.path.samefile(rotated_file, archived_file))
+
+    def test_rotated_files_are_compressed_in_the_background(self):
+        handler = self.create_handler(max_file_size=12, archive_compression="gzip")
+        rotated_file = handler.baseFilename
+        handler.emit(self.make_record("first"))
+        handler.emit(self.make_record("second"))
+        handler.archiver.wait()
+
+        archived_file = os.path.join(self.archive_path, os.path.basename(rotated_file) + ".gz")
+        with gzip.open(archived_file, "rb") as file:
+            self.assertEqual(file.read(), b"first\n")
+        self.assertEqual(os.path.getmtime(archived_file), os.path.getmtime(rotated_file))
+        self.assertEqual([name for name in os.listdir(self.archive_path) if name.endswith(".tmp")], [])
+
+    def test_rollover_time_respects_when_interval_at_time_and_utc(self):
+        now = datetime(2024, 1, 3, 13, 20, 5, tzinfo=timezone.utc).timestamp()
+
+        def next_rollover(**kwargs):
+            handler = self.create_handler(utc=True, **kwargs)
+            return datetime.fromtimestamp(handler.computeRollover(int(now)), timezone.utc)
+
+        self.assertEqual(next_rollover(when='H', interval=2), datetime(2024, 1, 3, 14, tzinfo=timezone.utc))
+        self.assertEqual(next_rollover(when='M', interval=15), datetime(2024, 1, 3, 13, 30, tzinfo=timezone.utc))
+        self.assertEqual(next_rollover(when='MIDNIGHT', atTime=day_time(3)), datetime(2024, 1, 4, 3, tzinfo=timezone.utc))
+        self.assertEqual(next_rollover(when='MIDNIGHT', interval=2).toordinal() % 2, 0)
+        self.assertEqual(next_rollover(when='W0', atTime=day_time(3)), datetime(2024, 1, 8, 3, tzinfo=timezone.utc))
+        self.assertEqual(self.create_handler().computeRollover(int(now)), sys.maxsize)
+
+    def test_idle_log_file_is_rotated_and_expired_files_removed_on_schedule(self):
+        expired_file = os.path.join(self.log_path, "odapi.log-2023-01-01-000000")
+        with open(expired_file, "w") as file:
+            file.write("old")
+        os.utime(expired_file, (time.time() - 3 * 86400,) * 2)
+        handler = self.create_handler(when='S', max_age_days=1, retention_interval=0.1)
+        rotated_file = handler.baseFilename
+        handler.emit(self.make_record("first"))
+
+        deadline = time.time() + 5
+        while (handler.baseFilename == rotated_file or os.path.exists(expired_file)) and time.time() < deadline:
+            time.sleep(0.05)
+        handler.archiver.wait()
+
+        self.assertNotEqual(handler.baseFilename, rotated_file)
+        self.assertFalse(os.path.exists(expired_file))
+        self.assertTrue(os.path.exists(os.path.join(self.archive_path, os.path.basename(rotated_file))))
+
+    def test_record_created_after_the_boundary_goes_to_the_next_file(self):
+        handler = self.create_handler()
+        previous_file = handler.baseFilename
+        handler.emit(self.make_record("before"))
+        handler.rolloverAt = time.time() - 1
+        handler.emit(self.make_record("after"))
+
+        self.assertNotEqual(handler.baseFilename, previous_file)
+        with open(handler.baseFilename) as file:
+            self.assertEqual(file.read(), "after\n")
+        self.assertEqual(handler.rolloverAt, sys.maxsize)
+
+
+if __name__ == '__main__':
+    unittest.main()
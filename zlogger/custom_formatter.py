@@ -1,18 +1,170 @@
+import re
+import time
 import datetime
 import logging
 
+# Example of how the fmt prints:
+# INFO       2022/01/01 12:34:56.789000 called from /home/zfarahi/Desktop/Documents/project_odapi/zlogger/zlogger/custom_formatter.py, line 10, function __init__, module_name custom_formatter, requestID: 12345; Some additional data This is a log message
+LOG_FORMAT = '%(levelname)-10s %(asctime1)s called from %(file_path)s, line #%(line_no)s, function %(function_name)s, module_name %(module_name)s, requestID: %(request_id)s; %(data)s %(message)s'
+
+# Fields of the caller, None without caller capture and rendered empty
+CALLER_FIELDS = ('file_path', 'line_no', 'function_name')
+
+# A %-style field (name, flags, width, precision and conversion) or an escaped percent sign
+FIELD_PATTERN = re.compile(r'%%|%\((\w+)\)([#0 +-]*)(\d*)(?:\.(\d+))?([diouxXeEfFgGcrsa])')
+
+
 class CustomFormatter(logging.Formatter):
-    def __init__(self):
-        # Example of how the fmt prints:
-        # INFO       2022/01/01 12:34:56.789000 called from /home/zfarahi/Desktop/Documents/project_odapi/zlogger/zlogger/custom_formatter.py, line 10, function __init__, module_name custom_formatter, requestID: 12345; Some additional data This is a log message
-        super().__init__(
-            fmt='%(levelname)-10s %(asctime1)s called from %(file_path)s, line %(line_no)s, function %(function_name)s, module_name %(module_name)s, requestID: %(request_id)s; %(data)s %(message)s',
-        )
+    def __init__(self, fmt=LOG_FORMAT):
+        """
+        Initialize the CustomFormatter formatter.
+
+        The %-style layout is compiled once into a render function, so formatting
+        a record is a single f-string evaluation instead of a generic %-format.
+
+        Parameters:
+        fmt (str): The %-style layout of a log line.
+        """
+
+        super().__init__(fmt=fmt)
+        self._render = self.compile(fmt)
+        # Timestamp prefix of the last formatted second, as (second, prefix)
+        self._cached_prefix = (None, None)
+
+    @staticmethod
+    def compile(fmt):
+        """
+        Compile a %-style layout into a render function.
+
+        Parameters:
+        fmt (str): The %-style layout of a log line.
+
+        Returns:
+        function: A function taking the record, its attribute dictionary and the
+            formatter, and returning the formatted line.
+        """
+
+        parts = []
+        position = 0
+        for match in FIELD_PATTERN.finditer(fmt):
+            parts.append(_escape(fmt[position:match.start()]))
+            if match.group(0) == '%%':
+                parts.append('%')
+            else:
+                parts.append('{' + _compile_field(*match.groups()) + '}')
+            position = match.end()
+        parts.append(_escape(fmt[position:]))
+
+        source = "def render(record, d, formatter):\n    return f'" + ''.join(parts) + "'\n"
+        namespace = {}
+        exec(source, {'_percent': _percent}, namespace)
+        return namespace['render']
+
+    def format_asctime(self, created):
+        """
+        Format a record creation time as "2022/01/01 12:34:56.789000".
+
+        The part up to the seconds is cached, only the microseconds are formatted for each record.
+
+        Parameters:
+        created (float): The creation time of the record in seconds since epoch.
+
+        Returns:
+        str: The formatted timestamp.
+        """
+
+        seconds = int(created)
+        cached_seconds, prefix = self._cached_prefix
+        if cached_seconds != seconds:
+            prefix = time.strftime('%Y/%m/%d %H:%M:%S', time.localtime(seconds))
+            self._cached_prefix = (seconds, prefix)
+        return f"{prefix}.{int((created - seconds) * 1000000):06d}"
+
+    def format(self, record):
+        """
+        Format a record with the compiled layout.
+
+        Parameters:
+        record (LogRecord): The log record that is being processed.
+
+        Returns:
+        str: The formatted record.
+        """
+
+        record.message = record.getMessage()
+        s = self._render(record, record.__dict__, self)
+        if record.exc_info:
+            # Cache the traceback text to avoid converting it multiple times
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            if s[-1:] != "\n":
+                s = s + "\n"
+            s = s + record.exc_text
+        if record.stack_info:
+            if s[-1:] != "\n":
+                s = s + "\n"
+            s = s + self.formatStack(record.stack_info)
+        return s
 
     @staticmethod
     def formatTime(self, datefmt=None):
         # Example: format timestamp as "2022/01/01 12:34:56.789000"
-        timestamp = datetime.datetime.fromtimestamp(datetime.datetime.now().timestamp())
-        microseconds = timestamp.microsecond // 1000
-        formatted_timestamp = f"{timestamp:%Y/%m/%d %H:%M:%S}.{microseconds:06d}"
-        return formatted_timestamp
\ No newline at end of file
+        timestamp = datetime.datetime.now()
+        formatted_timestamp = f"{timestamp:%Y/%m/%d %H:%M:%S}.{timestamp.microsecond:06d}"
+        return formatted_timestamp
+
+
+def _escape(text):
+    """
+    Escape literal text for an f-string source.
+
+    Parameters:
+    text (str): The literal text.
+
+    Returns:
+    str: The escaped text.
+    """
+
+    for char, escaped in (('\\', '\\\\'), ("'", "\\'"), ('\n', '\\n'), ('\r', '\\r'), ('{', '{{'), ('}', '}}')):
+        text = text.replace(char, escaped)
+    return text
+
+
+def _compile_field(name, flags, width, precision, conversion):
+    """
+    Compile a %-style field into an f-string replacement field.
+
+    Parameters:
+    name (str): The record attribute name.
+    flags (str): The conversion flags.
+    width (str): The minimum field width.
+    precision (str): The precision.
+    conversion (str): The conversion type.
+
+    Returns:
+    str: The replacement field expression.
+    """
+
+    if name == 'asctime1':
+        value = 'formatter.format_asctime(record.created)'
+    elif name == 'asctime':
+        value = 'formatter.formatTime(record, formatter.datefmt)'
+    elif name in CALLER_FIELDS:
+        value = f'(d["{name}"] or "")'
+    else:
+        value = f'd["{name}"]'
+    if conversion != 's':
+        spec = '%' + flags + width + ('.' + precision if precision else '') + conversion
+        return f'_percent("{spec}", {value})'
+
+    spec = ''
+    if width:
+        spec += ('<' if '-' in flags else '>') + width
+    if precision:
+        spec += '.' + precision
+    return f"{value}!s:{spec}" if spec else f"{value}!s"
+
+
+def _percent(spec, value):
+    return spec % (value,)
@@ -0,0 +1,101 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from .constants import LogConfig
+
+# Read on every recorded call, an enum lookup costs more than the rest of the call
+REQUEST_ID = LogConfig.REQUEST_ID.value
+
+
+class _Ring:
+    __slots__ = ('entries', 'count')
+
+    def __init__(self, capacity):
+        self.entries = [None] * capacity
+        self.count = 0
+
+
+class FlightRecorder:
+    def __init__(self, capacity=100, max_keys=1000, level=logging.DEBUG):
+        """
+        Initialize the in-memory recorder of the records below the level of the logger.
+
+        The last capacity records of each request ID, or of each thread for the
+        records without request ID, are kept in fixed-size rings, as tuples of
+        the unformatted message, arguments and context. At most max_keys rings
+        are kept, the ring of the least recently recorded key is dropped for a
+        new key. Rings are appended to without locking, concurrent calls for one
+        key may overwrite each other's entry.
+
+        Parameters:
+        capacity (int): The number of records kept for each key.
+        max_keys (int): The number of request IDs and threads with records kept.
+        level (int): The lowest level of the recorded records.
+        """
+
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self.level = level
+        # _Ring by request ID or thread identifier, least recently recorded first
+        self._rings = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, context, pending_context, code, line_no, level, message, args):
+        """
+        Record a logging call that is not logged.
+
+        Parameters:
+        context (LogContext): The context of the call.
+        pending_context (dict): The context set by the with_* methods for the call.
+        code (code): The code object of the caller.
+        line_no (int): The line of the call.
+        level (int): The level of the call.
+        message (str): The log message.
+        args (tuple): The arguments of the log message.
+        """
+
+        thread = threading.get_ident()
+        key = pending_context.get(REQUEST_ID) or context.request_id or thread
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._create_ring(key)
+        else:
+            try:
+                self._rings.move_to_end(key)
+            except KeyError:
+                # Dropped by another thread since, the entry goes to the dropped ring.
+                pass
+        ring.entries[ring.count % self.capacity] = (time.time(), level, message, args, context, pending_context, code, line_no, thread)
+        ring.count += 1
+
+    def _create_ring(self, key):
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is not None:
+                return ring
+            if len(self._rings) >= self.max_keys:
+                # A new ring, a thread still holding the dropped one cannot mix its records into it.
+                self._rings.popitem(last=False)
+            ring = self._rings[key] = _Ring(self.capacity)
+            return ring
+
+    def take(self, key):
+        """
+        Remove the records of a key.
+
+        Parameters:
+        key: The request ID or the thread identifier.
+
+        Returns:
+        list: The recorded entries, oldest first.
+        """
+
+        with self._lock:
+            ring = self._rings.pop(key, None)
+        if ring is None:
+            return []
+        start = ring.count % self.capacity
+        if ring.count <= self.capacity:
+            return ring.entries[:ring.count]
+        return ring.entries[start:] + ring.entries[:start]
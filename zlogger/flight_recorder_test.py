@@ -0,0 +1,83 @@
+import shutil
+import tempfile
+import unittest
+
+from zlogger import ZLogger
+from zlogger.context import LogContext
+from zlogger.flight_recorder import FlightRecorder
+from zlogger.testing import create_config
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "counted"
+
+
+class FlightRecorderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def create_logger(self, capacity=3, max_keys=10):
+        config = create_config(self.tmp_dir, FLIGHT_RECORDER={'Enabled': 'True', 'Capacity': str(capacity), 'MaxKeys': str(max_keys)})
+        logger = ZLogger("flight-recorder-test", config)
+        self.addCleanup(logger.close)
+        return logger
+
+    def read_lines(self, logger):
+        logger.handlers[0].flush()
+        with open(logger.handlers[0].baseFilename) as file:
+            return [(line.split(' ', 1)[0], line.rsplit(' ', 1)[1]) for line in file.read().splitlines()]
+
+    def test_last_debug_records_of_the_thread_are_dumped_before_an_error(self):
+        logger = self.create_logger()
+        counter = Counter()
+        for i in range(5):
+            logger.debug("step %s", i)
+        logger.debug("argument %s", counter)
+        logger.info("visible")
+        self.assertEqual(counter.calls, 0)
+
+        logger.error("failed")
+        logger.error("again")
+        self.assertEqual(counter.calls, 1)
+        self.assertEqual(self.read_lines(logger), [
+            ("INFO", "visible"), ("DEBUG", "3"), ("DEBUG", "4"), ("DEBUG", "counted"), ("ERROR", "failed"), ("ERROR", "again")
+        ])
+
+    def test_records_are_kept_per_request_id(self):
+        logger = self.create_logger()
+        logger.bind(request_id="a").debug("first")
+        logger.with_request_id("b").debug("second")
+        logger.debug("third")
+        logger.bind(request_id="a").error("a")
+        logger.with_request_id("b").error("b")
+
+        self.assertEqual(self.read_lines(logger), [("DEBUG", "first"), ("ERROR", "a"), ("DEBUG", "second"), ("ERROR", "b")])
+
+    def test_least_recently_recorded_key_is_evicted(self):
+        recorder = FlightRecorder(capacity=2, max_keys=2)
+        for request_id in ("a", "b", "a", "c"):
+            recorder.record(LogContext(request_id), {}, None, 1, 10, request_id, ())
+
+        self.assertEqual(recorder.take("b"), [])
+        self.assertEqual([entry[2] for entry in recorder.take("a")], ["a", "a"])
+        self.assertEqual([entry[2] for entry in recorder.take("c")], ["c"])
+        self.assertEqual(len(recorder._rings), 0)
+
+    def test_evicted_ring_is_not_reused(self):
+        recorder = FlightRecorder(capacity=2, max_keys=1)
+        recorder.record(LogContext("a"), {}, None, 1, 10, "a", ())
+        ring = recorder._rings["a"]
+        recorder.record(LogContext("b"), {}, None, 1, 10, "b", ())
+
+        self.assertIsNot(recorder._rings["b"], ring)
+        self.assertEqual([entry[2] for entry in ring.entries if entry], ["a"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+class Lazy:
+    __slots__ = ('func', 'args', 'kwargs', '_value', '_evaluated')
+
+    def __init__(self, func, *args, **kwargs):
+        """
+        Initialize a value computed only when a record is actually logged.
+
+        The value is computed on first use and reused afterwards, so a lazy
+        value in a bound context is computed once for all the records of the
+        context.
+
+        Parameters:
+        func (function): The function computing the value.
+        *args: The positional arguments of the function.
+        **kwargs: The keyword arguments of the function.
+        """
+
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self._value = None
+        self._evaluated = False
+
+    @property
+    def value(self):
+        """
+        The computed value.
+        """
+
+        if not self._evaluated:
+            self._value = self.func(*self.args, **self.kwargs)
+            self._evaluated = True
+        return self._value
+
+    def __str__(self):
+        return str(self.value)
+
+    def __repr__(self):
+        return repr(self.value)
+
@@ -0,0 +1,58 @@
+import unittest
+
+from zlogger import CustomFormatter, JsonFormatter, Lazy
+from zlogger.testing import create_logger
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, value="value"):
+        self.calls += 1
+        return value
+
+    def __str__(self):
+        self.calls += 1
+        return "counted"
+
+
+class LazyTest(unittest.TestCase):
+    def test_disabled_calls_evaluate_nothing(self):
+        logger, streams = create_logger("lazy-test", CustomFormatter(), JsonFormatter())
+        counter = Counter()
+        logger.debug(lambda: f"payload {counter()}")
+        logger.debug("payload %s", Lazy(counter))
+        logger.with_additional_data({"payload": Lazy(counter)}).debug("payload")
+
+        self.assertEqual(counter.calls, 0)
+        self.assertEqual(streams[0].getvalue(), "")
+
+    def test_rate_limited_calls_evaluate_nothing(self):
+        logger, streams = create_logger("lazy-test", CustomFormatter(), JsonFormatter(), RATE_LIMIT={'Enabled': 'True', 'Info': '1/10'})
+        counter = Counter()
+        for _ in range(10):
+            logger.info("payload %s", Lazy(counter))
+
+        self.assertEqual(counter.calls, 1)
+
+    def test_values_are_evaluated_once_for_every_handler(self):
+        logger, (text, json_lines) = create_logger("lazy-test", CustomFormatter(), JsonFormatter())
+        message, argument, data, formatted = Counter(), Counter(), Counter(), Counter()
+        logger.with_additional_data({"payload": Lazy(data, 42)}).info(lambda: message("payload"))
+        logger.info("payload %s %s", Lazy(argument, "argument"), formatted)
+
+        self.assertEqual((message.calls, argument.calls, data.calls, formatted.calls), (1, 1, 1, 1))
+        self.assertIn("payload: 42, payload", text.getvalue())
+        self.assertIn('"data":{"payload":42},"message":"payload"', json_lines.getvalue())
+        self.assertTrue(json_lines.getvalue().splitlines()[1].endswith('"message":"payload argument counted"}'))
+
+
+    def test_only_functions_are_called_as_messages(self):
+        logger, (text, json_lines) = create_logger("lazy-test", CustomFormatter(), JsonFormatter())
+        logger.info(Counter)
+
+        self.assertEqual(json_lines.getvalue().count(f'"message":"{Counter}"'), 1)
+
+if __name__ == '__main__':
+    unittest.main()
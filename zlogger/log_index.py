@@ -0,0 +1,415 @@
+import os
+import re
+import json
+import bisect
+import argparse
+import contextlib
+from datetime import datetime
+from .constants import LogConfig
+from .structured_formatter import BINARY_HEADER, BINARY_LENGTH
+from .log_reader import DECOMPRESSORS, open_buffer, read_binary, log_files
+
+# Version of the sidecar index layout
+INDEX_VERSION = 1
+
+# Creation time at the start of a CustomFormatter line ("INFO       2022/01/01 12:34:56.789000 ...")
+TEXT_TIME_PATTERN = re.compile(rb'\S+\s+(\d{4}/\d\d/\d\d \d\d:\d\d:\d\d\.\d{6}) ')
+JSON_TIME_PREFIX = b'{"time":'
+
+
+def index_path(file_path):
+    """
+    Get the path of the sidecar index of a log file.
+
+    The index is a hidden file next to the log file, named after the uncompressed log file.
+
+    Parameters:
+    file_path (str): The path of the log file.
+
+    Returns:
+    str: The path of the sidecar index.
+    """
+
+    directory, file_name = os.path.split(file_path)
+    root, suffix = os.path.splitext(file_name)
+    if suffix in DECOMPRESSORS:
+        file_name = root
+    return os.path.join(directory, '.' + file_name + '.idx')
+
+
+def remove_index(file_path):
+    """
+    Remove the sidecar index of a log file, if any.
+
+    Parameters:
+    file_path (str): The path of the log file.
+    """
+
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(index_path(file_path))
+
+
+class LogIndex:
+    __slots__ = ('start', 'size', 'binary', 'request_ids', 'checkpoints')
+
+    def __init__(self, start=0, binary=False):
+        """
+        Initialize the index of a log file.
+
+        The index maps every request ID to the offsets of its records and keeps
+        a sparse list of time checkpoints, the offset of the first record of
+        every second. Records before start were written without an index.
+
+        Parameters:
+        start (int): The offset of the first indexed record.
+        binary (bool): Whether the log file holds binary records instead of lines.
+        """
+
+        self.start = start
+        self.size = start
+        self.binary = binary
+        self.request_ids = {}
+        # (second, offset) pairs, the seconds are increasing
+        self.checkpoints = []
+
+    def add(self, offset, record):
+        """
+        Index a record written at an offset.
+
+        Parameters:
+        offset (int): The offset of the record in the log file.
+        record (LogRecord): The log record.
+        """
+
+        second = int(record.created)
+        if not self.checkpoints or second > self.checkpoints[-1][0]:
+            self.checkpoints.append((second, offset))
+        d = record.__dict__
+        context = d.get(LogConfig.CONTEXT.value)
+        request_id = context.request_id if context is not None else d.get(LogConfig.REQUEST_ID.value)
+        if request_id is not None:
+            offsets = self.request_ids.get(request_id)
+            if offsets is None:
+                self.request_ids[request_id] = [offset]
+            else:
+                offsets.append(offset)
+
+    def save(self, file_path, size):
+        """
+        Write the index of a log file to its sidecar, atomically.
+
+        Parameters:
+        file_path (str): The path of the log file.
+        size (int): The size of the log file, the end of the indexed records.
+        """
+
+        self.size = size
+        path = index_path(file_path)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump({
+                'version': INDEX_VERSION,
+                'start': self.start,
+                'size': size,
+                'binary': self.binary,
+                'request_ids': {str(request_id): offsets for request_id, offsets in self.request_ids.items()},
+                'checkpoints': self.checkpoints,
+            }, file, separators=(',', ':'))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Read the sidecar index of a log file.
+
+        Parameters:
+        file_path (str): The path of the log file.
+
+        Returns:
+        LogIndex: The index, None if the log file has no valid index.
+        """
+
+        try:
+            with open(index_path(file_path)) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != INDEX_VERSION:
+            return None
+        index = cls(data['start'], data['binary'])
+        index.size = data['size']
+        index.request_ids = data['request_ids']
+        index.checkpoints = [tuple(checkpoint) for checkpoint in data['checkpoints']]
+        return index
+
+    def time_range(self, since=None, until=None):
+        """
+        Get the indexed offsets holding the records of a time range.
+
+        Parameters:
+        since (float): The start of the range in seconds since epoch, unbounded if None.
+        until (float): The end of the range in seconds since epoch, unbounded if None.
+
+        Returns:
+        tuple: The start and end offsets, equal if no record is in the range.
+        """
+
+        seconds = [second for second, _ in self.checkpoints]
+        start, end = self.start, self.size
+        if since is not None:
+            position = bisect.bisect_left(seconds, int(since))
+            start = self.checkpoints[position][1] if position < len(seconds) else self.size
+        if until is not None:
+            position = bisect.bisect_right(seconds, int(until))
+            end = self.checkpoints[position][1] if position < len(seconds) else self.size
+        return start, max(start, end)
+
+
+class _Source:
+    def __init__(self, buffer=None, stream=None):
+        """
+        Read records at offsets of a memory-mapped log file or of a decompressed stream.
+
+        Parameters:
+        buffer (buffer): The content of an uncompressed log file.
+        stream (file): The decompressed stream of an archived log file, read forward only.
+        """
+
+        self.buffer = buffer
+        self.stream = stream
+
+    def lines(self, start, end):
+        """
+        Generate the lines starting between two offsets, as (offset, line) pairs.
+        """
+
+        if self.buffer is not None:
+            end = min(end, len(self.buffer))
+            while start < end:
+                line_end = self.buffer.find(b'\n', start)
+                if line_end < 0:
+                    return
+                yield start, self.buffer[start:line_end]
+                start = line_end + 1
+        else:
+            self.stream.seek(start)
+            while start < end:
+                line = self.stream.readline()
+                if not line.endswith(b'\n'):
+                    return
+                yield start, line[:-1]
+                start += len(line)
+
+    def head(self, size):
+        if self.buffer is not None:
+            return self.buffer[:size]
+        self.stream.seek(0)
+        return self.stream.read(size)
+
+    def line_at(self, offset):
+        for _, line in self.lines(offset, offset + 1):
+            return line
+        return None
+
+    def records(self, start, end):
+        """
+        Generate the binary records starting between two offsets, as (offset, record) pairs.
+        """
+
+        while start < end:
+            record = self.record_at(start)
+            if record is None:
+                return
+            yield start, record[1]
+            start = record[0]
+
+    def record_at(self, offset):
+        """
+        Decode the binary record at an offset.
+
+        Returns:
+        tuple: The offset following the record and the record, None if the record is incomplete.
+        """
+
+        if self.buffer is not None:
+            if offset + BINARY_HEADER.size > len(self.buffer):
+                return None
+            (body_length,) = BINARY_LENGTH.unpack_from(self.buffer, offset)
+            data = self.buffer[offset:offset + BINARY_LENGTH.size + body_length]
+        else:
+            self.stream.seek(offset)
+            header = self.stream.read(BINARY_LENGTH.size)
+            if len(header) < BINARY_LENGTH.size:
+                return None
+            (body_length,) = BINARY_LENGTH.unpack(header)
+            data = header + self.stream.read(body_length)
+        for record in read_binary(data):
+            return offset + len(data), record
+        return None
+
+
+@contextlib.contextmanager
+def _open_source(file_path):
+    opener = DECOMPRESSORS.get(os.path.splitext(file_path)[1])
+    if opener is None:
+        with open_buffer(file_path) as buffer:
+            yield _Source(buffer=buffer), len(buffer)
+    else:
+        with opener(file_path, 'rb') as stream:
+            yield _Source(stream=stream), float('inf')
+
+
+def _line_time(line):
+    """
+    Read the creation time of a JSON or CustomFormatter line.
+
+    Returns:
+    float: The creation time in seconds since epoch, None if the line layout is unknown.
+    """
+
+    if line.startswith(JSON_TIME_PREFIX):
+        end = line.find(b',', len(JSON_TIME_PREFIX))
+        return float(line[len(JSON_TIME_PREFIX):end])
+    match = TEXT_TIME_PATTERN.match(line)
+    if match:
+        return datetime.strptime(match.group(1).decode(), '%Y/%m/%d %H:%M:%S.%f').timestamp()
+    return None
+
+
+def _timestamp(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return value.timestamp()
+
+
+def search(log_path, archive_path=None, request_id=None, since=None, until=None):
+    """
+    Find the records of a request ID and/or a time range in the log and archive paths.
+
+    Files with a sidecar index are read only at the offsets of the request ID
+    and between the time checkpoints of the range. Files, or file tails,
+    without an index are scanned. Compressed archived files are decompressed as
+    a forward-only stream.
+
+    Parameters:
+    log_path (str): The path of the log files.
+    archive_path (str): The path of the archived log files.
+    request_id (str): The request ID to find, any if None.
+    since (datetime or float): The earliest creation time, unbounded if None.
+    until (datetime or float): The latest creation time, unbounded if None.
+
+    Returns:
+    generator: The matching records, as lines (text and JSON formats) or dictionaries (binary format).
+    """
+
+    since, until = _timestamp(since), _timestamp(until)
+    for file_path in log_files(log_path, archive_path):
+        index = LogIndex.load(file_path)
+        if index is not None and _outside(index, file_path, since, until):
+            continue
+        yield from _search_file(file_path, index, request_id, since, until)
+
+
+def _outside(index, file_path, since, until):
+    """
+    Check whether every record of a fully indexed log file is outside a time range.
+    """
+
+    # The size of a compressed file is unknown without decompressing it, archived files are fully indexed.
+    size = 0 if os.path.splitext(file_path)[1] in DECOMPRESSORS else os.path.getsize(file_path)
+    if index.start > 0 or index.size < size or not index.checkpoints:
+        return False
+    return (since is not None and index.checkpoints[-1][0] < int(since)) or (until is not None and index.checkpoints[0][0] > until)
+
+
+def _search_file(file_path, index, request_id, since, until):
+    with _open_source(file_path) as (source, size):
+        binary = index.binary if index else False
+        if index is not None:
+            start, end = index.time_range(since, until)
+            if request_id is not None:
+                offsets = index.request_ids.get(str(request_id), [])
+                candidates = offsets[bisect.bisect_left(offsets, start):bisect.bisect_left(offsets, end)]
+                for offset in candidates:
+                    if binary:
+                        record = source.record_at(offset)
+                        if record and _record_matches(record[1], None, since, until):
+                            yield record[1]
+                    else:
+                        line = source.line_at(offset)
+                        if line is not None and _line_matches(line, None, since, until):
+                            yield line.decode('utf-8', 'replace')
+            else:
+                yield from _scan(source, binary, start, end, None, since, until)
+            # Records written before or after the indexed ones are scanned.
+            regions = ((0, index.start), (index.size, size))
+        else:
+            regions = ((0, size),)
+            binary = _is_binary(source.head(64))
+        for start, end in regions:
+            if start < end:
+                yield from _scan(source, binary, start, end, request_id, since, until)
+
+
+def _scan(source, binary, start, end, request_id, since, until):
+    if binary:
+        for _, record in source.records(start, end):
+            if _record_matches(record, request_id, since, until):
+                yield record
+        return
+    needles = None if request_id is None else _request_id_needles(request_id)
+    for _, line in source.lines(start, end):
+        if _line_matches(line, needles, since, until):
+            yield line.decode('utf-8', 'replace')
+
+
+def _is_binary(head):
+    return bool(head) and not (head.startswith(JSON_TIME_PREFIX) or TEXT_TIME_PATTERN.match(head))
+
+
+def _request_id_needles(request_id):
+    """
+    Build the byte strings marking a request ID in a CustomFormatter or JSON line.
+    """
+
+    request_id = str(request_id)
+    return (
+        f'requestID: {request_id};'.encode(),
+        b'"request_id":' + json.dumps(request_id).encode(),
+        f'"request_id":{request_id},'.encode(),
+    )
+
+
+def _line_matches(line, needles, since, until):
+    if needles is not None and not any(needle in line for needle in needles):
+        return False
+    if since is None and until is None:
+        return True
+    created = _line_time(line)
+    if created is None:
+        return True
+    return (since is None or created >= since) and (until is None or created <= until)
+
+
+def _record_matches(record, request_id, since, until):
+    if request_id is not None and record['request_id'] != str(request_id):
+        return False
+    return (since is None or record['time'] >= since) and (until is None or record['time'] <= until)
+
+
+def main(argv=None):
+    """
+    Print the records of a request ID and/or a time range, for example:
+
+    python -m zlogger ../logs/ --archive-path ../archive/ --request-id 1234 --since 2024-01-01T10:00
+    """
+
+    parser = argparse.ArgumentParser(prog='python -m zlogger', description='Search the zlogger log and archive paths.')
+    parser.add_argument('log_path')
+    parser.add_argument('--archive-path')
+    parser.add_argument('--request-id')
+    parser.add_argument('--since', type=datetime.fromisoformat)
+    parser.add_argument('--until', type=datetime.fromisoformat)
+    args = parser.parse_args(argv)
+    for record in search(args.log_path, args.archive_path, args.request_id, args.since, args.until):
+        print(record if isinstance(record, str) else json.dumps(record))
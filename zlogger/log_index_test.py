@@ -0,0 +1,78 @@
+import glob
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from zlogger import ZLogger, JsonFormatter, search
+from zlogger.custom_file_rotater import CustomFileRotator
+from zlogger.log_index import LogIndex
+from zlogger.testing import create_config
+
+
+class SearchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.log_path = os.path.join(self.tmp_dir, 'logs')
+        self.archive_path = os.path.join(self.tmp_dir, 'archive')
+
+    def create_logger(self, log_format='text'):
+        config = create_config(self.tmp_dir, LOG={'Level': 'debug', 'Format': log_format}, LOG_FILE={'MaxFileSize': '4096', 'ArchiveCompression': 'gzip', 'Index': 'True'})
+        return ZLogger("odapi", config)
+
+    def log_requests(self, logger):
+        for i in range(200):
+            logger.bind(request_id="12" if i % 10 == 0 else "1234").info("item %s", i)
+        logger.close()
+
+    def test_request_id_is_found_once_across_log_and_archive(self):
+        self.log_requests(self.create_logger())
+
+        self.assertTrue(glob.glob(os.path.join(self.archive_path, '*.gz')))
+        self.assertTrue(glob.glob(os.path.join(self.archive_path, '.*.idx')))
+        lines = list(search(self.log_path, self.archive_path, request_id="12"))
+        self.assertEqual([line.rsplit(' ', 1)[1] for line in lines], [str(i) for i in range(0, 200, 10)])
+
+    def test_files_without_index_are_scanned(self):
+        self.log_requests(self.create_logger('json'))
+        for index_file in glob.glob(os.path.join(self.tmp_dir, '*', '.*.idx')):
+            os.remove(index_file)
+
+        lines = list(search(self.log_path, self.archive_path, request_id="12"))
+        self.assertEqual(len(lines), 20)
+        self.assertTrue(all('"request_id":"12"' in line for line in lines))
+
+    def test_time_range_uses_the_checkpoints(self):
+        os.makedirs(self.log_path)
+        handler = CustomFileRotator("odapi", ".log", filename=os.path.join(self.log_path, "odapi.log-2024-01-01-000000"),
+                                    log_path=self.log_path, max_file_size=0, max_age_days=0, max_storage_size=1 << 30, index=True)
+        handler.setFormatter(JsonFormatter())
+        for i in range(100):
+            record = logging.LogRecord("odapi", logging.INFO, __file__, 1, "item %s", (i,), None)
+            record.created = 1700000000 + i / 4
+            handler.emit(record)
+        handler.close()
+
+        index = LogIndex.load(handler.baseFilename)
+        self.assertEqual(len(index.checkpoints), 25)
+        lines = list(search(self.log_path, since=1700000010.5, until=1700000012))
+        self.assertEqual([line.rsplit('item ', 1)[1] for line in lines], ['42"}', '43"}', '44"}', '45"}', '46"}', '47"}', '48"}'])
+
+
+    def test_closing_again_does_not_write_the_index(self):
+        os.makedirs(self.log_path)
+        handler = CustomFileRotator("odapi", ".log", filename=os.path.join(self.log_path, "odapi.log-2024-01-01-000000"),
+                                    log_path=self.log_path, max_file_size=0, max_age_days=0, max_storage_size=1 << 30, index=True)
+        handler.emit(logging.LogRecord("odapi", logging.INFO, __file__, 1, "item", None, None))
+        handler.close()
+        shutil.rmtree(self.log_path)
+
+        # logging.shutdown closes the handlers again, after the application closed them.
+        with self.assertNoLogs(level=logging.ERROR):
+            handler.close()
+        self.assertFalse(os.path.exists(self.log_path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,582 @@
+import os
+import re
+import mmap
+import json
+import gzip
+import lzma
+import time
+import contextlib
+from .custom_formatter import LOG_FORMAT, FIELD_PATTERN, CALLER_FIELDS
+from .structured_formatter import RECORD_FIELDS, BINARY_HEADER, BINARY_LENGTH, NULL_LENGTH
+
+# Fields of a binary record stored as length-prefixed strings, in order
+BINARY_STRING_FIELDS = ('level', 'request_id', 'module_name', 'function_name', 'file_path', 'data', 'message', 'exception')
+
+# Openers of the compressed archived files, by file name suffix
+DECOMPRESSORS = {'.gz': gzip.open, '.xz': lzma.open}
+
+# A log file name and its numeric suffixes, as in "odapi.log-2024-01-01-000000.12.3"
+NUMERIC_SUFFIX_PATTERN = re.compile(r'(.*?)((?:\.\d+)*)$')
+
+# The timestamp a CustomFileRotator appends to the log file name
+ROTATED_NAME_PATTERN = re.compile(r'(.*-)\d{4}-\d\d-\d\d-\d{6}')
+
+# Record keys of the CustomFormatter layout fields, and the values rendered from None
+TEXT_FIELD_KEYS = {'levelname': 'level', 'asctime1': 'time', 'lineno': 'line_no'}
+# Patterns of the fields with a known rendering: the creation time and the "key: value," items of the data
+TEXT_PATTERNS = {
+    'asctime1': r'\d{4}/\d\d/\d\d \d\d:\d\d:\d\d\.\d{6}',
+    'data': r'(?:[^,\s][^,]*?: [^,]*?,(?: [^,\s][^,]*?: [^,]*?,)*)?',
+}
+TEXT_NONE_FIELDS = ('request_id', 'module_name', 'function_name', 'file_path', 'line_no')
+
+TAIL_CHUNK_SIZE = 1024 * 1024
+
+
+@contextlib.contextmanager
+def open_buffer(source):
+    """
+    Open a log file as a read-only memory map.
+
+    Parameters:
+    source (str or buffer): The path of the log file, or an already open buffer (bytes, mmap, memoryview).
+        Compressed archived files (.gz, .xz) are decompressed in memory.
+
+    Returns:
+    buffer: The memory-mapped file, or the given buffer.
+    """
+
+    if not isinstance(source, (str, os.PathLike)):
+        yield source
+        return
+    opener = DECOMPRESSORS.get(os.path.splitext(source)[1])
+    if opener is not None:
+        with opener(source, 'rb') as file:
+            yield file.read()
+        return
+    with open(source, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def read_json_lines(source):
+    """
+    Read the records of a JSON Lines log file.
+
+    The file is memory-mapped and split line by line, only the current line is
+    copied out of the map. A trailing line without terminator (a record being
+    written) is not returned.
+
+    Parameters:
+    source (str or buffer): The path of the log file, or a buffer holding its content.
+
+    Returns:
+    generator: The records, as dictionaries.
+    """
+
+    with open_buffer(source) as buffer:
+        position = 0
+        end = len(buffer)
+        while position < end:
+            line_end = buffer.find(b'\n', position)
+            if line_end < 0:
+                return
+            if line_end > position:
+                yield json.loads(buffer[position:line_end])
+            position = line_end + 1
+
+
+def read_binary(source):
+    """
+    Read the records of a binary log file.
+
+    Numbers are unpacked straight from the memory map and strings are decoded
+    from memoryview slices, so the file content is never copied as a whole. A
+    trailing incomplete record (a record being written) is not returned.
+
+    Parameters:
+    source (str or buffer): The path of the log file, or a buffer holding its content.
+
+    Returns:
+    generator: The records, as dictionaries.
+    """
+
+    with open_buffer(source) as buffer:
+        view = memoryview(buffer)
+        try:
+            position = 0
+            end = len(view)
+            while position + BINARY_HEADER.size <= end:
+                body_length, created, levelno, line_no = BINARY_HEADER.unpack_from(view, position)
+                record_end = position + BINARY_LENGTH.size + body_length
+                if record_end > end:
+                    return
+                record = {'time': created, 'levelno': levelno, 'line_no': line_no}
+                position += BINARY_HEADER.size
+                for field in BINARY_STRING_FIELDS:
+                    (length,) = BINARY_LENGTH.unpack_from(view, position)
+                    position += BINARY_LENGTH.size
+                    if length == NULL_LENGTH:
+                        record[field] = None
+                    else:
+                        record[field] = str(view[position:position + length], 'utf-8')
+                        position += length
+                record['data'] = json.loads(record['data']) if record['data'] else {}
+                position = record_end
+                yield _ordered(record)
+        finally:
+            view.release()
+
+
+def _ordered(record):
+    """
+    Order the fields of a decoded binary record like the fields of a JSON record.
+
+    Parameters:
+    record (dict): The decoded record.
+
+    Returns:
+    dict: The record with the JSON record fields first.
+    """
+
+    ordered = {field: record[field] for field in RECORD_FIELDS}
+    ordered['levelno'] = record['levelno']
+    if ordered['exception'] is None:
+        del ordered['exception']
+    return ordered
+
+
+def log_files(log_path, archive_path=None):
+    """
+    List the log files of the log path and of the archive path, oldest first.
+
+    A log file that is in both paths is only listed from the log path.
+
+    Parameters:
+    log_path (str): The path of the log files.
+    archive_path (str): The path of the archived log files.
+
+    Returns:
+    list: The paths of the log files.
+    """
+
+    files = {}
+    for directory in (archive_path, log_path):
+        if not directory or not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            if entry.is_file() and not entry.name.startswith('.'):
+                root, suffix = os.path.splitext(entry.name)
+                files[root if suffix in DECOMPRESSORS else entry.name] = entry.path
+    return [files[name] for name in sorted(files, key=_file_order)]
+
+
+def _file_order(file_name):
+    # Numeric suffixes (same second rotations, process IDs) are compared as numbers.
+    match = NUMERIC_SUFFIX_PATTERN.match(file_name)
+    return match.group(1), [int(number) for number in match.group(2).split('.')[1:]]
+
+
+class TextLayout:
+    # Compiled layouts by format string
+    _layouts = {}
+
+    def __init__(self, fmt=LOG_FORMAT):
+        """
+        Compile a CustomFormatter layout into a line parser.
+
+        Every field of the layout becomes a named group of a regular expression,
+        the literal text between the fields is matched as is. The literal text
+        around a field also gives a byte string that a line must contain to
+        hold a given value, so filtered lines are rejected before parsing.
+
+        Parameters:
+        fmt (str): The %-style layout of a log line.
+        """
+
+        self.fmt = fmt
+        # (literal before, key, spec) of every field, spec is empty for an unpadded %s field
+        self.fields = []
+        pieces = []
+        seen = set()
+        position = 0
+        matches = [match for match in FIELD_PATTERN.finditer(fmt) if match.group(0) != '%%']
+        for number, match in enumerate(matches):
+            literal = fmt[position:match.start()].replace('%%', '%')
+            name, flags, width, precision, conversion = match.groups()
+            key = TEXT_FIELD_KEYS.get(name, name)
+            pieces.append(re.escape(literal))
+            if key in seen:
+                pieces.append(f'(?P={key})')
+            else:
+                pattern = TEXT_PATTERNS.get(name) or ('.*' if number == len(matches) - 1 else '.*?')
+                group = f'(?P<{key}>{pattern})'
+                if width:
+                    group = f'{group} *' if '-' in flags else f' *{group}'
+                pieces.append(group)
+                seen.add(key)
+            self.fields.append((literal, key, flags + width + (precision or '') + ('' if conversion == 's' else conversion)))
+            position = match.end()
+        self.suffix = fmt[position:].replace('%%', '%')
+        pieces.append(re.escape(self.suffix))
+        self.pattern = re.compile(''.join(pieces), re.DOTALL)
+        # Timestamp of the last parsed second, as (text, seconds since epoch)
+        self._cached_time = (None, None)
+
+    @classmethod
+    def get(cls, fmt=LOG_FORMAT):
+        """
+        Get the compiled parser of a layout, compiling it on first use.
+
+        Parameters:
+        fmt (str): The %-style layout of a log line.
+
+        Returns:
+        TextLayout: The compiled layout.
+        """
+
+        layout = cls._layouts.get(fmt)
+        if layout is None:
+            layout = cls._layouts[fmt] = cls(fmt)
+        return layout
+
+    def level_prefixes(self, levels):
+        """
+        Build the line prefixes of a set of levels, when the layout starts with the level.
+
+        Parameters:
+        levels (iterable): The level names.
+
+        Returns:
+        tuple: The prefixes as bytes, None if the level is not at the start of a line.
+        """
+
+        if not self.fields or self.fields[0][0] or self.fields[0][1] != 'level':
+            return None
+        width = self.fields[0][2].lstrip('-')
+        after = self.fields[1][0] if len(self.fields) > 1 else self.suffix
+        if (width and not width.isdigit()) or not after:
+            return None
+        return tuple((level.ljust(int(width or 0)) + after[0]).encode() for level in levels)
+
+    def field_needles(self, fields):
+        """
+        Build the byte strings a line must contain to hold the given field values.
+
+        Parameters:
+        fields (dict): The expected field values by record key.
+
+        Returns:
+        list: The byte strings, for the unpadded fields with literal text around them.
+        """
+
+        needles = []
+        for i, (literal, key, spec) in enumerate(self.fields):
+            if key not in fields or spec or key == 'time':
+                continue
+            after = self.fields[i + 1][0] if i + 1 < len(self.fields) else self.suffix
+            if literal or after:
+                needles.append(f'{literal}{fields[key]}{after}'.encode())
+        return needles
+
+    def parse(self, line):
+        """
+        Parse a line into a record.
+
+        Parameters:
+        line (bytes): The line, without terminator.
+
+        Returns:
+        dict: The record, None if the line does not match the layout.
+        """
+
+        match = self.pattern.fullmatch(line.decode('utf-8', 'replace'))
+        if match is None:
+            return None
+        record = match.groupdict()
+        if 'time' in record:
+            record['time'] = self.parse_time(record['time'])
+        for key in TEXT_NONE_FIELDS:
+            if record.get(key) == 'None':
+                record[key] = None
+        for key in CALLER_FIELDS:
+            if record.get(key) == '':
+                record[key] = None
+        line_no = record.get('line_no')
+        if line_no and line_no.isdigit():
+            record['line_no'] = int(line_no)
+        return record
+
+    def parse_time(self, text):
+        """
+        Parse a "2022/01/01 12:34:56.789000" local time, the part up to the seconds is cached.
+
+        Parameters:
+        text (str): The formatted time.
+
+        Returns:
+        float: The time in seconds since epoch.
+        """
+
+        prefix = text[:19]
+        cached_prefix, seconds = self._cached_time
+        if cached_prefix != prefix:
+            seconds = time.mktime(time.strptime(prefix, '%Y/%m/%d %H:%M:%S'))
+            self._cached_time = (prefix, seconds)
+        return seconds + int(text[20:]) / 1000000
+
+
+class _RecordAssembler:
+    def __init__(self, layout, levels=None, fields=None):
+        """
+        Assemble parsed lines into filtered records, joining the traceback lines to their record.
+
+        Parameters:
+        layout (TextLayout): The layout of the lines.
+        levels (iterable): The levels to keep, all if None.
+        fields (dict): The field values to keep, by record key.
+        """
+
+        self.layout = layout
+        self.levels = set(levels) if levels is not None else None
+        self.fields = {key: str(value) for key, value in fields.items()} if fields else {}
+        self.prefixes = layout.level_prefixes(self.levels) if self.levels is not None else None
+        self.needles = layout.field_needles(self.fields)
+        # The last accepted record and its continuation lines, until the next record starts
+        self.record = None
+        self.continuation = []
+
+    def feed(self, line):
+        """
+        Feed a line.
+
+        Parameters:
+        line (bytes): The line, without terminator.
+
+        Returns:
+        dict: The record completed by this line, None if no record is complete.
+        """
+
+        if self.record is not None:
+            parsed = self.layout.parse(line)
+            if parsed is None:
+                self.continuation.append(line.decode('utf-8', 'replace'))
+                return None
+            finished = self.flush()
+            if self.accepts(parsed):
+                self.record = parsed
+            return finished
+        if self.prefixes is not None and not line.startswith(self.prefixes):
+            return None
+        for needle in self.needles:
+            if needle not in line:
+                return None
+        parsed = self.layout.parse(line)
+        if parsed is not None and self.accepts(parsed):
+            self.record = parsed
+        return None
+
+    def accepts(self, record):
+        if self.levels is not None and record.get('level') not in self.levels:
+            return False
+        for key, value in self.fields.items():
+            if str(record.get(key)) != value:
+                return False
+        return True
+
+    def flush(self):
+        """
+        Complete the pending record.
+
+        Returns:
+        dict: The pending record, None if there is none.
+        """
+
+        record = self.record
+        if record is not None and self.continuation:
+            record['exception'] = '\n'.join(self.continuation)
+        self.record = None
+        self.continuation = []
+        return record
+
+
+def read_text(source, levels=None, fields=None, fmt=LOG_FORMAT):
+    """
+    Read the records of a text log file written with a CustomFormatter layout.
+
+    The file is memory-mapped and split line by line. Lines are rejected on
+    their level prefix and on the literal text around the filtered fields
+    before they are parsed, and with a field filter the reader jumps from one
+    occurrence of the field to the next. Traceback lines are returned as the
+    exception of their record. A trailing line without terminator (a record
+    being written) is not returned.
+
+    Parameters:
+    source (str or buffer): The path of the log file, or a buffer holding its content.
+    levels (iterable): The levels to return, for example {'ERROR', 'FATAL'}, all if None.
+    fields (dict): The field values to return, for example {'request_id': '1234'}.
+    fmt (str): The layout of the lines.
+
+    Returns:
+    generator: The records, as dictionaries.
+    """
+
+    assembler = _RecordAssembler(TextLayout.get(fmt), levels, fields)
+    needle = assembler.needles[0] if assembler.needles else None
+    prefixes = assembler.prefixes
+    prefix_length = len(prefixes[0]) if prefixes and len({len(prefix) for prefix in prefixes}) == 1 else None
+    prefixes = frozenset(prefixes) if prefix_length else None
+    with open_buffer(source) as buffer:
+        position = 0
+        end = len(buffer)
+        while position < end:
+            if assembler.record is None:
+                if needle is not None:
+                    found = buffer.find(needle, position)
+                    if found < 0:
+                        break
+                    position = buffer.rfind(b'\n', position, found) + 1 or position
+                line_end = buffer.find(b'\n', position)
+                if line_end < 0:
+                    break
+                if prefixes is not None and buffer[position:position + prefix_length] not in prefixes:
+                    position = line_end + 1
+                    continue
+            else:
+                line_end = buffer.find(b'\n', position)
+                if line_end < 0:
+                    break
+            record = assembler.feed(buffer[position:line_end])
+            position = line_end + 1
+            if record is not None:
+                yield record
+        record = assembler.flush()
+        if record is not None:
+            yield record
+
+
+def read_directory(log_path, archive_path=None, levels=None, fields=None, fmt=LOG_FORMAT):
+    """
+    Read the records of every text log file of the log path and of the archive path, oldest first.
+
+    Parameters:
+    log_path (str): The path of the log files.
+    archive_path (str): The path of the archived log files.
+    levels (iterable): The levels to return, all if None.
+    fields (dict): The field values to return, by record key.
+    fmt (str): The layout of the lines.
+
+    Returns:
+    generator: The records, as dictionaries.
+    """
+
+    for file_path in log_files(log_path, archive_path):
+        yield from read_text(file_path, levels, fields, fmt)
+
+
+def tail(path, levels=None, fields=None, fmt=LOG_FORMAT, from_start=False, poll_interval=0.5, stop=None):
+    """
+    Follow a text log file across rotations, like tail -F.
+
+    When a newer log file of the same name appears, the current file is read
+    to its end and the newer file is followed from its start. A log file
+    moved to the archive path or removed while it is read is read to its end.
+
+    Parameters:
+    path (str): The log file to follow, or the log path to follow its latest file.
+    levels (iterable): The levels to return, all if None.
+    fields (dict): The field values to return, by record key.
+    fmt (str): The layout of the lines.
+    from_start (bool): Whether to read the first file from its start instead of its end.
+    poll_interval (float): The time (in seconds) between two checks for new records.
+    stop (threading.Event): Stops following once set.
+
+    Returns:
+    generator: The records, as dictionaries.
+    """
+
+    assembler = _RecordAssembler(TextLayout.get(fmt), levels, fields)
+    if os.path.isdir(path):
+        directory, current, prefix = path, None, ''
+    else:
+        directory, file_name = os.path.split(path)
+        match = ROTATED_NAME_PATTERN.match(file_name)
+        current, prefix = path, match.group(1) if match else file_name
+
+    file = None
+    try:
+        while file is None:
+            if current is None:
+                files = _newer_files(directory, prefix, None)
+                current = files[-1] if files else None
+            if current is not None:
+                try:
+                    file = open(current, 'rb')
+                except FileNotFoundError:
+                    current = None
+            if file is None and _wait(stop, poll_interval):
+                return
+        position = 0 if from_start else os.fstat(file.fileno()).st_size
+        remainder = b''
+        while True:
+            chunk = os.pread(file.fileno(), TAIL_CHUNK_SIZE, position)
+            if chunk:
+                position += len(chunk)
+                lines = (remainder + chunk).split(b'\n')
+                remainder = lines.pop()
+                for line in lines:
+                    record = assembler.feed(line)
+                    if record is not None:
+                        yield record
+                continue
+
+            # Records are written with a single write, so the pending record is complete when the file is idle.
+            record = assembler.flush()
+            if record is not None:
+                yield record
+            newer = _newer_files(directory, prefix, current)
+            if newer:
+                # Records written to the current file just before the rotation are read first.
+                if os.fstat(file.fileno()).st_size > position:
+                    continue
+                for candidate in newer:
+                    try:
+                        newer_file = open(candidate, 'rb')
+                    except FileNotFoundError:
+                        continue
+                    file.close()
+                    file, current = newer_file, candidate
+                    position = 0
+                    remainder = b''
+                    break
+                else:
+                    # The newer files were removed before they could be opened, the directory is listed again.
+                    if _wait(stop, poll_interval):
+                        return
+            elif _wait(stop, poll_interval):
+                return
+    finally:
+        if file is not None:
+            file.close()
+
+
+def _newer_files(directory, prefix, current):
+    """
+    List the log files of a directory with a name prefix that are newer than the current file, oldest first.
+    """
+
+    files = [file_path for file_path in log_files(directory) if os.path.basename(file_path).startswith(prefix)]
+    if current is None:
+        return files
+    order = _file_order(os.path.basename(current))
+    return [file_path for file_path in files if _file_order(os.path.basename(file_path)) > order]
+
+
+def _wait(stop, interval):
+    if stop is None:
+        time.sleep(interval)
+        return False
+    return stop.wait(interval)
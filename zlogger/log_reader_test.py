@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from zlogger import log_reader
+from zlogger import ZLogger, read_json_lines, read_binary, read_text, read_directory, tail
+from zlogger.testing import create_config
+
+
+class StructuredLogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def create_logger(self, log_format):
+        config = create_config(self.tmp_dir, LOG={'Level': 'debug', 'Format': log_format})
+        logger = ZLogger("odapi", config)
+        self.addCleanup(logger.close)
+        return logger
+
+    def log_records(self, logger):
+        logger.bind(request_id="1234", module_name="save; file", path="/a,b;c", uuid=12345).error("file, is; corrupted")
+        logger.info("done %s", "now")
+        return logger.handlers[0].baseFilename
+
+    def assert_records(self, records):
+        first, second = records
+        self.assertEqual(first["level"], "ERROR")
+        self.assertEqual(first["request_id"], "1234")
+        self.assertEqual(first["module_name"], "save; file")
+        self.assertEqual(first["function_name"], "log_records")
+        self.assertEqual(first["line_no"], StructuredLogTest.log_records.__code__.co_firstlineno + 1)
+        self.assertEqual(first["data"], {"path": "/a,b;c", "uuid": 12345})
+        self.assertEqual(first["message"], "file, is; corrupted")
+        self.assertIsNone(second["request_id"])
+        self.assertEqual(second["data"], {})
+        self.assertEqual(second["message"], "done now")
+
+    def test_json_lines_round_trip(self):
+        log_file = self.log_records(self.create_logger("json"))
+        self.assert_records(list(read_json_lines(log_file)))
+
+    def test_binary_round_trip(self):
+        log_file = self.log_records(self.create_logger("binary"))
+        self.assert_records(list(read_binary(log_file)))
+
+    def test_incomplete_trailing_record_is_skipped(self):
+        log_file = self.log_records(self.create_logger("binary"))
+        with open(log_file, "rb") as file:
+            content = file.read()
+        self.assertEqual(len(list(read_binary(content[:-3]))), 1)
+
+
+class TextLogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.log_path = os.path.join(self.tmp_dir, 'logs')
+        config = create_config(self.tmp_dir, LOG={'Level': 'debug'})
+        self.logger = ZLogger("odapi", config)
+        self.addCleanup(self.logger.close)
+
+    def log_records(self):
+        self.logger.bind(request_id="1234", module_name="save", uuid=12345).error("file is corrupted")
+        self.logger.error("failed")
+        for i in range(3):
+            self.logger.info("item %s", i)
+
+    def test_records_are_parsed(self):
+        self.log_records()
+        with open(self.logger.handlers[0].baseFilename, "rb") as file:
+            lines = file.read().split(b"\n")
+        traceback = [b"Traceback (most recent call last):", b'  File "x.py", line 1, in <module>', b"ValueError: bad value"]
+        records = list(read_text(b"\n".join(lines[:2] + traceback + lines[2:])))
+
+        self.assertEqual(len(records), 5)
+        first, second = records[:2]
+        self.assertEqual(first["level"], "ERROR")
+        self.assertEqual(first["request_id"], "1234")
+        self.assertEqual(first["module_name"], "save")
+        self.assertEqual(first["function_name"], "log_records")
+        self.assertEqual(first["file_path"], __file__)
+        self.assertEqual(first["data"], "uuid: 12345,")
+        self.assertEqual(first["message"], "file is corrupted")
+        self.assertAlmostEqual(first["time"], time.time(), delta=60)
+        self.assertIsNone(second["request_id"])
+        self.assertIn("ValueError: bad value", second["exception"])
+        self.assertEqual(records[-1]["message"], "item 2")
+
+    def test_filters(self):
+        self.log_records()
+        log_file = self.logger.handlers[0].baseFilename
+
+        self.assertEqual([record["message"] for record in read_text(log_file, levels={"ERROR"})], ["file is corrupted", "failed"])
+        self.assertEqual([record["message"] for record in read_text(log_file, fields={"request_id": "1234"})], ["file is corrupted"])
+        self.assertEqual(list(read_text(log_file, fields={"request_id": "123"})), [])
+
+    def test_directory_and_tail_follow_rotations(self):
+        records = []
+        stop = threading.Event()
+        log_file = self.logger.handlers[0].baseFilename
+        follower = threading.Thread(target=lambda: records.extend(tail(log_file, from_start=True, poll_interval=0.01, stop=stop)))
+        follower.start()
+        for i in range(6):
+            self.logger.info("item %s", i)
+            if i % 2:
+                self.logger.handlers[0].doRollover()
+        deadline = time.time() + 5
+        while len(records) < 6 and time.time() < deadline:
+            time.sleep(0.01)
+        stop.set()
+        follower.join()
+
+        expected = [f"item {i}" for i in range(6)]
+        self.assertEqual([record["message"] for record in records], expected)
+        self.assertEqual([record["message"] for record in read_directory(self.log_path)], expected)
+
+    def test_tail_keeps_following_when_the_newer_file_disappears(self):
+        records = []
+        stop = threading.Event()
+        log_file = self.logger.handlers[0].baseFilename
+        newer_files = log_reader._newer_files
+        vanished = []
+
+        def list_newer_files(directory, prefix, current):
+            if not vanished:
+                vanished.append(os.path.join(directory, "odapi.log-2000-01-01-000000"))
+                return vanished
+            return newer_files(directory, prefix, current)
+
+        self.logger.info("item 0")
+        with mock.patch('zlogger.log_reader._newer_files', side_effect=list_newer_files):
+            follower = threading.Thread(target=lambda: records.extend(tail(log_file, from_start=True, poll_interval=0.01, stop=stop)))
+            follower.start()
+            deadline = time.time() + 5
+            while not vanished and time.time() < deadline:
+                time.sleep(0.01)
+            self.logger.info("item 1")
+            self.logger.handlers[0].doRollover()
+            self.logger.info("item 2")
+            while len(records) < 3 and time.time() < deadline:
+                time.sleep(0.01)
+            stop.set()
+            follower.join()
+
+        self.assertEqual([record["message"] for record in records], ["item 0", "item 1", "item 2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
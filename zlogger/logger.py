@@ -1,27 +1,128 @@
+import asyncio
 import logging
 import os
-import inspect
+import contextlib
+import contextvars
+import collections.abc
 from functools import wraps
+import io
 import sys
+import json
+import traceback
+import types
+import threading
 from .custom_formatter import CustomFormatter
+from .structured_formatter import JsonFormatter, BinaryFormatter
 from .custom_file_rotater import CustomFileRotator
+from .async_queue_handler import AsyncQueueHandler
+from .context import LogContext, EMPTY_CONTEXT, current_context
+from .rate_limiter import RateLimiter, parse_policy, CALL_SITE_PATTERN
+from .lazy import Lazy
+from .flight_recorder import FlightRecorder
+from .metrics import MeteredStreamHandler, enable_metrics, disable_metrics, handler_stats
+from .scheduler import scheduler
+from .timing import Histogram, Timed, caller_module
+from .batch import handle_batch, HandlerBatch
 import time
+import datetime
 from .constants import *
 import configparser
 
 
+# Caller metadata (function name, file path, line number) by (code object, line number).
+# Cleared when it grows past MAX_CALLERS, for code compiled at runtime.
+_callers = {}
+MAX_CALLERS = 10000
+
+# pathname and funcName of the records logged without caller capture, as in Logger.findCaller
+UNKNOWN_FILE = '(unknown file)'
+UNKNOWN_FUNCTION = '(unknown function)'
+
+
+def _caller_metadata(code, line_no):
+    """
+    Compute and cache the metadata of a call site.
+    
+    Parameters:
+    code (code): The code object of the caller.
+    line_no (int): The line of the call.
+    
+    Returns:
+    tuple: The function name (the module name for module-level code), the file path and the line number.
+    """
+    
+    function_name = code.co_name
+    if function_name == "<module>":
+        function_name = os.path.splitext(os.path.basename(code.co_filename))[0]
+    if len(_callers) >= MAX_CALLERS:
+        _callers.clear()
+    caller = _callers[(code, line_no)] = (function_name, code.co_filename, line_no)
+    return caller
+
+
+class ZLogRecord(logging.LogRecord):
+    def getMessage(self):
+        """
+        Merge the message with its arguments once, every handler then reuses the result.
+        
+        Returns:
+        str: The message of the record.
+        """
+        
+        try:
+            return self._message
+        except AttributeError:
+            self._message = super().getMessage()
+            return self._message
+
+
 # Add custom log levels to the logging module
 logging.addLevelName(CustomLogLevel.SUCCESS_LEVEL.value, SUCCESS)
 logging.addLevelName(CustomLogLevel.REJECT_LEVEL.value, REJECT)
 logging.addLevelName(CustomLogLevel.FATAL_LEVEL.value, FATAL)
 
 class ZLogger(logging.Logger):
-    def __init__(self, name, config, level=logging.INFO):
+    def __init__(self, name, config, level=logging.INFO, settings=None, handlers=None):
+        """
+        Initialize the logger from a configuration.
+        
+        Parameters:
+        name (str): The name of the logger.
+        config (ConfigParser): Configuration object containing logging settings.
+        level (int): The initial log level, replaced by the level of the configuration.
+        settings (dict): The settings of the configuration as returned by validate_settings, validated here if None.
+        handlers (list): The handlers to log to, created from the settings if None.
+        """
+        
         super().__init__(name, level)
-        self.configure_logger(config)
-        self.extra_context = {}
+        # The context set by the with_* methods is local to the current thread or asyncio task.
+        self._extra_context = contextvars.ContextVar(f'zlogger_extra_context_{id(self)}', default={})
+        self._rate_limiter = None
+        # Logs the suppressed record counts every summary interval of the rate limiter
+        self._suppressed_job = None
+        self._flight_recorder = None
+        # The number of logged records by level, None while the metrics are disabled
+        self._metrics = None
+        self._stats_job = None
+        # (Histogram, code, line number) by timing name and module, replaced by an empty dict at each summary
+        self._timings = {}
+        self._timing_lock = threading.Lock()
+        self._timing_job = None
+        self._timing_interval = 60.0
+        # The duration (in nanoseconds) from which a timed call is logged, 0 to never log them
+        self._timing_threshold = 0
+        self.capture_caller = True
+        # The handler pool and the config hash of the loggers created by get_logger,
+        # None if the handlers are owned by this logger
+        self._handler_pool = None
+        self.config_hash = None
+        if settings is None:
+            self.configure_logger(config)
+        else:
+            self.apply_settings(settings, handlers)
 
-    def validate_config(self, config):
+    @classmethod
+    def validate_config(cls, config):
         """
         Validate the logging configuration parameters.
         
@@ -58,13 +159,14 @@ class ZLogger(logging.Logger):
         # Validate file logging configuration if enabled
         log_file_config = {}
         if config.getboolean(LogConfig.LOG_FILE.value, LogConfig.ENABLED.value):
-            log_file_config = self._validate_log_file_config(config)
+            log_file_config = cls._validate_log_file_config(config)
             if not log_file_config:
                 return None
 
         return log_level, log_stdout, log_stderr, log_file_config
 
-    def _validate_log_file_config(self, config):
+    @classmethod
+    def _validate_log_file_config(cls, config):
         """
         Validate the file logging configuration parameters.
         
@@ -123,6 +225,98 @@ class ZLogger(logging.Logger):
 
         log_file_config[LogConfig.ARCHIVE_PATH.value] = log_archive_path
 
+        # Validate write buffering and fsync settings
+        log_buffer_size = config.getint(LogConfig.LOG_FILE.value, LogConfig.BUFFER_SIZE.value, fallback=0)
+        log_buffer_records = config.getint(LogConfig.LOG_FILE.value, LogConfig.BUFFER_RECORDS.value, fallback=0)
+        log_flush_interval = config.getfloat(LogConfig.LOG_FILE.value, LogConfig.FLUSH_INTERVAL.value, fallback=1.0)
+        log_fsync_interval = config.getfloat(LogConfig.LOG_FILE.value, LogConfig.FSYNC_INTERVAL.value, fallback=1.0)
+        if min(log_buffer_size, log_buffer_records, log_flush_interval, log_fsync_interval) < 0:
+            logging.error(ERROR_DESC['319'])
+        elif (log_buffer_size > 0 or log_buffer_records > 0) and log_flush_interval == 0:
+            # Without a flush interval the buffered records could wait indefinitely for the next records.
+            logging.error(ERROR_DESC['338'])
+            log_flush_interval = 1.0
+
+        log_file_config[LogConfig.BUFFER_SIZE.value] = max(log_buffer_size, 0)
+        log_file_config[LogConfig.BUFFER_RECORDS.value] = max(log_buffer_records, 0)
+        log_file_config[LogConfig.FLUSH_INTERVAL.value] = max(log_flush_interval, 0)
+        log_file_config[LogConfig.FSYNC_INTERVAL.value] = max(log_fsync_interval, 0)
+
+        log_fsync_policy = config.get(LogConfig.LOG_FILE.value, LogConfig.FSYNC_POLICY.value, fallback=FsyncPolicy.NEVER.value).lower()
+        if log_fsync_policy not in FsyncPolicy.list():
+            logging.error(f"{ERROR_DESC['318']}: {log_fsync_policy}. Valid options are: {', '.join(FsyncPolicy.list())}")
+            log_fsync_policy = FsyncPolicy.NEVER.value
+
+        log_file_config[LogConfig.FSYNC_POLICY.value] = log_fsync_policy
+
+        # Validate archive compression settings
+        log_archive_compression = config.get(LogConfig.LOG_FILE.value, LogConfig.ARCHIVE_COMPRESSION.value, fallback=ArchiveCompression.NONE.value).lower()
+        if log_archive_compression not in ArchiveCompression.list():
+            logging.error(f"{ERROR_DESC['320']}: {log_archive_compression}. Valid options are: {', '.join(ArchiveCompression.list())}")
+            log_archive_compression = ArchiveCompression.NONE.value
+
+        log_file_config[LogConfig.ARCHIVE_COMPRESSION.value] = log_archive_compression
+
+        log_archive_compression_level = config.getint(LogConfig.LOG_FILE.value, LogConfig.ARCHIVE_COMPRESSION_LEVEL.value, fallback=None)
+        if log_archive_compression_level is not None and not 0 <= log_archive_compression_level <= 9:
+            logging.error(ERROR_DESC['321'])
+            log_archive_compression_level = None
+
+        log_file_config[LogConfig.ARCHIVE_COMPRESSION_LEVEL.value] = log_archive_compression_level
+
+        # Validate multi-process settings
+        try:
+            log_file_config[LogConfig.MULTI_PROCESS.value] = config.getboolean(LogConfig.LOG_FILE.value, LogConfig.MULTI_PROCESS.value, fallback=False)
+            log_file_config[LogConfig.SHARD_PER_PROCESS.value] = config.getboolean(LogConfig.LOG_FILE.value, LogConfig.SHARD_PER_PROCESS.value, fallback=False)
+        except ValueError:
+            logging.error(ERROR_DESC['323'])
+            log_file_config[LogConfig.MULTI_PROCESS.value] = False
+            log_file_config[LogConfig.SHARD_PER_PROCESS.value] = False
+
+        # Validate index settings
+        try:
+            log_file_config[LogConfig.INDEX.value] = config.getboolean(LogConfig.LOG_FILE.value, LogConfig.INDEX.value, fallback=False)
+        except ValueError:
+            logging.error(ERROR_DESC['324'])
+            log_file_config[LogConfig.INDEX.value] = False
+
+        # Validate the time-based rotation and retention settings
+        log_rotate_when = config.get(LogConfig.LOG_FILE.value, LogConfig.ROTATE_WHEN.value, fallback='').upper() or None
+        if log_rotate_when is not None and log_rotate_when not in RotateWhen.list():
+            logging.error(f"{ERROR_DESC['329']}: {log_rotate_when}. Valid options are: {', '.join(RotateWhen.list())}")
+            log_rotate_when = None
+
+        log_file_config[LogConfig.ROTATE_WHEN.value] = log_rotate_when
+
+        log_rotate_interval = config.getint(LogConfig.LOG_FILE.value, LogConfig.ROTATE_INTERVAL.value, fallback=1)
+        if log_rotate_interval <= 0:
+            logging.error(ERROR_DESC['330'])
+            log_rotate_interval = 1
+
+        log_file_config[LogConfig.ROTATE_INTERVAL.value] = log_rotate_interval
+
+        log_rotate_at_time = config.get(LogConfig.LOG_FILE.value, LogConfig.ROTATE_AT_TIME.value, fallback='')
+        try:
+            log_rotate_at_time = datetime.time.fromisoformat(log_rotate_at_time) if log_rotate_at_time else None
+        except ValueError:
+            logging.error(f"{ERROR_DESC['331']}: {log_rotate_at_time}")
+            log_rotate_at_time = None
+
+        log_file_config[LogConfig.ROTATE_AT_TIME.value] = log_rotate_at_time
+
+        try:
+            log_file_config[LogConfig.ROTATE_UTC.value] = config.getboolean(LogConfig.LOG_FILE.value, LogConfig.ROTATE_UTC.value, fallback=False)
+        except ValueError:
+            logging.error(ERROR_DESC['332'])
+            log_file_config[LogConfig.ROTATE_UTC.value] = False
+
+        log_retention_interval = config.getfloat(LogConfig.LOG_FILE.value, LogConfig.RETENTION_INTERVAL.value, fallback=60.0)
+        if log_retention_interval < 0:
+            logging.error(ERROR_DESC['333'])
+            log_retention_interval = 60.0
+
+        log_file_config[LogConfig.RETENTION_INTERVAL.value] = log_retention_interval
+
         # Create the log file path if it doesn't exist
         if not os.path.exists(log_file_path):
             os.makedirs(log_file_path)
@@ -138,6 +332,48 @@ class ZLogger(logging.Logger):
 
         return log_file_config
 
+    @classmethod
+    def _validate_async_config(cls, config):
+        """
+        Validate the asynchronous logging configuration parameters.
+        
+        Parameters:
+        config (ConfigParser): Configuration object containing logging settings.
+        
+        Returns:
+        dict: Validated asynchronous logging settings, empty if asynchronous logging is disabled.
+        """
+        
+        async_config = {}
+        if not config.getboolean(LogConfig.LOG.value, LogConfig.ASYNC.value, fallback=False):
+            return async_config
+
+        # Validate queue size
+        queue_size = config.getint(LogConfig.LOG.value, LogConfig.QUEUE_SIZE.value, fallback=10000)
+        if queue_size <= 0:
+            logging.error(ERROR_DESC['316'])
+            queue_size = 10000
+
+        async_config[LogConfig.QUEUE_SIZE.value] = queue_size
+
+        # Validate overflow policy
+        overflow_policy = config.get(LogConfig.LOG.value, LogConfig.OVERFLOW_POLICY.value, fallback=OverflowPolicy.BLOCK.value).lower()
+        if overflow_policy not in OverflowPolicy.list():
+            logging.error(f"{ERROR_DESC['317']}: {overflow_policy}. Valid options are: {', '.join(OverflowPolicy.list())}")
+            overflow_policy = OverflowPolicy.BLOCK.value
+
+        async_config[LogConfig.OVERFLOW_POLICY.value] = overflow_policy
+
+        # Validate overflow level
+        overflow_level = config.get(LogConfig.LOG.value, LogConfig.OVERFLOW_LEVEL.value, fallback=LogLevel.WARNING.value).upper()
+        if overflow_level not in LogLevel.list():
+            logging.error(f"Invalid overflow level: {overflow_level}. Valid options are: {', '.join(LogLevel.list())}")
+            overflow_level = LogLevel.WARNING.value
+
+        async_config[LogConfig.OVERFLOW_LEVEL.value] = overflow_level
+
+        return async_config
+
     def configure_logger(self, config):
         """
         Configure the logger based on the provided configuration.
@@ -146,13 +382,246 @@ class ZLogger(logging.Logger):
         config (ConfigParser): Configuration object containing logging settings.
         """
         
-        log_level, log_stdout, log_stderr, log_file_config = self.validate_config(config)
+        self.apply_settings(self.validate_settings(config))
 
+    @classmethod
+    def validate_settings(cls, config):
+        """
+        Validate every setting of a configuration.
+        
+        Parameters:
+        config (ConfigParser): Configuration object containing logging settings.
+        
+        Returns:
+        dict: The validated settings, by LogConfig option or section.
+        """
+        
+        log_level, log_stdout, log_stderr, log_file_config = cls.validate_config(config)
+
+        # Without caller capture the file path, function name and line number are not computed.
+        try:
+            capture_caller = config.getboolean(LogConfig.LOG.value, LogConfig.CAPTURE_CALLER.value, fallback=True)
+        except ValueError:
+            logging.error(ERROR_DESC['328'])
+            capture_caller = True
+
+        return {
+            LogConfig.LEVEL.value: log_level,
+            LogConfig.LOG_STDOUT.value: log_stdout,
+            LogConfig.LOG_STDERR.value: log_stderr,
+            LogConfig.LOG_FILE.value: log_file_config,
+            LogConfig.ASYNC.value: cls._validate_async_config(config),
+            LogConfig.FORMAT.value: cls._validate_log_format(config),
+            LogConfig.RATE_LIMIT.value: cls._validate_rate_limit_config(config),
+            LogConfig.FLIGHT_RECORDER.value: cls._validate_flight_recorder_config(config),
+            LogConfig.METRICS.value: cls._validate_metrics_config(config),
+            LogConfig.TIMING.value: cls._validate_timing_config(config),
+            LogConfig.CAPTURE_CALLER.value: capture_caller
+        }
+
+    def apply_settings(self, settings, handlers=None):
+        """
+        Configure the logger with validated settings.
+        
+        Parameters:
+        settings (dict): The settings as returned by validate_settings.
+        handlers (list): The handlers to log to, created from the settings if None.
+        """
+        
+        if self._suppressed_job is not None:
+            scheduler.cancel(self._suppressed_job)
+            self._suppressed_job = None
+        rate_limiter = settings[LogConfig.RATE_LIMIT.value]
+        self._rate_limiter = rate_limiter.copy() if rate_limiter is not None else None
+        if rate_limiter is not None:
+            self._suppressed_job = scheduler.schedule(time.time() + rate_limiter.summary_interval, self._summarize_suppressed)
+        flight_recorder = settings[LogConfig.FLIGHT_RECORDER.value]
+        self._flight_recorder = FlightRecorder(*flight_recorder) if flight_recorder is not None else None
+        self.capture_caller = settings[LogConfig.CAPTURE_CALLER.value]
+        self._timing_interval, self._timing_threshold = settings[LogConfig.TIMING.value]
+
+        if handlers is None:
+            handlers = self.create_handlers(settings)
+        self._configure_loggers(settings[LogConfig.LEVEL.value], handlers)
+
+        if self._stats_job is not None:
+            scheduler.cancel(self._stats_job)
+            self._stats_job = None
+        dump_interval = settings[LogConfig.METRICS.value]
+        if dump_interval is None:
+            self._metrics = None
+            disable_metrics(handlers)
+            return
+        self._metrics = self._metrics or {}
+        enable_metrics(handlers)
+        if dump_interval > 0:
+            self._stats_interval = dump_interval
+            self._stats_job = scheduler.schedule(time.time() + dump_interval, self._dump_stats)
+
+    @classmethod
+    def create_handlers(cls, settings):
+        """
+        Create the handlers of validated settings.
+        
+        Parameters:
+        settings (dict): The settings as returned by validate_settings.
+        
+        Returns:
+        list: A list of logging handlers, a single asynchronous handler in asynchronous mode.
+        """
+        
         formatter = CustomFormatter()
-        handlers = self._create_handlers(log_level, log_stdout, log_stderr, log_file_config, formatter)
-        self._configure_loggers(log_level, handlers)
+        handlers = cls._create_handlers(
+            settings[LogConfig.LEVEL.value],
+            settings[LogConfig.LOG_STDOUT.value],
+            settings[LogConfig.LOG_STDERR.value],
+            settings[LogConfig.LOG_FILE.value],
+            formatter,
+            settings[LogConfig.FORMAT.value]
+        )
+        async_config = settings[LogConfig.ASYNC.value]
+        if async_config:
+            handlers = [cls._create_async_handler(handlers, async_config)]
+        return handlers
 
-    def _create_handlers(self, log_level, log_stdout, log_stderr, log_file_config, formatter):
+    @classmethod
+    def _validate_log_format(cls, config):
+        """
+        Validate the output format of the log records.
+        
+        Parameters:
+        config (ConfigParser): Configuration object containing logging settings.
+        
+        Returns:
+        str: The validated log format.
+        """
+        
+        log_format = config.get(LogConfig.LOG.value, LogConfig.FORMAT.value, fallback=LogFormat.TEXT.value).lower()
+        if log_format not in LogFormat.list():
+            logging.error(f"{ERROR_DESC['322']}: {log_format}. Valid options are: {', '.join(LogFormat.list())}")
+            log_format = LogFormat.TEXT.value
+        return log_format
+
+    @classmethod
+    def _validate_rate_limit_config(cls, config):
+        """
+        Validate the rate limiting and sampling configuration parameters.
+        
+        Every option of the RATE_LIMIT section other than Enabled and SummaryInterval
+        is a policy, for a log level (Error=100/s) or for a call site (worker.py@123=1/100).
+        
+        Parameters:
+        config (ConfigParser): Configuration object containing logging settings.
+        
+        Returns:
+        RateLimiter: The rate limiter, None if rate limiting is disabled.
+        """
+        
+        section = LogConfig.RATE_LIMIT.value
+        if not config.has_section(section) or not config.getboolean(section, LogConfig.ENABLED.value, fallback=False):
+            return None
+
+        summary_interval = config.getfloat(section, LogConfig.SUMMARY_INTERVAL.value, fallback=60.0)
+        if summary_interval <= 0:
+            logging.error(ERROR_DESC['327'])
+            summary_interval = 60.0
+
+        level_policies = {}
+        site_policies = []
+        options = (LogConfig.ENABLED.value.lower(), LogConfig.SUMMARY_INTERVAL.value.lower())
+        for key in config.options(section):
+            if key.lower() in options:
+                continue
+            value = config.get(section, key)
+            policy = parse_policy(value)
+            if policy is None:
+                logging.error(f"{ERROR_DESC['325']}: {key}={value}")
+                continue
+            call_site = CALL_SITE_PATTERN.match(key)
+            if key.upper() in LogLevel.list():
+                level_policies[logging.getLevelName(key.upper())] = policy
+            elif call_site:
+                site_policies.append((call_site.group('path'), int(call_site.group('line')), policy))
+            else:
+                logging.error(f"{ERROR_DESC['326']}: {key}")
+
+        return RateLimiter(level_policies, site_policies, summary_interval)
+
+    @classmethod
+    def _validate_flight_recorder_config(cls, config):
+        """
+        Validate the flight recorder configuration parameters.
+        
+        Parameters:
+        config (ConfigParser): Configuration object containing logging settings.
+        
+        Returns:
+        tuple: The capacity and the max keys of the flight recorder, None if it is disabled.
+        """
+        
+        section = LogConfig.FLIGHT_RECORDER.value
+        if not config.has_section(section) or not config.getboolean(section, LogConfig.ENABLED.value, fallback=False):
+            return None
+
+        capacity = config.getint(section, LogConfig.CAPACITY.value, fallback=100)
+        max_keys = config.getint(section, LogConfig.MAX_KEYS.value, fallback=1000)
+        if capacity <= 0 or max_keys <= 0:
+            logging.error(ERROR_DESC['334'])
+            capacity = capacity if capacity > 0 else 100
+            max_keys = max_keys if max_keys > 0 else 1000
+
+        return capacity, max_keys
+
+    @classmethod
+    def _validate_metrics_config(cls, config):
+        """
+        Validate the self-metrics configuration parameters.
+        
+        Parameters:
+        config (ConfigParser): Configuration object containing logging settings.
+        
+        Returns:
+        float: The time (in seconds) between two dumps of the metrics, 0 to never dump them, None if the metrics are disabled.
+        """
+        
+        section = LogConfig.METRICS.value
+        if not config.has_section(section) or not config.getboolean(section, LogConfig.ENABLED.value, fallback=False):
+            return None
+
+        dump_interval = config.getfloat(section, LogConfig.DUMP_INTERVAL.value, fallback=0.0)
+        if dump_interval < 0:
+            logging.error(ERROR_DESC['335'])
+            dump_interval = 0.0
+
+        return dump_interval
+
+    @classmethod
+    def _validate_timing_config(cls, config):
+        """
+        Validate the timing configuration parameters.
+        
+        Parameters:
+        config (ConfigParser): Configuration object containing logging settings.
+        
+        Returns:
+        tuple: The time (in seconds) between two timing summaries, and the duration (in nanoseconds) from which a timed call is logged, 0 to never log them.
+        """
+        
+        section = LogConfig.TIMING.value
+        summary_interval = config.getfloat(section, LogConfig.SUMMARY_INTERVAL.value, fallback=60.0)
+        if summary_interval <= 0:
+            logging.error(ERROR_DESC['336'])
+            summary_interval = 60.0
+
+        threshold = config.getfloat(section, LogConfig.THRESHOLD.value, fallback=0.0)
+        if threshold < 0:
+            logging.error(ERROR_DESC['337'])
+            threshold = 0.0
+
+        return summary_interval, int(threshold * 1e6)
+
+    @classmethod
+    def _create_handlers(cls, log_level, log_stdout, log_stderr, log_file_config, formatter, log_format=LogFormat.TEXT.value):
         """
         Create logging handlers based on configuration settings.
         
@@ -161,25 +630,30 @@ class ZLogger(logging.Logger):
         log_stdout (bool): Whether to log to stdout.
         log_stderr (bool): Whether to log to stderr.
         log_file_config (dict): File logging configuration.
-        formatter (logging.Formatter): The formatter for the handlers.
+        formatter (logging.Formatter): The text formatter for the handlers.
+        log_format (str): The output format, text, json or binary. Console handlers write binary records as text.
         
         Returns:
         list: A list of logging handlers.
         """
         
+        console_formatter = JsonFormatter() if log_format == LogFormat.JSON.value else formatter
+        file_formatter = {LogFormat.JSON.value: console_formatter, LogFormat.BINARY.value: BinaryFormatter()}.get(log_format, formatter)
+
         handlers = []
         if log_stdout:
-            handlers.append(self._create_console_handler(log_level, formatter, sys.stdout))
+            handlers.append(cls._create_console_handler(log_level, console_formatter, sys.stdout))
 
         if log_stderr:
-            handlers.append(self._create_console_handler(logging.ERROR, formatter, sys.stderr))
+            handlers.append(cls._create_console_handler(logging.ERROR, console_formatter, sys.stderr))
 
         if log_file_config:
-            handlers.append(self._create_file_handler(log_level, formatter, log_file_config))
+            handlers.append(cls._create_file_handler(log_level, file_formatter, log_file_config))
 
         return handlers
 
-    def _create_console_handler(self, log_level, formatter, stream):
+    @classmethod
+    def _create_console_handler(cls, log_level, formatter, stream):
         """
         Create a console logging handler.
         
@@ -189,15 +663,16 @@ class ZLogger(logging.Logger):
         stream (io.TextIOWrapper): The stream (stdout or stderr) for the handler.
         
         Returns:
-        logging.StreamHandler: The console logging handler.
+        MeteredStreamHandler: The console logging handler.
         """
         
-        console_handler = logging.StreamHandler(stream)
+        console_handler = MeteredStreamHandler(stream)
         console_handler.setLevel(logging.getLevelName(log_level))
         console_handler.setFormatter(formatter)
         return console_handler
 
-    def _create_file_handler(self, log_level, formatter, log_file_config):
+    @classmethod
+    def _create_file_handler(cls, log_level, formatter, log_file_config):
         """
         Create a file logging handler with rotation capabilities.
         
@@ -218,12 +693,47 @@ class ZLogger(logging.Logger):
             max_file_size=log_file_config[LogConfig.MAX_FILE_SIZE.value],
             max_age_days=log_file_config[LogConfig.MAX_AGE_DAYS.value],
             max_storage_size=log_file_config[LogConfig.MAX_STORAGE_SIZE.value],
-            archive_path=log_file_config[LogConfig.ARCHIVE_PATH.value]
+            archive_path=log_file_config[LogConfig.ARCHIVE_PATH.value],
+            buffer_size=log_file_config[LogConfig.BUFFER_SIZE.value],
+            buffer_records=log_file_config[LogConfig.BUFFER_RECORDS.value],
+            flush_interval=log_file_config[LogConfig.FLUSH_INTERVAL.value],
+            fsync_policy=log_file_config[LogConfig.FSYNC_POLICY.value],
+            fsync_interval=log_file_config[LogConfig.FSYNC_INTERVAL.value],
+            archive_compression=log_file_config[LogConfig.ARCHIVE_COMPRESSION.value],
+            archive_compression_level=log_file_config[LogConfig.ARCHIVE_COMPRESSION_LEVEL.value],
+            multiprocess=log_file_config[LogConfig.MULTI_PROCESS.value],
+            shard_per_process=log_file_config[LogConfig.SHARD_PER_PROCESS.value],
+            index=log_file_config[LogConfig.INDEX.value],
+            when=log_file_config[LogConfig.ROTATE_WHEN.value],
+            interval=log_file_config[LogConfig.ROTATE_INTERVAL.value],
+            atTime=log_file_config[LogConfig.ROTATE_AT_TIME.value],
+            utc=log_file_config[LogConfig.ROTATE_UTC.value],
+            retention_interval=log_file_config[LogConfig.RETENTION_INTERVAL.value]
         )
         custom_file_handler.setLevel(logging.getLevelName(log_level))
         custom_file_handler.setFormatter(formatter)
         return custom_file_handler
 
+    @classmethod
+    def _create_async_handler(cls, handlers, async_config):
+        """
+        Create a queue handler that hands the records to a background writer thread.
+        
+        Parameters:
+        handlers (list): The handlers owned by the writer thread.
+        async_config (dict): Asynchronous logging configuration.
+        
+        Returns:
+        AsyncQueueHandler: The asynchronous logging handler.
+        """
+        
+        return AsyncQueueHandler(
+            handlers,
+            queue_size=async_config[LogConfig.QUEUE_SIZE.value],
+            overflow_policy=async_config[LogConfig.OVERFLOW_POLICY.value],
+            overflow_level=logging.getLevelName(async_config[LogConfig.OVERFLOW_LEVEL.value])
+        )
+
     def _configure_loggers(self, log_level, handlers):
         """
         Configure the logger with the specified handlers and log level.
@@ -237,6 +747,187 @@ class ZLogger(logging.Logger):
         for handler in handlers:
             self.addHandler(handler)
         
+    def close(self):
+        """
+        Flush and close the handlers of the logger.
+        
+        In asynchronous mode the queued records are drained before the writer thread stops.
+        A logger created by get_logger is unregistered, and its handlers are only flushed
+        while other loggers still share them.
+        """
+        
+        if self._suppressed_job is not None:
+            scheduler.cancel(self._suppressed_job)
+            self._suppressed_job = None
+            self._log_suppressed()
+        if self._timing_job is not None:
+            scheduler.cancel(self._timing_job)
+            self._timing_job = None
+            self._log_timings()
+        if self._stats_job is not None:
+            scheduler.cancel(self._stats_job)
+            self._stats_job = None
+        if self._handler_pool is not None:
+            # Shared handlers are only closed by the last logger using them.
+            self._handler_pool.release(self)
+            return
+        for handler in list(self.handlers):
+            handler.flush()
+            handler.close()
+            self.removeHandler(handler)
+
+    def timed(self, name=None):
+        """
+        Time a block or the calls of a function into a histogram of its name and module.
+        
+        Used as a context manager or as a decorator, of plain and of coroutine functions
+        whose calls are timed until they return. The durations are measured with
+        time.perf_counter_ns and summarized by one INFO record per name and module every
+        SummaryInterval of the TIMING section, with the count, the p50, p90 and p99
+        percentiles, the mean and the maximum, in milliseconds. A call lasting at least
+        the Threshold of the TIMING section is also logged as a WARNING record.
+        
+        Parameters:
+        name (str): The name of the timing, the qualified name of the decorated function
+            or the name of the function of the timed block if None.
+        
+        Returns:
+        Timed: The context manager and decorator.
+        """
+        
+        frame = sys._getframe(1)
+        return Timed(self, name, caller_module(frame), frame.f_code, frame.f_lineno)
+
+    def _record_timing(self, name, module, duration, code, line_no):
+        """
+        Record the duration of a timed block or call.
+        
+        Parameters:
+        name (str): The name of the timing.
+        module (str): The module of the timing.
+        duration (int): The duration in nanoseconds.
+        code (code): The code object of the timed block or function.
+        line_no (int): The line of the timed block or function.
+        """
+        
+        timing = self._timings.get((name, module))
+        if timing is None:
+            timing = self._create_timing(name, module, code, line_no)
+        timing[0].record(duration)
+        threshold = self._timing_threshold
+        if threshold and duration >= threshold and self.isEnabledFor(logging.WARNING):
+            self.handle(self._make_context_record(logging.WARNING, current_context.get(), code, line_no, "%s took %.3f ms", (name, duration / 1e6)))
+
+    def _create_timing(self, name, module, code, line_no):
+        with self._timing_lock:
+            timing = self._timings.get((name, module))
+            if timing is None:
+                timing = self._timings[(name, module)] = (Histogram(), code, line_no)
+            if self._timing_job is None:
+                self._timing_job = scheduler.schedule(time.time() + self._timing_interval, self._summarize_timings)
+            return timing
+
+    def _summarize_timings(self):
+        """
+        Log the timing summaries of the last interval, from the scheduler thread.
+        
+        Returns:
+        float: The time of the next summary, None once the logger is closed.
+        """
+        
+        if self._timing_job is None or self._timing_job.cancelled:
+            return None
+        self._log_timings()
+        return time.time() + self._timing_interval
+
+    def _log_timings(self):
+        """
+        Log a summary of each timing recorded since the last summary, and start new histograms.
+        """
+        
+        with self._timing_lock:
+            timings, self._timings = self._timings, {}
+        if not self.isEnabledFor(logging.INFO):
+            return
+        for (name, module), (histogram, code, line_no) in timings.items():
+            if not histogram.count:
+                continue
+            context = LogContext(module_name=module, data={'timing': name, **histogram.summary()})
+            self.handle(self._make_context_record(logging.INFO, context, code, line_no, "timing summary of %s", (name,)))
+
+    def flush(self):
+        """
+        Write the records logged so far and flush the handlers.
+        
+        In asynchronous mode this waits until the writer thread has processed the queued records.
+        """
+        
+        for handler in self.handlers:
+            handler.flush()
+
+    async def aflush(self):
+        """
+        Write the records logged so far and flush the handlers, from a coroutine.
+        
+        The flush runs in the default executor of the event loop, which keeps
+        running the other tasks in the meantime.
+        """
+        
+        await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    def stats(self):
+        """
+        Take a snapshot of the metrics of the logger and of its handlers.
+        
+        The record counts and the handler counters are only kept while the metrics
+        are enabled in the METRICS section, the queue depth and the dropped records
+        of an asynchronous handler are always reported.
+        
+        Returns:
+        dict: The logged records by level name and the metrics of each handler.
+        """
+        
+        metrics = self._metrics or {}
+        return {
+            'logger': self.name,
+            'records': {logging.getLevelName(level): count for level, count in sorted(metrics.items())},
+            'handlers': [handler_stats(handler) for handler in self.handlers],
+        }
+
+    def _dump_stats(self):
+        """
+        Log a snapshot of the metrics as an INFO record, from the scheduler thread.
+        
+        Returns:
+        float: The time of the next dump.
+        """
+        
+        if self._stats_job is None or self._stats_job.cancelled:
+            return None
+        extra_context = {
+            LogConfig.REQUEST_ID.value: None,
+            LogConfig.FUNCTION_NAME.value: None,
+            LogConfig.FILE_PATH.value: None,
+            LogConfig.LINE_NO.value: None,
+            LogConfig.DATA.value: '',
+            LogConfig.MODULE_NAME.value: None,
+            LogConfig.CONTEXT.value: EMPTY_CONTEXT
+        }
+        self._handle(logging.INFO, "zlogger stats %s", (json.dumps(self.stats()),), extra_context)
+        return time.time() + self._stats_interval
+
+    @property
+    def extra_context(self):
+        """
+        The context set by the with_* methods for the next logging call of the current thread or asyncio task.
+        """
+        
+        return self._extra_context.get()
+
+    @extra_context.setter
+    def extra_context(self, extra_context):
+        self._extra_context.set(extra_context)
+
     def with_request_id(self, request_id):
         """
         Add request ID to the logger's extra context.
@@ -248,7 +939,7 @@ class ZLogger(logging.Logger):
         ZLogger: The logger instance with updated context.
         """
         
-        self.extra_context[LogConfig.REQUEST_ID.value] = request_id
+        self.extra_context = {**self.extra_context, LogConfig.REQUEST_ID.value: request_id}
         return self
     
     def with_module_name(self, module_name):
@@ -262,7 +953,7 @@ class ZLogger(logging.Logger):
         ZLogger: The logger instance with updated context.
         """
         
-        self.extra_context[LogConfig.MODULE_NAME.value] = module_name
+        self.extra_context = {**self.extra_context, LogConfig.MODULE_NAME.value: module_name}
         return self
     
     def with_additional_data(self, additional_data):
@@ -276,81 +967,640 @@ class ZLogger(logging.Logger):
         ZLogger: The logger instance with updated context.
         """
         
-        if not self.extra_context:
-            self.extra_context = additional_data.copy()
-        else:
-            self.extra_context.update(additional_data)
+        self.extra_context = {**self.extra_context, **additional_data}
         return self
 
-    def log_decorator(func):
+    def bind(self, request_id=None, module_name=None, **data):
+        """
+        Create a child logger bound to a context.
+        
+        The context is merged and rendered once, here, instead of on every logging call.
+        
+        Parameters:
+        request_id (str): The request ID to be bound.
+        module_name (str): The module name to be bound.
+        data: Additional data to be bound.
+        
+        Returns:
+        BoundLogger: The child logger.
+        """
+        
+        return BoundLogger(self, LogContext(request_id, module_name, data))
+
+    @contextlib.contextmanager
+    def context(self, request_id=None, module_name=None, **data):
+        """
+        Set a context for every logging call of the current thread or asyncio task inside the with block.
+        
+        Nested contexts are merged with the enclosing one.
+        
+        Parameters:
+        request_id (str): The request ID of the context.
+        module_name (str): The module name of the context.
+        data: Additional data of the context.
+        
+        Returns:
+        ZLogger: The logger instance.
+        """
+        
+        token = current_context.set(current_context.get().merge(LogContext(request_id, module_name, data)))
+        try:
+            yield self
+        finally:
+            current_context.reset(token)
+
+    def log_many(self, level, messages, context=None):
+        """
+        Log many messages of one level from one call site in a single pass.
+        
+        The level, the caller and the context are resolved once for the whole batch,
+        and each handler processes the records at once: the file handlers check the
+        rollover once and write the batch with a single write call per log file.
+        The rate limit is applied to each message, and the records share the creation
+        time of the batch.
+        
+        Parameters:
+        level (int): The log level of the records.
+        messages (iterable): The log messages, each a message or a (message, *args) tuple.
+        context (dict): The context of the records, as built by the with_* methods,
+            merged into the current context and the context set by the with_* methods.
+        """
+        
+        caller_frame = sys._getframe(1)
+        self._log_many(level, messages, context, caller_frame.f_code, caller_frame.f_lineno)
+
+    def batch(self, level=logging.INFO, context=None):
+        """
+        Collect messages in the with block and log them with log_many when the block exits.
+        
+        Messages are appended to the yielded list, each a message or a (message, *args) tuple.
+        The collected messages are also logged when the block raises.
+        
+        Parameters:
+        level (int): The log level of the records.
+        context (dict): The context of the records, as for log_many.
+        
+        Returns:
+        A context manager yielding the list of messages.
+        """
+        
+        caller_frame = sys._getframe(1)
+        return self._batch(level, context, caller_frame.f_code, caller_frame.f_lineno)
+
+    @contextlib.contextmanager
+    def _batch(self, level, context, code, line_no):
+        messages = []
+        try:
+            yield messages
+        finally:
+            self._log_many(level, messages, context, code, line_no)
+
+    def _log_many(self, level, messages, context, code, line_no):
+        """
+        Log a batch of messages from one call site.
+        
+        Parameters:
+        level (int): The log level of the records.
+        messages (iterable): The log messages, each a message or a (message, *args) tuple.
+        context (dict): The context of the records.
+        code (code): The code object of the caller.
+        line_no (int): The line of the call.
+        """
+        
+        pending_context = self._extra_context.get()
+        if pending_context:
+            self.extra_context = {}
+        if not self.isEnabledFor(level):
+            return
+        limiter = self._rate_limiter
+        if limiter is not None:
+            messages = [message for message in messages if limiter.allow(code, line_no, level)]
+        else:
+            messages = list(messages)
+        if not messages:
+            return
+
+        log_context = current_context.get()
+        if pending_context:
+            log_context = log_context.merge(LogContext.from_dict(pending_context))
+        if context:
+            log_context = log_context.merge(LogContext.from_dict(context))
+        if level >= logging.ERROR and self._flight_recorder is not None:
+            self._dump_flight_recorder(log_context)
+
+        # The first record resolves the caller and builds the extra fields, the others are copies
+        # of it with their own message, and share its creation time.
+        message, args = self._batch_message(messages[0])
+        first = self._make_context_record(level, log_context, code, line_no, message, args)
+        records = [first]
+        metrics = self._metrics
+        if metrics is not None:
+            metrics[level] = metrics.get(level, 0) + len(messages) - 1
+        if first.__class__ is ZLogRecord:
+            fields = first.__dict__
+            new_record = ZLogRecord.__new__
+            for item in messages[1:]:
+                record = new_record(ZLogRecord)
+                record.__dict__.update(fields)
+                record.msg, args = self._batch_message(item)
+                # A single mapping argument is used for %(key)s formatting, as in LogRecord.
+                if len(args) == 1 and isinstance(args[0], collections.abc.Mapping) and args[0]:
+                    args = args[0]
+                record.args = args
+                records.append(record)
+        else:
+            extra_context = {key: first.__dict__[key] for key in (
+                LogConfig.REQUEST_ID.value, LogConfig.FUNCTION_NAME.value, LogConfig.FILE_PATH.value,
+                LogConfig.LINE_NO.value, LogConfig.DATA.value, LogConfig.MODULE_NAME.value, LogConfig.CONTEXT.value
+            )}
+            for item in messages[1:]:
+                message, args = self._batch_message(item)
+                records.append(self.makeRecord(self.name, level, first.pathname, first.lineno, message, args, None, first.funcName, extra_context))
+        self._handle_many(records)
+
+    @staticmethod
+    def _batch_message(item):
+        """
+        Split a batch item into its message and its arguments, with the lazy values computed.
+        
+        Parameters:
+        item: A message or a (message, *args) tuple.
+        
+        Returns:
+        tuple: The message and the tuple of arguments.
+        """
+        
+        if item.__class__ is tuple:
+            message, args = item[0], item[1:]
+        else:
+            message, args = item, ()
+        if message.__class__ is not str:
+            message = message.value if message.__class__ is Lazy else message() if message.__class__ is types.FunctionType else message
+        if args:
+            args = tuple([arg.value if arg.__class__ is Lazy else arg for arg in args])
+        return message, args
+
+    def _handle_many(self, records):
+        """
+        Pass a batch of records to the handlers of the logger and of its ancestors, as Logger.handle does for one record.
+        
+        Parameters:
+        records (list): The log records, in creation order.
+        """
+        
+        if self.disabled:
+            return
+        if self.filters:
+            records = [record for record in records if self.filter(record)]
+            if not records:
+                return
+        logger = self
+        while logger:
+            for handler in logger.handlers:
+                handle_batch(handler, records)
+            if not logger.propagate:
+                break
+            logger = logger.parent
+
+    def setLevel(self, level):
+        """
+        Set the logging level of this logger.
+        
+        Parameters:
+        level (int or str): The new log level.
+        """
+        
+        super().setLevel(level)
+        # ZLogger instances are not registered with the logging manager, so the manager
+        # does not invalidate their cached per-level enablement, clear it here.
+        self._cache.clear()
+
+    def log_decorator(level, exc_info=False):
         """
         A decorator for logging methods to add extra context to log records.
         
+        Calls for a level that is not enabled return before any frame inspection
+        or context building takes place. The decorated method only documents the
+        logging method, its body is never run.
+        
         Parameters:
-        func (function): The logging method to be decorated.
+        level (int): The log level of the decorated logging method.
+        exc_info (bool): Whether the records carry the exception being handled, unless the call passes exc_info.
         
         Returns:
-        function: The wrapped logging method with extra context.
+        function: A decorator wrapping the logging method with extra context.
         """
         
-        @wraps(func)
-        def wrapper(self, message, *args, **kwargs):
-            caller_frame = inspect.currentframe().f_back
-            caller_func_name = caller_frame.f_code.co_name
-            caller_file_name = caller_frame.f_code.co_filename
-            line_no = caller_frame.f_lineno
+        def decorator(func):
+            @wraps(func)
+            def wrapper(self, message, *args, **kwargs):
+                try:
+                    enabled = self._cache[level] and not self.disabled
+                except KeyError:
+                    enabled = self.isEnabledFor(level)
+                if not enabled:
+                    pending_context = self._extra_context.get()
+                    recorder = self._flight_recorder
+                    if recorder is not None and level >= recorder.level:
+                        caller_frame = sys._getframe(1)
+                        recorder.record(current_context.get(), pending_context, caller_frame.f_code, caller_frame.f_lineno, level, message, args)
+                    # Drop the context set by the with_* methods so it does not leak into the next call.
+                    if pending_context:
+                        self.extra_context = {}
+                    return
 
-            if caller_func_name == "<module>":
-                caller_func_name = os.path.splitext(os.path.basename(caller_file_name))[0]
+                caller_frame = sys._getframe(1)
+                limiter = self._rate_limiter
+                if limiter is not None:
+                    # Decided before any context or formatting work.
+                    if not limiter.allow(caller_frame.f_code, caller_frame.f_lineno, level):
+                        if self.extra_context:
+                            self.extra_context = {}
+                        return
 
-            data = {k: v for k, v in self.extra_context.items() if k not in [LogConfig.REQUEST_ID.value, LogConfig.MODULE_NAME.value]}
+                pending_context = self.extra_context
+                if pending_context:
+                    self.extra_context = {}
+                    context = current_context.get().merge(LogContext.from_dict(pending_context))
+                else:
+                    context = current_context.get()
 
+                if level >= logging.ERROR and self._flight_recorder is not None:
+                    self._dump_flight_recorder(context)
+                if exc_info:
+                    kwargs.setdefault('exc_info', True)
+                return self._log_with_context(level, context, caller_frame, message, args, **kwargs)
+            wrapper.level = level
+            wrapper.exc_info = exc_info
+            return wrapper
+        return decorator
+
+    def _summarize_suppressed(self):
+        """
+        Log the summaries of the suppressed records, from the scheduler thread.
+        
+        Returns:
+        float: The time of the next summary, None once the logger is closed.
+        """
+        
+        if self._suppressed_job is None or self._suppressed_job.cancelled:
+            return None
+        self._log_suppressed()
+        return time.time() + self._rate_limiter.summary_interval
+
+    def _log_suppressed(self):
+        """
+        Log a summary of the records suppressed by the rate limiter since the last summary.
+        
+        Each summary is logged at the level of the suppressed records, from their call site.
+        """
+        
+        for site, level, count in self._rate_limiter.take_suppressed():
             extra_context = {
-                LogConfig.REQUEST_ID.value: self.extra_context.get(LogConfig.REQUEST_ID.value),
-                LogConfig.FUNCTION_NAME.value: caller_func_name,
-                LogConfig.FILE_PATH.value: caller_file_name,
-                LogConfig.LINE_NO.value: '#' + str(line_no),
-                LogConfig.ASCTIME1.value: CustomFormatter.formatTime(self),
-                LogConfig.DATA.value: ' '.join(f"{k}: {v}," for k, v in data.items()) if data else '',
-                LogConfig.MODULE_NAME.value: self.extra_context.get(LogConfig.MODULE_NAME.value)
+                LogConfig.REQUEST_ID.value: None,
+                LogConfig.FUNCTION_NAME.value: site.function_name,
+                LogConfig.FILE_PATH.value: site.file_path,
+                LogConfig.LINE_NO.value: site.line_no,
+                LogConfig.DATA.value: '',
+                LogConfig.MODULE_NAME.value: None,
+                LogConfig.CONTEXT.value: EMPTY_CONTEXT
             }
+            self._handle(level, "suppressed %d records from %s:%d", (count, site.file_path, site.line_no), extra_context)
 
-            self.extra_context = {}
-            
-            return func(self, message, *args, extra=extra_context)
+    def _log_with_context(self, level, context, caller_frame, message, args, exc_info=None, stack_info=False, stacklevel=1, extra=None):
+        """
+        Log a record with the extra fields of a context and of the caller.
+        
+        Parameters:
+        level (int): The log level of the record.
+        context (LogContext): The context of the logging call.
+        caller_frame (frame): The frame of the caller of the logging method.
+        message (str): The log message.
+        args (tuple): The arguments of the log message.
+        exc_info: An exception, an exc_info tuple or True for the exception being handled, as in logging.
+        stack_info (bool): Whether to add the stack of the caller to the record.
+        stacklevel (int): The caller is stacklevel - 1 frames above the caller of the logging method.
+        extra (dict): Extra attributes of the record.
+        """
+        
+        while stacklevel > 1 and caller_frame.f_back is not None:
+            caller_frame = caller_frame.f_back
+            stacklevel -= 1
+        if exc_info:
+            if isinstance(exc_info, BaseException):
+                exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+            elif not isinstance(exc_info, tuple):
+                exc_info = sys.exc_info()
+        sinfo = None
+        if stack_info:
+            with io.StringIO() as stream:
+                stream.write('Stack (most recent call last):\n')
+                traceback.print_stack(caller_frame, file=stream)
+                sinfo = stream.getvalue().rstrip('\n')
+        self.handle(self._make_context_record(level, context, caller_frame.f_code, caller_frame.f_lineno, message, args, exc_info, sinfo, extra))
+
+    def _make_context_record(self, level, context, code, line_no, message, args, exc_info=None, sinfo=None, extra=None):
+        """
+        Build a record with the extra fields of a context and of the caller.
+        
+        The caller metadata is computed once per call site, and the record is
+        built directly from it instead of walking the stack in Logger.findCaller.
+        Without caller capture the caller fields are None.
+        
+        Parameters:
+        level (int): The log level of the record.
+        context (LogContext): The context of the logging call.
+        code (code): The code object of the caller.
+        line_no (int): The line of the call.
+        message (str): The log message.
+        args (tuple): The arguments of the log message.
+        exc_info (tuple): The exception of the record.
+        sinfo (str): The stack of the record.
+        extra (dict): Extra attributes of the record, the context fields take precedence.
+        
+        Returns:
+        LogRecord: The record.
+        """
+        
+        # Lazy messages and arguments are computed here, once the level and rate limit checks passed.
+        if message.__class__ is not str:
+            message = message.value if message.__class__ is Lazy else message() if message.__class__ is types.FunctionType else message
+        if args:
+            args = tuple([arg.value if arg.__class__ is Lazy else arg for arg in args])
+
+        if self.capture_caller:
+            caller = _callers.get((code, line_no))
+            if caller is None:
+                caller = _caller_metadata(code, line_no)
+            caller_func_name, caller_file_name, line_no = caller
+        else:
+            caller_func_name = caller_file_name = line_no = None
+
+        extra_context = {
+            LogConfig.REQUEST_ID.value: context.request_id,
+            LogConfig.FUNCTION_NAME.value: caller_func_name,
+            LogConfig.FILE_PATH.value: caller_file_name,
+            LogConfig.LINE_NO.value: line_no,
+            LogConfig.DATA.value: context.data_text,
+            LogConfig.MODULE_NAME.value: context.module_name,
+            LogConfig.CONTEXT.value: context
+        }
+        if extra:
+            extra_context = {**extra, **extra_context}
+
+        return self._make_record(level, message, args, extra_context, exc_info, sinfo)
+
+    def _handle(self, level, message, args, extra_context):
+        """
+        Build a record from the caller fields of its extra context and pass it to the handlers.
+        
+        Parameters:
+        level (int): The log level of the record.
+        message (str): The log message.
+        args (tuple): The arguments of the log message.
+        extra_context (dict): The extra fields of the record.
+        """
+        
+        self.handle(self._make_record(level, message, args, extra_context))
+
+    def _make_record(self, level, message, args, extra_context, exc_info=None, sinfo=None):
+        """
+        Build a record from the caller fields of its extra context.
+        
+        Parameters:
+        level (int): The log level of the record.
+        message (str): The log message.
+        args (tuple): The arguments of the log message.
+        extra_context (dict): The extra fields of the record.
+        exc_info (tuple): The exception of the record.
+        sinfo (str): The stack of the record.
+        
+        Returns:
+        LogRecord: The record.
+        """
+        
+        metrics = self._metrics
+        if metrics is not None:
+            metrics[level] = metrics.get(level, 0) + 1
+        return self.makeRecord(
+            self.name, level,
+            extra_context[LogConfig.FILE_PATH.value] or UNKNOWN_FILE,
+            extra_context[LogConfig.LINE_NO.value] or 0,
+            message, args, exc_info,
+            extra_context[LogConfig.FUNCTION_NAME.value] or UNKNOWN_FUNCTION,
+            extra_context, sinfo
+        )
+
+    def _dump_flight_recorder(self, context):
+        """
+        Write the records kept by the flight recorder for the request ID of a context, or for the current thread.
+        
+        The records keep their level and time and bypass the level of the handlers.
+        They are written to the file handlers, or to every handler without file logging.
+        
+        Parameters:
+        context (LogContext): The context of the error being logged.
+        """
+        
+        entries = self._flight_recorder.take(context.request_id or threading.get_ident())
+        if not entries:
+            return
+        records = []
+        for created, level, message, args, context, pending_context, code, line_no, thread in entries:
+            if pending_context:
+                context = context.merge(LogContext.from_dict(pending_context))
+            record = self._make_context_record(level, context, code, line_no, message, args)
+            record.created = created
+            record.msecs = int((created - int(created)) * 1000) + 0.0
+            record.relativeCreated = (created - logging._startTime) * 1000
+            record.thread = thread
+            records.append(record)
+        handlers = [handler for handler in self.handlers for handler in getattr(handler, 'handlers', [handler])]
+        file_handlers = [handler for handler in handlers if isinstance(handler, CustomFileRotator)]
+        for handler in self.handlers:
+            wrapped = getattr(handler, 'handlers', None)
+            targets = [target for target in wrapped or [handler] if not file_handlers or target in file_handlers]
+            if not targets:
+                continue
+            if wrapped is not None:
+                # Written by the writer thread, after the records already queued and before the error.
+                handler.enqueue(HandlerBatch(records, targets))
+                continue
+            for record in records:
+                handler.handle(record)
+
+    def makeRecord(self, name, level, fn, lno, msg, args, exc_info, func=None, extra=None, sinfo=None):
+        """
+        Create a ZLogRecord, unless another record factory is installed.
+        """
+        
+        if logging.getLogRecordFactory() is not logging.LogRecord:
+            return super().makeRecord(name, level, fn, lno, msg, args, exc_info, func, extra, sinfo)
+        record = ZLogRecord(name, level, fn, lno, msg, args, exc_info, func, sinfo)
+        if extra is not None:
+            for key in extra:
+                if (key in ["message", "asctime"]) or (key in record.__dict__):
+                    raise KeyError("Attempt to overwrite %r in LogRecord" % key)
+                record.__dict__[key] = extra[key]
+        return record
+
+    @log_decorator(CustomLogLevel.FATAL_LEVEL.value)
+    def fatal(self, message, *args, **kwargs):
+        """Log a message with FATAL level."""
+
+    @log_decorator(CustomLogLevel.REJECT_LEVEL.value)
+    def reject(self, message, *args, **kwargs):
+        """Log a message with REJECT level."""
+
+    @log_decorator(CustomLogLevel.SUCCESS_LEVEL.value)
+    def success(self, message, *args, **kwargs):
+        """Log a message with SUCCESS level."""
+
+    @log_decorator(logging.DEBUG)
+    def debug(self, message, *args, **kwargs):
+        """Log a message with DEBUG level."""
+
+    @log_decorator(logging.INFO)
+    def info(self, message, *args, **kwargs):
+        """Log a message with INFO level."""
+
+    @log_decorator(logging.WARNING)
+    def warning(self, message, *args, **kwargs):
+        """Log a message with WARNING level."""
+
+    @log_decorator(logging.ERROR)
+    def error(self, message, *args, **kwargs):
+        """Log a message with ERROR level."""
+
+    @log_decorator(logging.ERROR, exc_info=True)
+    def exception(self, message, *args, **kwargs):
+        """Log a message with ERROR level and the exception being handled."""
+
+
+def bound_log_method(method):
+    """
+    A decorator turning a BoundLogger method into the bound version of a ZLogger logging method.
+    
+    Parameters:
+    method (function): The decorated ZLogger logging method.
+    
+    Returns:
+    function: A decorator for the BoundLogger method.
+    """
+    
+    level = method.level
+    exc_info = method.exc_info
+
+    def decorator(bound_func):
+        @wraps(bound_func)
+        def wrapper(self, message, *args, **kwargs):
+            logger = self.logger
+            if not logger.isEnabledFor(level):
+                recorder = logger._flight_recorder
+                if recorder is not None and level >= recorder.level:
+                    caller_frame = sys._getframe(1)
+                    recorder.record(self.get_context(), {}, caller_frame.f_code, caller_frame.f_lineno, level, message, args)
+                return
+            caller_frame = sys._getframe(1)
+            limiter = logger._rate_limiter
+            if limiter is not None:
+                if not limiter.allow(caller_frame.f_code, caller_frame.f_lineno, level):
+                    return
+            context = self.get_context()
+            if level >= logging.ERROR and logger._flight_recorder is not None:
+                logger._dump_flight_recorder(context)
+            if exc_info:
+                kwargs.setdefault('exc_info', True)
+            return logger._log_with_context(level, context, caller_frame, message, args, **kwargs)
         return wrapper
+    return decorator
+
+
+class BoundLogger:
+    def __init__(self, logger, context):
+        """
+        Initialize a child logger bound to a context.
+        
+        Parameters:
+        logger (ZLogger): The parent logger.
+        context (LogContext): The bound context.
+        """
+        
+        self.logger = logger
+        self.bound_context = context
+        self._merged_context = (None, None)
+
+    def __getattr__(self, name):
+        return getattr(self.logger, name)
 
-    @log_decorator
+    def get_context(self):
+        """
+        Get the bound context merged with the context of the current thread or asyncio task.
+        
+        Returns:
+        LogContext: The context of the next logging call.
+        """
+        
+        ambient = current_context.get()
+        if ambient is EMPTY_CONTEXT:
+            return self.bound_context
+        # Merge once per distinct enclosing context instead of on every call.
+        merged_for, merged = self._merged_context
+        if merged_for is not ambient:
+            merged = ambient.merge(self.bound_context)
+            self._merged_context = (ambient, merged)
+        return merged
+
+    def bind(self, request_id=None, module_name=None, **data):
+        """
+        Create a child logger bound to this context extended with the given values.
+        
+        Returns:
+        BoundLogger: The child logger.
+        """
+        
+        return BoundLogger(self.logger, self.bound_context.merge(LogContext(request_id, module_name, data)))
+
+    def with_request_id(self, request_id):
+        """Create a child logger with the given request ID."""
+        return self.bind(request_id=request_id)
+
+    def with_module_name(self, module_name):
+        """Create a child logger with the given module name."""
+        return self.bind(module_name=module_name)
+
+    def with_additional_data(self, additional_data):
+        """Create a child logger with the given additional data."""
+        return BoundLogger(self.logger, self.bound_context.merge(LogContext.from_dict(additional_data)))
+
+    @bound_log_method(ZLogger.fatal)
     def fatal(self, message, *args, **kwargs):
         """Log a message with FATAL level."""
-        self.log(CustomLogLevel.FATAL_LEVEL.value, message, *args, **kwargs)
 
-    @log_decorator
+    @bound_log_method(ZLogger.reject)
     def reject(self, message, *args, **kwargs):
         """Log a message with REJECT level."""
-        self.log(CustomLogLevel.REJECT_LEVEL.value, message, *args, **kwargs)
 
-    @log_decorator
+    @bound_log_method(ZLogger.success)
     def success(self, message, *args, **kwargs):
         """Log a message with SUCCESS level."""
-        self.log(CustomLogLevel.SUCCESS_LEVEL.value, message, *args, **kwargs)
 
-    @log_decorator
+    @bound_log_method(ZLogger.debug)
     def debug(self, message, *args, **kwargs):
         """Log a message with DEBUG level."""
-        self.log(logging.DEBUG, message, *args, **kwargs)
 
-    @log_decorator
+    @bound_log_method(ZLogger.info)
     def info(self, message, *args, **kwargs):
         """Log a message with INFO level."""
-        self.log(logging.INFO, message, *args, **kwargs)
 
-    @log_decorator
+    @bound_log_method(ZLogger.warning)
     def warning(self, message, *args, **kwargs):
         """Log a message with WARNING level."""
-        self.log(logging.WARNING, message, *args, **kwargs)
 
-    @log_decorator
+    @bound_log_method(ZLogger.error)
     def error(self, message, *args, **kwargs):
         """Log a message with ERROR level."""
-        self.log(logging.ERROR, message, *args, **kwargs)
\ No newline at end of file
+
+    @bound_log_method(ZLogger.exception)
+    def exception(self, message, *args, **kwargs):
+        """Log a message with ERROR level and the exception being handled."""
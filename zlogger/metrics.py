@@ -0,0 +1,151 @@
+import time
+import logging
+
+# Counters of the file handlers, the *_ns counters are the total time spent, in nanoseconds
+FILE_COUNTERS = ('records', 'bytes', 'format_ns', 'rollover_check_ns', 'rollover_ns', 'rotations', 'evictions', 'expired', 'archived', 'archive_ns')
+
+# Counters of the console handlers, which write text and count characters
+CONSOLE_COUNTERS = ('records', 'characters', 'format_ns')
+
+
+class MeteredStreamHandler(logging.StreamHandler):
+    """
+    A StreamHandler counting its records, characters and formatting time once its metrics are enabled,
+    and writing batches of records at once.
+    """
+
+    metrics = None
+
+    def emit(self, record):
+        """
+        Emit a record, measuring the formatting time if the metrics are enabled.
+
+        Parameters:
+        record (LogRecord): The log record that is being processed.
+        """
+
+        metrics = self.metrics
+        if metrics is None:
+            return super().emit(record)
+        try:
+            start = time.perf_counter_ns()
+            msg = self.format(record)
+            metrics['format_ns'] += time.perf_counter_ns() - start
+            self.stream.write(msg + self.terminator)
+            self.flush()
+            metrics['records'] += 1
+            metrics['characters'] += len(msg) + len(self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def handle_many(self, records):
+        """
+        Emit records already filtered by the level of the handler, with one write and one flush.
+
+        A record that fails to format is reported on its own and the other records are still written.
+
+        Parameters:
+        records (list): The log records, in creation order.
+        """
+
+        with self.lock:
+            try:
+                metrics = self.metrics
+                start = time.perf_counter_ns()
+                lines = []
+                for record in records:
+                    try:
+                        lines.append(self.format(record) + self.terminator)
+                    except RecursionError:
+                        raise
+                    except Exception:
+                        self.handleError(record)
+                if metrics is not None:
+                    metrics['format_ns'] += time.perf_counter_ns() - start
+                if not lines:
+                    return
+                text = ''.join(lines)
+                self.stream.write(text)
+                self.flush()
+                if metrics is not None:
+                    metrics['records'] += len(lines)
+                    metrics['characters'] += len(text)
+            except RecursionError:
+                raise
+            except Exception:
+                self.handleError(records[0])
+
+
+def enable_metrics(handlers):
+    """
+    Enable the metrics of handlers, and of the handlers of the asynchronous handlers.
+
+    Handlers whose metrics are already enabled keep their counters.
+
+    Parameters:
+    handlers (list): The handlers.
+    """
+
+    for handler in handlers:
+        enable_metrics(getattr(handler, 'handlers', ()))
+        # Only the zlogger handlers have a metrics attribute, None until enabled.
+        if getattr(handler, 'metrics', False) is not None:
+            continue
+        if isinstance(handler, MeteredStreamHandler):
+            handler.metrics = dict.fromkeys(CONSOLE_COUNTERS, 0)
+        else:
+            handler.metrics = dict.fromkeys(FILE_COUNTERS, 0)
+            if handler.archiver is not None:
+                handler.archiver.metrics = handler.metrics
+
+
+def disable_metrics(handlers):
+    """
+    Disable the metrics of handlers, and of the handlers of the asynchronous handlers, and drop their counters.
+
+    Parameters:
+    handlers (list): The handlers.
+    """
+
+    for handler in handlers:
+        disable_metrics(getattr(handler, 'handlers', ()))
+        if getattr(handler, 'metrics', None) is None:
+            continue
+        handler.metrics = None
+        archiver = getattr(handler, 'archiver', None)
+        if archiver is not None:
+            archiver.metrics = None
+
+
+def handler_stats(handler):
+    """
+    Take a snapshot of the metrics of a handler.
+
+    Parameters:
+    handler (logging.Handler): The handler.
+
+    Returns:
+    dict: The sink of the handler and its counters, with the queue depth, the records
+        waiting for a free slot on behalf of an event loop, the dropped records and the
+        snapshots of the wrapped handlers for an asynchronous handler.
+    """
+
+    handlers = getattr(handler, 'handlers', None)
+    if handlers is not None:
+        return {
+            'sink': 'async',
+            'queue_depth': handler.queue.qsize(),
+            'queue_size': handler.queue.maxsize,
+            'backlog': len(handler._backlog),
+            'dropped': handler.dropped,
+            'dropped_by_level': dict(handler.dropped_by_level),
+            'handlers': [handler_stats(wrapped) for wrapped in handlers],
+        }
+    if hasattr(handler, 'baseFilename'):
+        stats = {'sink': 'file', 'path': handler.baseFilename}
+    else:
+        stats = {'sink': getattr(getattr(handler, 'stream', None), 'name', type(handler).__name__)}
+    stats.update(getattr(handler, 'metrics', None) or {})
+    return stats
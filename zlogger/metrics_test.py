@@ -0,0 +1,90 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from zlogger import ZLogger
+from zlogger.testing import create_config
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def create_logger(self, metrics=None, **log):
+        config = create_config(self.tmp_dir, LOG=log, LOG_FILE={'MaxFileSize': '2048'}, METRICS=metrics or {'Enabled': 'False'})
+        logger = ZLogger("metrics-test", config)
+        self.addCleanup(logger.close)
+        return logger
+
+    def test_records_bytes_rotations_and_archives_are_counted(self):
+        logger = self.create_logger({'Enabled': 'True'})
+        handler = logger.handlers[0]
+        # The startup sync of the log directory would also archive the files rotated before it runs.
+        handler.archiver.wait()
+        for i in range(100):
+            logger.info("item %s", i)
+        logger.error("failed")
+        logger.debug("not logged")
+        handler.archiver.wait()
+        stats = logger.stats()
+        file_stats = stats['handlers'][0]
+
+        self.assertEqual(stats['records'], {'INFO': 100, 'ERROR': 1})
+        self.assertEqual(file_stats['sink'], 'file')
+        self.assertEqual(file_stats['records'], 101)
+        log_path = os.path.join(self.tmp_dir, 'logs')
+        self.assertEqual(file_stats['bytes'], sum(os.path.getsize(os.path.join(log_path, name)) for name in os.listdir(log_path)))
+        self.assertGreater(file_stats['rotations'], 0)
+        self.assertEqual(file_stats['archived'], file_stats['rotations'])
+        self.assertGreater(file_stats['format_ns'], 0)
+        self.assertGreater(file_stats['rollover_ns'], 0)
+
+    def test_disabled_metrics_are_not_measured(self):
+        logger = self.create_logger()
+        with mock.patch('time.perf_counter_ns') as perf_counter_ns:
+            for i in range(10):
+                logger.info("item %s", i)
+
+        perf_counter_ns.assert_not_called()
+        stats = logger.stats()
+        self.assertEqual(stats['records'], {})
+        self.assertEqual(set(stats['handlers'][0]), {'sink', 'path'})
+
+    def test_disabling_metrics_detaches_the_handler_counters(self):
+        logger = self.create_logger({'Enabled': 'True'}, Async='True')
+        handler = logger.handlers[0].handlers[0]
+        logger.info("counted")
+        logger.apply_settings(ZLogger.validate_settings(create_config(self.tmp_dir, METRICS={'Enabled': 'False'})), logger.handlers)
+
+        self.assertIsNone(handler.metrics)
+        self.assertIsNone(handler.archiver.metrics)
+        self.assertEqual(set(logger.stats()['handlers'][0]['handlers'][0]), {'sink', 'path'})
+
+    def test_async_queue_and_periodic_dump(self):
+        logger = self.create_logger({'Enabled': 'True', 'DumpInterval': '0.1'}, Async='True', QueueSize='100')
+        logger.info("first")
+        handler = logger.handlers[0]
+        file_handler = handler.handlers[0]
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            handler.flush()
+            with open(file_handler.baseFilename) as file:
+                dumps = [line for line in file if 'zlogger stats ' in line]
+            if dumps:
+                break
+            time.sleep(0.05)
+
+        stats = json.loads(dumps[0].split('zlogger stats ', 1)[1])
+        self.assertEqual(stats['records'], {'INFO': 1})
+        self.assertEqual(stats['handlers'][0]['sink'], 'async')
+        self.assertEqual(stats['handlers'][0]['queue_size'], 100)
+        self.assertEqual(stats['handlers'][0]['handlers'][0]['sink'], 'file')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import json
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+
+from zlogger import custom_file_rotater
+from zlogger.archiver import LogArchiver, MANIFEST_NAME
+from zlogger.custom_file_rotater import CustomFileRotator
+
+PROCESSES = 8
+RECORDS = 2000
+LINE_PATTERN = re.compile(r'(\d+) (\d{6}) x{80}')
+
+
+def create_handler(log_path, archive_path, file_name, **kwargs):
+    handler = CustomFileRotator(
+        "odapi",
+        ".log",
+        filename=os.path.join(log_path, file_name),
+        log_path=log_path,
+        archive_path=archive_path,
+        max_file_size=64 * 1024,
+        max_age_days=0,
+        max_storage_size=1 << 30,
+        multiprocess=True,
+        **kwargs
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def log_lines(handler, worker):
+    for i in range(RECORDS):
+        handler.emit(logging.LogRecord("odapi", logging.INFO, __file__, 1, f"{worker} {i:06d} " + "x" * 80, None, None))
+
+
+def run_worker(log_path, archive_path, worker, barrier):
+    handler = create_handler(log_path, archive_path, f"odapi.log-2024-01-01-00000{worker}")
+    barrier.wait()
+    log_lines(handler, worker)
+    handler.close()
+
+
+def run_forked_worker(handler, worker):
+    log_lines(handler, worker)
+    handler.close()
+
+
+@unittest.skipIf(custom_file_rotater.fcntl is None, "fcntl is not available")
+class MultiProcessTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.log_path = os.path.join(self.tmp_dir, "logs")
+        self.archive_path = os.path.join(self.tmp_dir, "archive")
+        os.makedirs(self.log_path)
+        os.makedirs(self.archive_path)
+        self.context = multiprocessing.get_context("fork")
+
+    def read_lines(self):
+        lines = []
+        for file in os.listdir(self.log_path):
+            if not file.startswith("."):
+                with open(os.path.join(self.log_path, file)) as log_file:
+                    lines.extend(log_file.read().splitlines())
+        return lines
+
+    def assert_every_line_once(self, lines, workers):
+        counts = Counter()
+        for line in lines:
+            match = LINE_PATTERN.fullmatch(line)
+            self.assertIsNotNone(match, f"Corrupted line: {line!r}")
+            counts[(int(match.group(1)), int(match.group(2)))] += 1
+        self.assertEqual(set(counts.values()), {1})
+        self.assertEqual(len(counts), workers * RECORDS)
+
+    def test_archivers_sharing_the_lock_file_archive_each_file_once(self):
+        def write_log_file(name):
+            with open(os.path.join(self.log_path, name), "w") as file:
+                file.write("x" * 100)
+            return os.path.join(self.log_path, name)
+
+        for day in range(1, 5):
+            write_log_file(f"odapi.log-2023-01-0{day}-000000")
+        lock_path = os.path.join(self.log_path, ".odapi.log.lock")
+        archivers = [LogArchiver(self.archive_path, "gzip", lock_path=lock_path) for _ in range(2)]
+        archive = LogArchiver.archive
+        archived = []
+
+        def count_archive(archiver, file_path, move=False):
+            archived.append(os.path.basename(file_path))
+            return archive(archiver, file_path, move)
+
+        with mock.patch.object(LogArchiver, "archive", autospec=True, side_effect=count_archive):
+            for archiver in archivers:
+                archiver.start()
+                archiver.submit_sync(self.log_path)
+            for archiver in archivers:
+                archiver.wait()
+            archivers[0].submit(write_log_file("odapi.log-2023-02-01-000000"))
+            archivers[1].submit(write_log_file("odapi.log-2023-02-02-000000"))
+            for archiver in archivers:
+                archiver.stop()
+
+        self.assertEqual(sorted(archived), ["odapi.log-2023-01-01-000000", "odapi.log-2023-01-02-000000", "odapi.log-2023-01-03-000000", "odapi.log-2023-02-01-000000", "odapi.log-2023-02-02-000000"])
+        with open(os.path.join(self.archive_path, MANIFEST_NAME)) as file:
+            self.assertEqual(sorted(json.load(file)), sorted(archived))
+
+    def test_processes_share_the_log_file_without_losing_lines(self):
+        barrier = self.context.Barrier(PROCESSES)
+        processes = [self.context.Process(target=run_worker, args=(self.log_path, self.archive_path, worker, barrier)) for worker in range(PROCESSES)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        self.assert_every_line_once(self.read_lines(), PROCESSES)
+        # The workers rotated the shared file together, only the current file is not full.
+        sizes = [os.path.getsize(os.path.join(self.log_path, file)) for file in os.listdir(self.log_path) if not file.startswith(".")]
+        self.assertGreater(len(sizes), 10)
+        self.assertLessEqual(len([size for size in sizes if size < 60 * 1024]), 1)
+
+    def test_forked_processes_write_their_own_shard(self):
+        handler = create_handler(self.log_path, self.archive_path, "odapi.log-2024-01-01-000000", shard_per_process=True)
+        processes = [self.context.Process(target=run_forked_worker, args=(handler, worker)) for worker in range(PROCESSES)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        handler.close()
+
+        self.assert_every_line_once(self.read_lines(), PROCESSES)
+        shards = {file.rsplit(".", 1)[-1] for file in os.listdir(self.log_path) if not file.startswith(".")}
+        self.assertTrue({str(process.pid) for process in processes} <= shards)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import re
+import time
+
+# A token bucket ("100/s", or "100/s:500" with a burst of 500) or a 1-in-N sampling ("1/10") policy
+POLICY_PATTERN = re.compile(r'\s*(?:(?P<rate>\d+(?:\.\d+)?)/s(?::(?P<burst>\d+))?|1/(?P<every>\d+))\s*$')
+
+# A call site key, "<file path or its end>@<line>"
+CALL_SITE_PATTERN = re.compile(r'(?P<path>.+)@(?P<line>\d+)$')
+
+
+def parse_policy(text):
+    """
+    Parse a rate limit policy.
+
+    Parameters:
+    text (str): "<rate>/s" or "<rate>/s:<burst>" for a token bucket, "1/<N>" to keep one record in N.
+
+    Returns:
+    tuple: (rate, burst, every), None if the policy is invalid.
+    """
+
+    match = POLICY_PATTERN.match(text)
+    if match is None:
+        return None
+    if match.group('every'):
+        every = int(match.group('every'))
+        return (None, None, every) if every > 0 else None
+    rate = float(match.group('rate'))
+    burst = int(match.group('burst')) if match.group('burst') else max(1, int(rate))
+    return (rate, burst, None) if rate > 0 else None
+
+
+class _SiteLimit:
+    __slots__ = ('file_path', 'line_no', 'function_name', 'rate', 'burst', 'every', 'tokens', 'updated', 'count', 'suppressed')
+
+    def __init__(self, code, line_no, policy):
+        self.file_path = code.co_filename
+        self.line_no = line_no
+        self.function_name = code.co_name
+        self.rate, self.burst, self.every = policy
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.count = 0
+        self.suppressed = 0
+
+
+class RateLimiter:
+    def __init__(self, level_policies=None, site_policies=None, summary_interval=60.0):
+        """
+        Initialize the rate limiter of the logging calls.
+
+        Every call site gets its own token bucket or sampling counter, with the
+        policy of the call site if there is one and the policy of the level
+        otherwise. The state is updated without locking, concurrent calls from
+        one call site may let a record more or less through.
+
+        Parameters:
+        level_policies (dict): The policy (as returned by parse_policy) of each level number.
+        site_policies (list): (file path or its end, line number, policy) of the limited call sites.
+            The paths are compared case-insensitively, configparser lowercases the option names.
+        summary_interval (float): The time (in seconds) between two summaries of the suppressed records.
+        """
+
+        self.level_policies = level_policies or {}
+        self.site_policies = [(path, line_no, policy) for path, line_no, policy in site_policies or ()]
+        self._site_paths = [(os.path.normcase(path).lower(), line_no, policy) for path, line_no, policy in self.site_policies]
+        self.summary_interval = summary_interval
+        # _SiteLimit by (code, line number, level), None for the call sites that are not limited
+        self._sites = {}
+
+    def copy(self):
+        """
+        Create a rate limiter with the same policies and no call site state.
+
+        Returns:
+        RateLimiter: The new rate limiter.
+        """
+
+        return RateLimiter(self.level_policies, self.site_policies, self.summary_interval)
+
+    def _create_site(self, code, line_no, level):
+        file_path = os.path.normcase(code.co_filename).lower()
+        for path, site_line_no, policy in self._site_paths:
+            if line_no == site_line_no and file_path.endswith(path):
+                return _SiteLimit(code, line_no, policy)
+        policy = self.level_policies.get(level)
+        return _SiteLimit(code, line_no, policy) if policy else None
+
+    def allow(self, code, line_no, level):
+        """
+        Decide whether a logging call is logged.
+
+        Parameters:
+        code (code): The code object of the caller.
+        line_no (int): The line of the call.
+        level (int): The level of the call.
+
+        Returns:
+        bool: True if the record is logged, False if it is suppressed.
+        """
+
+        key = (code, line_no, level)
+        try:
+            site = self._sites[key]
+        except KeyError:
+            site = self._sites[key] = self._create_site(code, line_no, level)
+        if site is None:
+            return True
+
+        if site.every:
+            site.count += 1
+            if site.count % site.every == 1 or site.every == 1:
+                return True
+        else:
+            now = time.monotonic()
+            site.tokens = min(site.burst, site.tokens + (now - site.updated) * site.rate)
+            site.updated = now
+            if site.tokens >= 1:
+                site.tokens -= 1
+                return True
+        site.suppressed += 1
+        return False
+
+    def take_suppressed(self):
+        """
+        Collect the suppressed record counts since the last summary.
+
+        Returns:
+        list: (call site, level, suppressed count) for every call site with suppressed records.
+        """
+
+        suppressed = []
+        for (_, _, level), site in list(self._sites.items()):
+            if site is not None and site.suppressed:
+                suppressed.append((site, level, site.suppressed))
+                site.suppressed = 0
+        return suppressed
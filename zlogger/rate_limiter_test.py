@@ -0,0 +1,82 @@
+import logging
+import os
+import unittest
+from unittest import mock
+
+from zlogger.context import LogContext
+from zlogger.testing import create_logger
+
+
+def log_sampled(logger, count):
+    for i in range(count):
+        logger.info("sampled %s", i)
+
+
+SAMPLED_LINE = log_sampled.__code__.co_firstlineno + 2
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_token_bucket_limits_each_call_site(self):
+        logger, [stream] = create_logger("rate-limit-test", LOG={'Level': 'debug'}, RATE_LIMIT={'Enabled': 'True', 'Error': '5/s'})
+        for i in range(100):
+            logger.error("retry %s", i)
+        logger.error("other call site")
+        logger.info("not limited")
+        lines = stream.getvalue().splitlines()
+
+        self.assertEqual(len([line for line in lines if "retry" in line]), 5)
+        self.assertTrue(lines[-2].endswith("other call site"))
+        self.assertTrue(lines[-1].endswith("not limited"))
+
+    def test_call_site_sampling_and_summary(self):
+        logger, [stream] = create_logger("rate-limit-test", LOG={'Level': 'debug'}, RATE_LIMIT={'Enabled': 'True', f'{os.path.basename(__file__)}@{SAMPLED_LINE}': '1/10'})
+        log_sampled(logger, 100)
+        logger.close()
+        lines = stream.getvalue().splitlines()
+
+        self.assertEqual([line.rsplit(" ", 1)[1] for line in lines[:-1]], [str(i) for i in range(0, 100, 10)])
+        self.assertTrue(lines[-1].startswith("INFO"))
+        self.assertTrue(lines[-1].endswith(f"suppressed 90 records from {__file__}:{SAMPLED_LINE}"))
+
+    def test_call_site_file_names_keep_their_case(self):
+        namespace = {}
+        exec(compile("def log_sampled(logger):\n    logger.warning('sampled')\n", "/srv/jobs/MyWorker.py", "exec"), namespace)
+        logger, [stream] = create_logger("rate-limit-test", LOG={'Level': 'debug'}, RATE_LIMIT={'Enabled': 'True', 'MyWorker.py@2': '1/5'})
+        for _ in range(10):
+            namespace['log_sampled'](logger)
+
+        self.assertEqual(len(stream.getvalue().splitlines()), 2)
+
+    def test_summaries_are_logged_from_the_scheduler(self):
+        with mock.patch('zlogger.logger.scheduler.schedule') as schedule:
+            schedule.return_value.cancelled = False
+            logger, [stream] = create_logger("rate-limit-test", LOG={'Level': 'debug'}, RATE_LIMIT={'Enabled': 'True', 'Warning': '1/10', 'SummaryInterval': '30'})
+        self.assertEqual(schedule.call_args[0][1], logger._summarize_suppressed)
+        for _ in range(20):
+            logger.warning("item")
+        self.assertIsNotNone(logger._summarize_suppressed())
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn("suppressed 18 records from", lines[-1])
+
+    def test_suppressed_calls_build_no_context(self):
+        logger, [stream] = create_logger("rate-limit-test", LOG={'Level': 'debug'}, RATE_LIMIT={'Enabled': 'True', 'Warning': '1/50'})
+        with mock.patch.object(LogContext, "from_dict", wraps=LogContext.from_dict) as from_dict:
+            for i in range(100):
+                logger.with_additional_data({"item": i}).warning("item")
+            logger.with_request_id("1234").info("next")
+
+        self.assertEqual(from_dict.call_count, 3)
+        self.assertIn("requestID: 1234;", stream.getvalue().splitlines()[-1])
+
+    def test_invalid_policy_is_ignored(self):
+        with self.assertLogs(level=logging.ERROR):
+            logger, [stream] = create_logger("rate-limit-test", LOG={'Level': 'debug'}, RATE_LIMIT={'Enabled': 'True', 'Error': 'often', 'nowhere': '1/2'})
+        for _ in range(3):
+            logger.error("message")
+        self.assertEqual(len(stream.getvalue().splitlines()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
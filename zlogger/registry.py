@@ -0,0 +1,184 @@
+import hashlib
+import json
+import threading
+from .constants import LogConfig
+from .logger import ZLogger
+
+_lock = threading.RLock()
+# ZLogger by name
+_loggers = {}
+# (config, settings) by config hash, the config is kept for the child loggers
+_configs = {}
+# _HandlerPool by sink key
+_pools = {}
+
+
+def config_hash(config):
+    """
+    Hash the content of a configuration.
+
+    Parameters:
+    config (ConfigParser): Configuration object containing logging settings.
+
+    Returns:
+    str: The hex digest of the sections and options of the configuration.
+    """
+
+    content = {section: dict(config.items(section, raw=True)) for section in config.sections()}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+def _sink_key(settings):
+    """
+    The part of the settings deciding the handlers, without the timestamped log file path.
+
+    Whether the metrics are enabled is part of it, as enabling or disabling them
+    attaches or detaches the counters of the handlers.
+    """
+
+    log_file_config = {k: v for k, v in settings[LogConfig.LOG_FILE.value].items() if k != LogConfig.LOG_FILE_PATH.value}
+    return repr((
+        settings[LogConfig.LEVEL.value],
+        settings[LogConfig.LOG_STDOUT.value],
+        settings[LogConfig.LOG_STDERR.value],
+        settings[LogConfig.FORMAT.value],
+        sorted(settings[LogConfig.ASYNC.value].items()),
+        sorted(log_file_config.items()),
+        settings[LogConfig.METRICS.value] is not None
+    ))
+
+
+class _HandlerPool:
+    __slots__ = ('key', 'handlers', 'users')
+
+    def __init__(self, key, handlers):
+        """
+        Initialize the handlers shared by the loggers of one sink configuration.
+
+        Parameters:
+        key (str): The sink key of the handlers.
+        handlers (list): The shared handlers.
+        """
+
+        self.key = key
+        self.handlers = handlers
+        self.users = set()
+
+    def release(self, logger):
+        """
+        Detach a closing logger, unregister it and close the handlers if it was their last user.
+
+        Parameters:
+        logger (ZLogger): The closing logger.
+        """
+
+        with _lock:
+            if _loggers.get(logger.name) is logger:
+                del _loggers[logger.name]
+            last = self._detach(logger)
+        for handler in self.handlers:
+            handler.flush()
+            if last:
+                handler.close()
+
+    def _detach(self, logger):
+        for handler in self.handlers:
+            logger.removeHandler(handler)
+        logger._handler_pool = None
+        self.users.discard(logger)
+        if self.users:
+            return False
+        if _pools.get(self.key) is self:
+            del _pools[self.key]
+        return True
+
+
+def _settings(config):
+    """
+    Get the validated settings of a configuration, validating it on first use.
+
+    The settings of a sink without handlers are validated again, so that its
+    new handlers get a new timestamped log file.
+    """
+
+    key = config_hash(config)
+    cached = _configs.get(key)
+    if cached is None or _sink_key(cached[1]) not in _pools:
+        settings = ZLogger.validate_settings(config)
+        cached = _configs[key] = (config, settings)
+    return key, cached[1]
+
+
+def _pool(settings):
+    key = _sink_key(settings)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _pools[key] = _HandlerPool(key, ZLogger.create_handlers(settings))
+    return pool
+
+
+def _inherited_config(name):
+    """
+    Get the configuration of the nearest registered ancestor of a dotted logger name.
+    """
+
+    while '.' in name:
+        name = name.rsplit('.', 1)[0]
+        logger = _loggers.get(name)
+        if logger is not None:
+            return _configs[logger.config_hash][0]
+    return None
+
+
+def get_logger(name, config=None):
+    """
+    Get the logger of a name, creating it on first use.
+
+    Configurations are validated once per content hash, and the loggers of
+    configurations with the same output settings share one set of handlers,
+    so one log file, one rotation schedule and one write buffer. A logger
+    created without a configuration inherits the configuration of its
+    nearest registered ancestor ("app" for "app.db"). Calling get_logger
+    again with a different configuration reconfigures the logger in place.
+
+    Parameters:
+    name (str): The name of the logger.
+    config (ConfigParser): Configuration object containing logging settings,
+                           the configuration of the logger or of its ancestor if None.
+
+    Returns:
+    ZLogger: The logger.
+
+    Raises:
+    ValueError: If the logger does not exist yet and neither it nor an ancestor has a configuration.
+    """
+
+    with _lock:
+        logger = _loggers.get(name)
+        if logger is not None and (config is None or config_hash(config) == logger.config_hash):
+            return logger
+
+        if config is None:
+            config = _inherited_config(name)
+            if config is None:
+                raise ValueError(f"No configuration for logger {name}")
+
+        key, settings = _settings(config)
+        pool = _pool(settings)
+        previous, last = None, False
+        if logger is None:
+            logger = _loggers[name] = ZLogger(name, config, settings=settings, handlers=pool.handlers)
+        else:
+            previous = logger._handler_pool
+            if previous is not None and previous is not pool:
+                last = previous._detach(logger)
+            logger.apply_settings(settings, pool.handlers)
+        logger.config_hash = key
+        logger._handler_pool = pool
+        pool.users.add(logger)
+
+    if last:
+        for handler in previous.handlers:
+            handler.flush()
+            handler.close()
+    return logger
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from zlogger import ZLogger, get_logger
+from zlogger.custom_file_rotater import CustomFileRotator
+from zlogger import testing
+
+
+class RegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.log_path = os.path.join(self.tmp_dir, 'logs')
+
+    def create_config(self, level='info', **rate_limit):
+        return testing.create_config(self.tmp_dir, LOG={'Level': level}, RATE_LIMIT={'Enabled': str(bool(rate_limit)), **rate_limit})
+
+    def get_logger(self, name, config=None):
+        logger = get_logger(name, config)
+        self.addCleanup(logger.close)
+        return logger
+
+    def test_loggers_with_the_same_sink_share_one_file_handler(self):
+        with mock.patch.object(ZLogger, 'validate_settings', wraps=ZLogger.validate_settings) as validate_settings:
+            first = self.get_logger('registry.first', self.create_config())
+            second = self.get_logger('registry.second', self.create_config())
+            limited = self.get_logger('registry.limited', self.create_config(Error='10/s'))
+        debug = self.get_logger('registry.debug', self.create_config('debug'))
+
+        self.assertEqual(validate_settings.call_count, 2)
+        self.assertIs(get_logger('registry.first'), first)
+        self.assertIsInstance(first.handlers[0], CustomFileRotator)
+        self.assertEqual(first.handlers, second.handlers)
+        self.assertEqual(first.handlers, limited.handlers)
+        self.assertIsNotNone(limited._rate_limiter)
+        self.assertIsNot(debug.handlers[0], first.handlers[0])
+
+    def test_child_loggers_inherit_the_configuration_of_their_ancestor(self):
+        parent = self.get_logger('registry.app', self.create_config('warning'))
+        child = self.get_logger('registry.app.db.pool')
+
+        self.assertEqual(child.handlers, parent.handlers)
+        self.assertEqual(child.level, parent.level)
+        with self.assertRaises(ValueError):
+            get_logger('registry.other')
+
+    def test_shared_handlers_are_closed_by_their_last_logger(self):
+        first = get_logger('registry.closing.first', self.create_config())
+        second = get_logger('registry.closing.second', self.create_config())
+        handler = first.handlers[0]
+        first.info('first')
+        first.close()
+        second.info('second')
+
+        self.assertIsNotNone(handler.stream)
+        self.assertEqual(first.handlers, [])
+        second.close()
+        self.assertIsNone(handler.stream)
+        with open(handler.baseFilename) as file:
+            self.assertEqual([line.rsplit(' ', 1)[1] for line in file.read().splitlines()], ['first', 'second'])
+
+        reopened = self.get_logger('registry.closing.first', self.create_config())
+        self.assertIsNot(reopened, first)
+        self.assertIsNot(reopened.handlers[0], handler)
+
+    def test_loggers_with_and_without_metrics_do_not_share_handlers(self):
+        metered = self.get_logger('registry.metered', testing.create_config(self.tmp_dir, METRICS={'Enabled': 'True'}))
+        plain = self.get_logger('registry.plain', self.create_config())
+        metered.info("first")
+
+        self.assertIsNot(plain.handlers[0], metered.handlers[0])
+        self.assertIsNotNone(metered.handlers[0].metrics)
+        self.assertEqual(metered.stats()['handlers'][0]['records'], 1)
+
+    def test_reconfiguring_a_logger_replaces_its_handlers(self):
+        logger = self.get_logger('registry.reconfigured', self.create_config())
+        handler = logger.handlers[0]
+        self.assertIs(get_logger('registry.reconfigured', self.create_config('debug')), logger)
+
+        self.assertTrue(logger.isEnabledFor(10))
+        self.assertIsNot(logger.handlers[0], handler)
+        self.assertEqual(len(logger.handlers), 1)
+        self.assertIsNone(handler.stream)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import time
+import heapq
+import logging
+import itertools
+import threading
+
+# The longest wait of the scheduler thread, so that a change of the system clock delays a job by at most this long
+MAX_WAIT = 60.0
+
+
+class ScheduledJob:
+    __slots__ = ('due', 'func', 'cancelled')
+
+    def __init__(self, due, func):
+        """
+        Initialize a job of the scheduler.
+
+        Parameters:
+        due (float): The time (in seconds since epoch) at which the job runs.
+        func (function): Called without arguments, returns the time of its next run or None to stop.
+        """
+
+        self.due = due
+        self.func = func
+        self.cancelled = False
+
+
+class Scheduler:
+    def __init__(self):
+        """
+        Initialize the scheduler running the timed jobs of every handler of the process.
+
+        All the jobs run on a single daemon thread, started with the first job.
+        Jobs are due at wall clock times, like the rotation boundaries of the log files.
+        """
+
+        self._condition = threading.Condition()
+        # (due, sequence number, job), the sequence number orders the jobs due at the same time
+        self._jobs = []
+        self._sequence = itertools.count()
+        self._thread = None
+
+    def schedule(self, due, func):
+        """
+        Run a function at a given time, and again at the time it returns.
+
+        Parameters:
+        due (float): The time (in seconds since epoch) of the first run.
+        func (function): Called without arguments on the scheduler thread, returns the time of its next run or None to stop.
+
+        Returns:
+        ScheduledJob: The job, to cancel it.
+        """
+
+        job = ScheduledJob(due, func)
+        with self._condition:
+            self._push(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='zlogger-scheduler', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return job
+
+    def cancel(self, job):
+        """
+        Cancel a job. A run that already started completes, the function can check job.cancelled.
+
+        Parameters:
+        job (ScheduledJob): The job to cancel.
+        """
+
+        job.cancelled = True
+
+    def _push(self, job):
+        heapq.heappush(self._jobs, (job.due, next(self._sequence), job))
+
+    def _next_job(self):
+        """
+        Wait for the next due job.
+
+        Returns:
+        ScheduledJob: The due job.
+        """
+
+        with self._condition:
+            while True:
+                while self._jobs and self._jobs[0][2].cancelled:
+                    heapq.heappop(self._jobs)
+                if not self._jobs:
+                    self._condition.wait()
+                    continue
+                delay = self._jobs[0][0] - time.time()
+                if delay <= 0:
+                    return heapq.heappop(self._jobs)[2]
+                self._condition.wait(min(delay, MAX_WAIT))
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            try:
+                due = job.func()
+            except Exception:
+                logging.exception("Scheduled job %r failed", job.func)
+                # Retry later rather than giving up on a rotation or a retention pass.
+                due = time.time() + MAX_WAIT
+            if due is not None and not job.cancelled:
+                job.due = due
+                with self._condition:
+                    self._push(job)
+
+    def _after_fork(self):
+        """
+        Restart the scheduler thread in a forked child, which only inherits the calling thread.
+        """
+
+        self._condition = threading.Condition()
+        self._thread = None
+        if self._jobs:
+            self._thread = threading.Thread(target=self._run, name='zlogger-scheduler', daemon=True)
+            self._thread.start()
+
+
+# The scheduler of the process
+scheduler = Scheduler()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=scheduler._after_fork)
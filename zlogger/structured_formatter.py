@@ -0,0 +1,149 @@
+import json
+import struct
+import logging
+from json.encoder import encode_basestring
+from .context import LogContext
+from .constants import LogConfig
+
+# Fields of a structured record, in the order they are written
+RECORD_FIELDS = ('time', 'level', 'request_id', 'module_name', 'function_name', 'file_path', 'line_no', 'data', 'message', 'exception')
+
+# Binary record header: body length, creation time, level number and line number
+BINARY_HEADER = struct.Struct('<IdBI')
+# Binary string length, NULL_LENGTH marks a None value
+BINARY_LENGTH = struct.Struct('<I')
+NULL_LENGTH = 0xFFFFFFFF
+
+
+def json_value(value):
+    """
+    Encode a value as JSON, without going through json.dumps for the common types.
+
+    Parameters:
+    value: The value to encode.
+
+    Returns:
+    str: The JSON text.
+    """
+
+    if value is None:
+        return 'null'
+    if value.__class__ is str:
+        return encode_basestring(value)
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if value.__class__ is int:
+        return str(value)
+    return json.dumps(value, default=str)
+
+
+def record_context(record):
+    """
+    Get the context of a record, built from its extra fields if it was not logged through a ZLogger.
+
+    Parameters:
+    record (LogRecord): The log record.
+
+    Returns:
+    LogContext: The context of the record.
+    """
+
+    context = record.__dict__.get(LogConfig.CONTEXT.value)
+    if context is None:
+        context = LogContext(record.__dict__.get(LogConfig.REQUEST_ID.value), record.__dict__.get(LogConfig.MODULE_NAME.value))
+    return context
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        """
+        Format a record as a single JSON object.
+
+        The object is assembled from individually encoded fields, the additional
+        data is encoded once per context and reused by every record logged with it.
+
+        Parameters:
+        record (LogRecord): The log record that is being processed.
+
+        Returns:
+        str: The JSON line, without terminator.
+        """
+
+        d = record.__dict__
+        context = record_context(record)
+        line = (
+            f'{{"time":{record.created!r},"level":{encode_basestring(record.levelname)},'
+            f'"request_id":{json_value(context.request_id)},"module_name":{json_value(context.module_name)},'
+            f'"function_name":{json_value(d.get(LogConfig.FUNCTION_NAME.value, record.funcName))},'
+            f'"file_path":{json_value(d.get(LogConfig.FILE_PATH.value, record.pathname))},'
+            f'"line_no":{json_value(d.get(LogConfig.LINE_NO.value, record.lineno))},'
+            f'"data":{context.data_json},"message":{encode_basestring(record.getMessage())}'
+        )
+        exception = self.format_exception(record)
+        if exception:
+            return f'{line},"exception":{encode_basestring(exception)}}}'
+        return line + '}'
+
+    def format_exception(self, record):
+        """
+        Format the exception and stack information of a record.
+
+        Parameters:
+        record (LogRecord): The log record that is being processed.
+
+        Returns:
+        str: The exception text, None if the record has none.
+        """
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        exception = record.exc_text
+        if record.stack_info:
+            stack = self.formatStack(record.stack_info)
+            exception = exception + '\n' + stack if exception else stack
+        return exception
+
+
+class BinaryFormatter(JsonFormatter):
+    def format_bytes(self, record):
+        """
+        Format a record as a compact length-prefixed binary record.
+
+        The record is a header (body length, creation time, level number and
+        line number) followed by length-prefixed UTF-8 strings for the level
+        name, request ID, module name, function name, file path, data (as JSON),
+        message and exception.
+
+        Parameters:
+        record (LogRecord): The log record that is being processed.
+
+        Returns:
+        bytes: The binary record.
+        """
+
+        d = record.__dict__
+        context = record_context(record)
+        line_no = d.get(LogConfig.LINE_NO.value, record.lineno)
+        strings = (
+            record.levelname,
+            context.request_id,
+            context.module_name,
+            d.get(LogConfig.FUNCTION_NAME.value, record.funcName),
+            d.get(LogConfig.FILE_PATH.value, record.pathname),
+            context.data_json,
+            record.getMessage(),
+            self.format_exception(record),
+        )
+        parts = [b'']
+        for value in strings:
+            if value is None:
+                parts.append(BINARY_LENGTH.pack(NULL_LENGTH))
+            else:
+                encoded = str(value).encode('utf-8', 'backslashreplace')
+                parts.append(BINARY_LENGTH.pack(len(encoded)))
+                parts.append(encoded)
+        body_length = BINARY_HEADER.size - BINARY_LENGTH.size + sum(map(len, parts))
+        parts[0] = BINARY_HEADER.pack(body_length, record.created, min(record.levelno, 255), line_no if isinstance(line_no, int) and line_no >= 0 else 0)
+        return b''.join(parts)
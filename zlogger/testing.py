@@ -0,0 +1,69 @@
+import configparser
+import io
+import logging
+import os
+
+from .custom_formatter import CustomFormatter
+from .logger import ZLogger
+
+
+def create_config(tmp_dir=None, **sections):
+    """
+    Create the configuration of a test or benchmark logger.
+
+    The LOG section logs from the info level to no stream. With a temporary
+    directory the LOG_FILE section logs to its logs directory and archives to
+    its archive directory, the log file is disabled otherwise.
+
+    Parameters:
+    tmp_dir (str): The directory of the log and archive paths, None to disable the log file.
+    sections (dict): The options of each section, overriding the default options of the section.
+
+    Returns:
+    ConfigParser: The configuration.
+    """
+
+    defaults = {
+        'LOG': {'Level': 'info', 'LogStdout': 'False', 'LogStderr': 'False'},
+        'LOG_FILE': {'Enabled': 'False'},
+    }
+    if tmp_dir is not None:
+        defaults['LOG_FILE'] = {
+            'Enabled': 'True',
+            'LogPath': os.path.join(tmp_dir, 'logs'),
+            'FileName': 'odapi',
+            'FileExtension': '.log',
+            'MaxFileSize': '1048576',
+            'MaxAgeDays': '1',
+            'MaxStorageSize': '1073741824',
+            'ArchivePath': os.path.join(tmp_dir, 'archive'),
+        }
+    for section, options in sections.items():
+        defaults[section] = {**defaults.get(section, {}), **options}
+    config = configparser.ConfigParser()
+    config.read_dict(defaults)
+    return config
+
+
+def create_logger(name, *formatters, **sections):
+    """
+    Create a test logger writing to in-memory streams, without log file.
+
+    Parameters:
+    name (str): The name of the logger.
+    formatters: The formatter of each stream, a single CustomFormatter stream if none.
+    sections (dict): The options of each section, as in create_config.
+
+    Returns:
+    tuple: The logger and the list of its streams, one per formatter.
+    """
+
+    logger = ZLogger(name, create_config(**sections))
+    streams = []
+    for formatter in formatters or (CustomFormatter(),):
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+        streams.append(stream)
+    return logger, streams
@@ -0,0 +1,177 @@
+import time
+import inspect
+import contextvars
+from functools import wraps
+
+# Each power of two of a duration is split in 2**SUB_BITS linear buckets, a relative error of at most 1/16
+SUB_BITS = 4
+SUB_BUCKETS = 1 << SUB_BITS
+# Durations (in nanoseconds) from 2**MAX_BITS, about 18 minutes, are counted in the last bucket
+MAX_BITS = 40
+BUCKET_COUNT = (MAX_BITS - SUB_BITS + 1) * SUB_BUCKETS
+
+PERCENTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))
+
+# (Timed, start time) of the blocks entered in the current thread or asyncio task, innermost last,
+# so that a Timed can be shared by threads and nested
+_entered = contextvars.ContextVar('zlogger_timed_blocks', default=())
+
+
+def bucket_index(value):
+    """
+    Get the bucket of a duration.
+
+    Parameters:
+    value (int): The duration in nanoseconds.
+
+    Returns:
+    int: The index of the bucket.
+    """
+
+    if value < 2 * SUB_BUCKETS:
+        return value if value > 0 else 0
+    shift = value.bit_length() - SUB_BITS - 1
+    return min((shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS, BUCKET_COUNT - 1)
+
+
+def bucket_upper_bound(index):
+    """
+    Get the exclusive upper bound of a bucket.
+
+    Parameters:
+    index (int): The index of the bucket.
+
+    Returns:
+    int: The smallest duration (in nanoseconds) of the next bucket.
+    """
+
+    if index < 2 * SUB_BUCKETS:
+        return index + 1
+    shift = index // SUB_BUCKETS - 1
+    return (index % SUB_BUCKETS + SUB_BUCKETS + 1) << shift
+
+
+class Histogram:
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        """
+        Initialize a log-linear histogram of durations with a fixed number of buckets.
+
+        Recording is not locked, concurrent recordings may lose a count.
+        """
+
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        """
+        Record a duration.
+
+        Parameters:
+        value (int): The duration in nanoseconds.
+        """
+
+        self.counts[bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def summary(self):
+        """
+        Summarize the recorded durations, in milliseconds rounded to the microsecond.
+
+        Percentiles are the upper bound of their bucket, capped by the maximum.
+
+        Returns:
+        dict: The count, the p50, p90 and p99 percentiles, the mean and the maximum.
+        """
+
+        summary = {'count': self.count}
+        targets = [(name, fraction * self.count) for name, fraction in PERCENTILES]
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            cumulative += count
+            while targets and cumulative >= targets[0][1]:
+                summary[targets.pop(0)[0]] = round(min(bucket_upper_bound(index), self.max) / 1e6, 3)
+            if not targets:
+                break
+        summary['mean'] = round(self.total / self.count / 1e6, 3) if self.count else 0.0
+        summary['max'] = round(self.max / 1e6, 3)
+        return summary
+
+
+class Timed:
+    __slots__ = ('logger', 'name', 'module', 'code', 'line_no')
+
+    def __init__(self, logger, name, module, code, line_no):
+        """
+        Initialize the timing of a block or of the calls of a function.
+
+        Parameters:
+        logger (ZLogger): The logger recording the durations.
+        name (str): The name of the timing, if None the qualified name of the decorated function
+            or the name of the function of the timed block.
+        module (str): The module of the timing.
+        code (code): The code object of the caller, for the records of slow calls.
+        line_no (int): The line of the caller.
+        """
+
+        self.logger = logger
+        self.name = name
+        self.module = module
+        self.code = code
+        self.line_no = line_no
+
+    def __enter__(self):
+        _entered.set(_entered.get() + ((self, time.perf_counter_ns()),))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter_ns()
+        entered = _entered.get()
+        index = len(entered) - 1
+        while entered[index][0] is not self:
+            index -= 1
+        _entered.set(entered[:index] + entered[index + 1:])
+        self.logger._record_timing(self.name or self.code.co_name, self.module, end - entered[index][1], self.code, self.line_no)
+
+    def __call__(self, func):
+        name = self.name or func.__qualname__
+        module = func.__module__
+        code = func.__code__
+        line_no = code.co_firstlineno
+        logger = self.logger
+
+        if inspect.iscoroutinefunction(func):
+            # The call of a coroutine function only creates the coroutine, its awaiting is timed.
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter_ns()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    logger._record_timing(name, module, time.perf_counter_ns() - start, code, line_no)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                logger._record_timing(name, module, time.perf_counter_ns() - start, code, line_no)
+        return wrapper
+
+
+def caller_module(frame):
+    """
+    Get the module name of a frame, the file name if the module has no name.
+    """
+
+    return frame.f_globals.get('__name__') or frame.f_code.co_filename
@@ -0,0 +1,169 @@
+import asyncio
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from zlogger import ZLogger
+from zlogger.timing import Histogram, bucket_index, bucket_upper_bound
+from zlogger.testing import create_config
+
+
+class HistogramTest(unittest.TestCase):
+    def test_buckets_are_log_linear(self):
+        for value in (0, 1, 31, 32, 33, 1000, 123456789, 2 ** 39 + 5):
+            index = bucket_index(value)
+            self.assertLess(value, bucket_upper_bound(index))
+            if index:
+                self.assertGreaterEqual(value, bucket_upper_bound(index - 1))
+        # The width of a bucket is at most a sixteenth of its values
+        self.assertLessEqual(bucket_upper_bound(bucket_index(10 ** 6)) - 10 ** 6, 10 ** 6 // 16)
+
+    def test_percentiles_are_within_a_bucket_of_the_exact_values(self):
+        histogram = Histogram()
+        for i in range(1, 1001):
+            histogram.record(i * 1000)
+        summary = histogram.summary()
+
+        self.assertEqual(summary['count'], 1000)
+        self.assertEqual(summary['max'], 1.0)
+        self.assertEqual(summary['mean'], 0.5)
+        for name, exact in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+            self.assertGreaterEqual(summary[name], exact)
+            self.assertLessEqual(summary[name], exact * 17 / 16)
+
+
+class TimedTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.log_path = os.path.join(self.tmp_dir, 'logs')
+
+    def create_logger(self, **timing):
+        config = create_config(self.tmp_dir, LOG={'Format': 'json'}, TIMING=timing)
+        logger = ZLogger("timing-test", config)
+        self.addCleanup(logger.close)
+        return logger
+
+    def read_records(self, logger):
+        logger.handlers[0].flush()
+        with open(logger.handlers[0].baseFilename) as file:
+            return [json.loads(line) for line in file]
+
+    def test_blocks_and_functions_are_summarized_by_name_and_module(self):
+        logger = self.create_logger()
+
+        @logger.timed()
+        def handle_request():
+            pass
+
+        for _ in range(3):
+            handle_request()
+        with logger.timed('query'):
+            pass
+        self.assertEqual(self.read_records(logger), [])
+        logger._summarize_timings()
+        records = self.read_records(logger)
+
+        self.assertEqual(len(records), 2)
+        by_name = {record['data']['timing']: record for record in records}
+        request = by_name['TimedTest.test_blocks_and_functions_are_summarized_by_name_and_module.<locals>.handle_request']
+        self.assertEqual(request['level'], 'INFO')
+        self.assertEqual(request['module_name'], __name__)
+        self.assertEqual(request['function_name'], 'handle_request')
+        self.assertEqual(request['data']['count'], 3)
+        self.assertEqual(set(request['data']), {'timing', 'count', 'p50', 'p90', 'p99', 'mean', 'max'})
+        self.assertEqual(by_name['query']['data']['count'], 1)
+
+        # Each summary covers the calls of its own interval.
+        logger._summarize_timings()
+        self.assertEqual(len(self.read_records(logger)), 2)
+
+    def test_only_calls_above_the_threshold_are_logged(self):
+        logger = self.create_logger(Threshold='5')
+        with mock.patch('zlogger.timing.time.perf_counter_ns', side_effect=[0, 1000000, 0, 8000000]):
+            with logger.timed('fast'):
+                pass
+            with logger.timed('slow'):
+                pass
+        records = self.read_records(logger)
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['level'], 'WARNING')
+        self.assertEqual(records[0]['message'], 'slow took 8.000 ms')
+
+    def test_coroutine_functions_are_timed_until_they_return(self):
+        logger = self.create_logger()
+        durations = []
+
+        @logger.timed('fetch')
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return 'done'
+
+        with mock.patch.object(logger, '_record_timing', side_effect=lambda name, module, duration, code, line_no: durations.append(duration)):
+            self.assertEqual(asyncio.run(fetch()), 'done')
+
+        self.assertTrue(inspect.iscoroutinefunction(fetch))
+        self.assertEqual(len(durations), 1)
+        self.assertGreaterEqual(durations[0], 50000000)
+
+    def test_a_shared_timing_can_be_nested_and_used_from_threads(self):
+        logger = self.create_logger()
+        timed = logger.timed('query')
+        durations = {}
+        first_entered = threading.Event()
+        second_entered = threading.Event()
+
+        def first():
+            with timed:
+                first_entered.set()
+                second_entered.wait()
+            durations['first'] = durations.pop('last')
+
+        def record_timing(name, module, duration, code, line_no):
+            durations['last'] = duration
+
+        with mock.patch.object(logger, '_record_timing', side_effect=record_timing):
+            with timed:
+                time.sleep(0.05)
+                with timed:
+                    pass
+                durations['inner'] = durations.pop('last')
+            durations['outer'] = durations.pop('last')
+
+            thread = threading.Thread(target=first)
+            thread.start()
+            first_entered.wait()
+            time.sleep(0.1)
+            with timed:
+                second_entered.set()
+                thread.join()
+
+        self.assertGreaterEqual(durations['outer'], 50000000)
+        self.assertLess(durations['inner'], durations['outer'])
+        self.assertGreaterEqual(durations['first'], 100000000)
+
+    def test_summaries_are_scheduled_and_flushed_on_close(self):
+        logger = self.create_logger(SummaryInterval='30')
+        with mock.patch('zlogger.logger.scheduler.schedule') as schedule:
+            with logger.timed('query'):
+                pass
+            with logger.timed('query'):
+                pass
+        self.assertEqual(schedule.call_count, 1)
+        self.assertEqual(schedule.call_args[0][1], logger._summarize_timings)
+        logger.close()
+
+        with open(os.path.join(self.log_path, os.listdir(self.log_path)[0])) as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual([record['data']['count'] for record in records], [2])
+
+
+if __name__ == '__main__':
+    unittest.main()